@@ -7,9 +7,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from datetime import datetime
-import uvicorn
+import asyncio
 
-from api.routes import health, query, documents
+from api.routes import health, query, documents, metrics
+from api.services.job_service import shutdown_job_service
+from app.clients import get_client_registry
+from utils.config_loader import config
 from utils.logger import logger
 
 # Lifespan context manager (modern way)
@@ -17,9 +20,14 @@ from utils.logger import logger
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 RAG API starting...")
+    registry = get_client_registry()
+    if config.get('clients', 'warm_up', default=True):
+        await asyncio.to_thread(registry.warm_up)
     yield
-    # Shutdown (if needed)
+    # Shutdown
     logger.info("🛑 RAG API shutting down...")
+    shutdown_job_service()
+    await registry.aclose()
 
 # Initialize FastAPI app with lifespan
 app = FastAPI(
@@ -44,6 +52,7 @@ app.add_middleware(
 app.include_router(health.router)
 app.include_router(query.router)
 app.include_router(documents.router)
+app.include_router(metrics.router)
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -58,10 +67,18 @@ async def global_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    import uvicorn  # Not needed when served by gunicorn
+    
+    workers = config.get('server', 'workers', default=1)
+    reload = config.get('server', 'reload', default=False)
+    if reload and workers > 1:
+        raise ValueError("❌ server.reload only works with a single worker")
+        
     uvicorn.run(
         "api.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=config.get('server', 'host', default="0.0.0.0"),
+        port=config.get('server', 'port', default=8000),
+        workers=workers,
+        reload=reload,
         log_level="info"
     )
\ No newline at end of file
@@ -1,14 +1,51 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Union
+
+class QueryFilters(BaseModel):
+    source: Optional[Union[str, List[str]]] = None
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+    category: Optional[Union[str, List[str]]] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+    
+    @model_validator(mode="after")
+    def check_page_range(self):
+        if self.page_from is not None and self.page_to is not None and self.page_from > self.page_to:
+            raise ValueError("page_from must not be greater than page_to")
+        return self
 
 class QueryRequest(BaseModel):
     question: str = Field(..., min_length=3, max_length=500)
     top_k: Optional[int] = Field(None, ge=1, le=10)
+    include_timings: bool = False
+    filters: Optional[QueryFilters] = None
     
     class Config:
         json_schema_extra = {
             "example": {
                 "question": "What is environment scaffolding?",
-                "top_k": 3
+                "top_k": 3,
+                "filters": {"source": "sample.pdf", "page_from": 1, "page_to": 5}
+            }
+        }
+
+class BatchQueryRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1)
+    top_k: Optional[int] = Field(None, ge=1, le=10)
+    max_concurrency: Optional[int] = Field(None, ge=1, le=32)
+    filters: Optional[QueryFilters] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What is environment scaffolding?",
+                    "Who are the authors of this paper?"
+                ],
+                "top_k": 3,
+                "max_concurrency": 4,
+                "filters": {"source": "sample.pdf"}
             }
         }
\ No newline at end of file
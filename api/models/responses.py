@@ -1,11 +1,31 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class QueryResponse(BaseModel):
     answer: str
     sources: List[Dict]
     retrieved_docs: int
+    context_tokens: Optional[int] = None
     query_time: float
+    cached: bool = False
+    timings: Optional[Dict[str, float]] = None
+    tokens: Optional[Dict[str, int]] = None
+    retrieval: Optional[Dict[str, int]] = None
+
+class BatchQueryItem(BaseModel):
+    question: str
+    answer: str
+    sources: List[Dict] = []
+    retrieved_docs: int
+    context_tokens: Optional[int] = None
+    query_time: float
+    cached: bool = False
+    timings: Dict[str, float] = {}
+    error: Optional[str] = None
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryItem]
+    timings: Dict[str, float]
 
 class HealthResponse(BaseModel):
     status: str
@@ -17,4 +37,20 @@ class DocumentUploadResponse(BaseModel):
     status: str
     filename: str
     chunks_created: int
-    message: str
\ No newline at end of file
+    message: str
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    status: str
+    filename: str
+    pages_extracted: int
+    total_pages: Optional[int] = None
+    chunks_created: int
+    chunks_embedded: int
+    chunks_unchanged: int = 0
+    chunks_removed: int = 0
+    chunks_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
\ No newline at end of file
@@ -1,24 +1,19 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from datetime import datetime
-from api.models.responses import DocumentUploadResponse
+from api.models.responses import IngestionJobResponse
 from api.services.document_service import get_document_service
 from utils.logger import logger
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
-@router.post("/upload", response_model=DocumentUploadResponse)
+@router.post("/upload", response_model=IngestionJobResponse, status_code=202)
 async def upload_document(file: UploadFile = File(...)):
-    """Upload and process a PDF document"""
+    """Upload a PDF document and queue it for background processing"""
     try:
         doc_service = get_document_service()
-        result = await doc_service.upload_and_process(file)
+        job = await doc_service.upload_and_process(file)
         
-        return DocumentUploadResponse(
-            status=result["status"],
-            filename=result["filename"],
-            chunks_created=result["chunks_created"],
-            message=f"Document '{result['filename']}' processed successfully"
-        )
+        return IngestionJobResponse(**job)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -26,6 +21,17 @@ async def upload_document(file: UploadFile = File(...)):
         logger.error(f"❌ Upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_job_status(job_id: str):
+    """Get progress of a document ingestion job"""
+    doc_service = get_document_service()
+    job = doc_service.get_job(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return IngestionJobResponse(**job)
+
 @router.get("/info")
 async def get_collection_info():
     """Get information about the document collection"""
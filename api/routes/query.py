@@ -1,7 +1,11 @@
+import json
 from fastapi import APIRouter, HTTPException
-from api.models.requests import QueryRequest
-from api.models.responses import QueryResponse
+from fastapi.responses import StreamingResponse
+from api.models.requests import BatchQueryRequest, QueryRequest
+from api.models.responses import BatchQueryResponse, QueryResponse
 from api.services.rag_service import get_rag_service
+from app.embeddings.metadata_filter import build_filter
+from utils.config_loader import config
 from utils.logger import logger
 
 router = APIRouter(prefix="/query", tags=["Query"])
@@ -13,21 +17,106 @@ async def query_documents(request: QueryRequest):
     
     - **question**: Your question (3-500 characters)
     - **top_k**: Number of documents to retrieve (optional)
+    - **include_timings**: Return per-stage latencies, token and retrieval counts (optional)
+    - **filters**: Restrict retrieval by source, page range, category or upload date (optional)
     """
     try:
         rag_service = get_rag_service()
-        result = rag_service.query_documents(
+        result = await rag_service.aquery_documents(
             question=request.question,
-            top_k=request.top_k
+            top_k=request.top_k,
+            include_timings=request.include_timings,
+            filter=_metadata_filter(request)
         )
         
         return QueryResponse(
             answer=result["answer"],
             sources=result.get("sources", []),
             retrieved_docs=result.get("retrieved_docs", 0),
-            query_time=result["query_time"]
+            context_tokens=result.get("context_tokens"),
+            query_time=result["query_time"],
+            cached=result.get("cached", False),
+            timings=result.get("timings"),
+            tokens=result.get("tokens"),
+            retrieval=result.get("retrieval")
         )
         
     except Exception as e:
         logger.error(f"❌ Query failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_model=BatchQueryResponse)
+async def query_batch(request: BatchQueryRequest):
+    """
+    Answer many questions in one request (offline evaluation, bulk Q&A)
+    
+    - **questions**: List of questions (3-500 characters each)
+    - **top_k**: Number of documents to retrieve per question (optional)
+    - **max_concurrency**: Parallel LLM calls (optional)
+    - **filters**: Restrict retrieval for every question (optional)
+    """
+    max_questions = config.get('batch', 'max_questions', default=500)
+    if len(request.questions) > max_questions:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.questions)} questions (max {max_questions})"
+        )
+    
+    invalid = [q for q in request.questions if not 3 <= len(q) <= 500]
+    if invalid:
+        raise HTTPException(
+            status_code=422,
+            detail="Each question must be between 3 and 500 characters"
+        )
+    
+    try:
+        rag_service = get_rag_service()
+        result = await rag_service.aquery_batch(
+            questions=request.questions,
+            top_k=request.top_k,
+            max_concurrency=request.max_concurrency,
+            filter=_metadata_filter(request)
+        )
+        return BatchQueryResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"❌ Batch query failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Query the RAG system and stream the answer as Server-Sent Events
+    
+    Emits a `sources` event first, then one `token` event per LLM chunk,
+    and finally a `done` event (or `error` if generation fails).
+    """
+    rag_service = get_rag_service()
+    
+    async def event_stream():
+        try:
+            async for event in rag_service.astream_query_documents(
+                question=request.question,
+                top_k=request.top_k,
+                filter=_metadata_filter(request)
+            ):
+                yield _format_sse(event["event"], event["data"])
+        except Exception as e:
+            logger.error(f"❌ Streaming query failed: {e}")
+            yield _format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _metadata_filter(request: QueryRequest):
+    """Vector store filter for the request's filters (None if unset)"""
+    if request.filters is None:
+        return None
+    return build_filter(**request.filters.model_dump())
+
+def _format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
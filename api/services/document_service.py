@@ -1,8 +1,14 @@
+import asyncio
 import os
-from typing import List
+import time
+from typing import Callable, Dict
 from fastapi import UploadFile
-from app.ingestion.pymupdf_loader import load_and_process_pdf
+from app.clients import get_client_registry
+from app.ingestion.pymupdf_loader import iter_pdf_pages, iter_chunks
 from app.embeddings.vectorstore import get_vectorstore
+from app.summarizer.answer_cache import get_answer_cache
+from api.services.job_service import get_job_service
+from utils.config_loader import config
 from utils.logger import logger
 
 class DocumentService:
@@ -10,57 +16,128 @@ class DocumentService:
     
     def __init__(self):
         self.vectorstore = get_vectorstore()
-        self.upload_dir = "./data/uploads"
+        self.job_service = get_job_service()
+        self.upload_dir = config.get('ingestion', 'upload_dir', default="./data/uploads")
         os.makedirs(self.upload_dir, exist_ok=True)
     
     async def upload_and_process(
-        self, 
+        self,
         file: UploadFile
     ) -> dict:
-        """Upload and process a PDF document"""
+        """Save an uploaded PDF and queue it for background ingestion"""
         
         if not file.filename.endswith('.pdf'):
             raise ValueError("Only PDF files are supported")
+            
+        logger.info(f"📤 Received: {file.filename}")
         
-        logger.info(f"📤 Processing: {file.filename}")
+        job_id = self.job_service.new_job_id()
+        temp_path = os.path.join(
+            self.upload_dir,
+            f"{job_id}_{os.path.basename(file.filename)}"
+        )
         
-        temp_path = os.path.join(self.upload_dir, file.filename)
+        content = await file.read()
+        await asyncio.to_thread(self._write_file, temp_path, content)
         
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        try:
+            return self.job_service.submit(
+                job_id,
+                file.filename,
+                lambda progress: self.process_document(temp_path, file.filename, progress)
+            )
+        except Exception:
+            # The job never started, so it won't clean up after itself
+            await asyncio.to_thread(os.remove, temp_path)
+            raise
+    
+    def process_document(
+        self,
+        file_path: str,
+        source_name: str,
+        progress: Callable[..., None] = None
+    ) -> Dict:
+        """
+        Extract, chunk and embed a PDF (runs on an ingestion worker)
+        
+        Args:
+            file_path: Path of the saved upload (removed afterwards)
+            source_name: Name to use in metadata
+            progress: Optional callback receiving job progress fields
+            
+        Returns:
+            Dict with final progress counters
+        """
+        report = progress or (lambda **fields: None)
+        
+        def track_pages(pages):
+            for count, page in enumerate(pages, 1):
+                report(pages_extracted=count, total_pages=page["total_pages"])
+                yield page
+        
+        def track_chunks(chunks):
+            for count, chunk in enumerate(chunks, 1):
+                report(chunks_created=count)
+                yield chunk
         
         try:
-            documents = load_and_process_pdf(temp_path, source_name=file.filename)
-            doc_ids = self.vectorstore.add_documents(documents)
+            # Pages -> chunks -> batched embedding, all streamed
+            pages = track_pages(iter_pdf_pages(file_path))
+            documents = track_chunks(iter_chunks(pages, source_name))
             
-            logger.info(f"✅ Processed: {len(doc_ids)} chunks")
+            start_time = time.perf_counter()
+            stats = self.vectorstore.sync_document(
+                source_name,
+                documents,
+                progress_callback=lambda written: report(chunks_embedded=written)
+            )
+            elapsed = time.perf_counter() - start_time
+            
+            logger.info(f"✅ Processed {source_name}: {stats['chunks_total']} chunks")
             
             return {
-                "status": "success",
-                "filename": file.filename,
-                "chunks_created": len(doc_ids)
+                "chunks_created": stats["chunks_total"],
+                "chunks_embedded": stats["chunks_added"],
+                "chunks_unchanged": stats["chunks_unchanged"],
+                "chunks_removed": stats["chunks_removed"],
+                "chunks_per_second": (
+                    round(stats["chunks_added"] / elapsed, 2) if elapsed > 0 else None
+                )
             }
             
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    
+    def get_job(self, job_id: str) -> dict:
+        """Get the status of an ingestion job"""
+        return self.job_service.get_job(job_id)
+    
+    @staticmethod
+    def _write_file(path: str, content: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(content)
     
     def get_collection_info(self) -> dict:
         """Get information about document collection"""
         count = self.vectorstore.get_collection_count()
         
-        return {
+        info = {
             "total_documents": count,
             "collection_name": "document_collection"
         }
+        
+        cache = getattr(self.vectorstore.embeddings, "cache", None)
+        if cache is not None:
+            info["embedding_cache"] = cache.get_stats()
+        
+        answer_cache = get_answer_cache()
+        if answer_cache is not None:
+            info["answer_cache"] = answer_cache.get_stats()
+            
+        return info
 
 # Singleton instance
-_document_service = None
-
 def get_document_service() -> DocumentService:
-    """Get document service instance"""
-    global _document_service
-    if _document_service is None:
-        _document_service = DocumentService()
-    return _document_service
\ No newline at end of file
+    """Get document service instance (dropped on client shutdown)"""
+    return get_client_registry().get("document_service", DocumentService)
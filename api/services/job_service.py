@@ -0,0 +1,192 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from api.services.job_store import JobStore
+from utils.config_loader import config
+from utils.logger import logger
+
+class JobService:
+    """
+    Run document ingestion jobs on a bounded background worker pool
+    
+    Jobs run in the API worker that received the upload. Their progress
+    is kept in memory and written to the shared job store on status
+    changes (and at most every progress_interval seconds otherwise), so
+    any worker can answer status requests.
+    """
+    
+    def __init__(self):
+        self.max_workers = config.get('ingestion', 'max_concurrent_jobs', default=2)
+        self.max_tracked_jobs = config.get('ingestion', 'max_tracked_jobs', default=1000)
+        self.progress_interval = config.get('ingestion', 'job_progress_interval', default=0.5)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ingestion"
+        )
+        self._jobs: Dict[str, Dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._saved_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._store = JobStore(
+            config.get('ingestion', 'job_store', default="./data/jobs/jobs.sqlite")
+        )
+        
+        logger.info(f"🧵 Ingestion job pool started ({self.max_workers} workers)")
+    
+    def new_job_id(self) -> str:
+        """Generate a new job id"""
+        return uuid.uuid4().hex
+    
+    def submit(
+        self,
+        job_id: str,
+        filename: str,
+        task: Callable[[Callable[..., None]], Dict]
+    ) -> Dict:
+        """
+        Queue an ingestion task
+        
+        Args:
+            job_id: Id from new_job_id
+            filename: Name of the uploaded file
+            task: Callable receiving a progress callback and returning a result dict
+            
+        Returns:
+            Snapshot of the queued job
+        """
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "filename": filename,
+            "pages_extracted": 0,
+            "total_pages": None,
+            "chunks_created": 0,
+            "chunks_embedded": 0,
+            "chunks_unchanged": 0,
+            "chunks_removed": 0,
+            "chunks_per_second": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+            snapshot = dict(job)
+            
+        self._store.save(snapshot)
+        self._store.prune(self.max_tracked_jobs)
+        future = self._executor.submit(self._run, job_id, task)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        logger.info(f"📋 Queued ingestion job {job_id} for: {filename}")
+        return snapshot
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get a snapshot of a job (from any worker), or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return dict(job)
+        return self._store.get(job_id)
+    
+    def update(self, job_id: str, **fields) -> None:
+        """Update progress fields of a job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            
+            now = time.monotonic()
+            if "status" not in fields and now - self._saved_at.get(job_id, 0.0) < self.progress_interval:
+                return
+            self._saved_at[job_id] = now
+            snapshot = dict(job)
+            
+        self._store.save(snapshot)
+    
+    def _run(self, job_id: str, task: Callable) -> None:
+        """Execute a task on a worker thread and record its outcome"""
+        self.update(job_id, status="running", started_at=datetime.utcnow().isoformat())
+        
+        try:
+            result = task(lambda **fields: self.update(job_id, **fields))
+            self.update(
+                job_id,
+                status="completed",
+                error=None,  # Clears a shutdown notice if the job finished anyway
+                finished_at=datetime.utcnow().isoformat(),
+                **result
+            )
+            logger.info(f"✅ Ingestion job {job_id} completed")
+        except Exception as e:
+            logger.error(f"❌ Ingestion job {job_id} failed: {e}")
+            self.update(
+                job_id,
+                status="failed",
+                error=str(e),
+                finished_at=datetime.utcnow().isoformat()
+            )
+    
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_tracked_jobs (lock held)"""
+        overflow = len(self._jobs) - self.max_tracked_jobs
+        if overflow <= 0:
+            return
+            
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("completed", "failed")
+        ]
+        for job_id in finished[:overflow]:
+            del self._jobs[job_id]
+            self._saved_at.pop(job_id, None)
+    
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stop accepting jobs and release the worker pool
+        
+        Queued jobs are cancelled and recorded as failed, so clients polling
+        their status (from any worker) get an answer instead of waiting on
+        a job that will never run. Without `wait`, running jobs are marked
+        as interrupted; one that still finishes records its real outcome.
+        """
+        with self._lock:
+            futures = dict(self._futures)  # Cancelled futures drop out on shutdown
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        
+        finished_at = datetime.utcnow().isoformat()
+        for job_id, future in futures.items():
+            if future.cancelled():
+                error = "Cancelled: the server shut down before the job started"
+            elif not future.done():
+                error = "Interrupted: the server shut down while the job was running"
+            else:
+                continue
+            self.update(job_id, status="failed", error=error, finished_at=finished_at)
+            
+        logger.info("🧵 Ingestion job pool stopped")
+
+# Singleton instance
+_job_service = None
+
+def get_job_service() -> JobService:
+    """Get job service instance"""
+    global _job_service
+    if _job_service is None:
+        _job_service = JobService()
+    return _job_service
+
+def shutdown_job_service() -> None:
+    """Shut down the job service if it was started"""
+    global _job_service
+    if _job_service is not None:
+        _job_service.shutdown()
+        _job_service = None
@@ -0,0 +1,73 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from utils.logger import logger
+
+class JobStore:
+    """
+    Ingestion job snapshots shared by all API workers (SQLite)
+
+    A job runs on the worker that received the upload, but its status can
+    be requested from any worker, so the running worker writes snapshots
+    here and the others read them.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at)"
+        )
+        self._conn.commit()
+
+        logger.info(f"📋 Job store at: {path}")
+
+    def save(self, job: Dict) -> None:
+        """Insert or replace a job snapshot"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job["job_id"], job["status"], json.dumps(job), time.time())
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Latest snapshot of a job, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self, max_jobs: int) -> None:
+        """Forget the oldest finished jobs beyond max_jobs"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            overflow = count - max_jobs
+            if overflow <= 0:
+                return
+
+            self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                "SELECT job_id FROM jobs WHERE status IN ('completed', 'failed') "
+                "ORDER BY updated_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._conn.commit()
@@ -1,42 +1,137 @@
-from datetime import datetime
-from typing import Dict
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from app.clients import get_client_registry
 from app.summarizer.ai_summary import get_rag_pipeline
+from utils.config_loader import config
 from utils.logger import logger
+from utils.metrics import collect_breakdown, record_stage
 
 class RAGService:
     """Business logic for RAG operations"""
     
     def __init__(self):
         self.rag_pipeline = get_rag_pipeline()
+        self.max_concurrent_queries = config.get('api', 'max_concurrent_queries', default=8)
+        self._query_slots = None
     
     def query_documents(
         self, 
         question: str, 
-        top_k: int = None
+        top_k: int = None,
+        include_timings: bool = False,
+        filter: Optional[Dict] = None
     ) -> Dict:
         """Process a query and return results"""
         
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         logger.info(f"📝 Processing query: {question}")
         
-        result = self.rag_pipeline.query(
-            question=question,
-            top_k=top_k,
-            return_sources=True
-        )
+        with collect_breakdown() as breakdown:
+            result = self.rag_pipeline.query(
+                question=question,
+                top_k=top_k,
+                return_sources=True,
+                filter=filter
+            )
+            
+        return self._finish(result, start_time, breakdown, include_timings)
+    
+    async def aquery_documents(
+        self, 
+        question: str, 
+        top_k: int = None,
+        include_timings: bool = False,
+        filter: Optional[Dict] = None
+    ) -> Dict:
+        """Process a query without blocking the event loop"""
+        
+        start_time = time.perf_counter()
+        logger.info(f"📝 Processing query (async): {question}")
         
-        end_time = datetime.utcnow()
-        query_time = (end_time - start_time).total_seconds()
+        with collect_breakdown() as breakdown:
+            async with self._get_query_slots():
+                record_stage("queue_wait", time.perf_counter() - start_time)
+                result = await self.rag_pipeline.aquery(
+                    question=question,
+                    top_k=top_k,
+                    return_sources=True,
+                    filter=filter
+                )
+                
+        return self._finish(result, start_time, breakdown, include_timings)
+    
+    def _finish(
+        self, 
+        result: Dict, 
+        start_time: float,
+        breakdown: Dict,
+        include_timings: bool
+    ) -> Dict:
+        """Attach total query time (and optionally the per-stage breakdown)"""
+        query_time = time.perf_counter() - start_time
+        record_stage("total", query_time)
         
         result["query_time"] = query_time
+        if include_timings:
+            result["timings"] = {**breakdown["timings"], "total": query_time}
+            result["tokens"] = breakdown["tokens"]
+            result["retrieval"] = breakdown["retrieval"]
+        else:
+            result.pop("tokens", None)
         return result
 
-# Singleton instance
-_rag_service = None
+    async def astream_query_documents(
+        self, 
+        question: str, 
+        top_k: int = None,
+        filter: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream query events (sources, tokens, done) as they are produced"""
+        
+        start_time = time.perf_counter()
+        logger.info(f"📝 Streaming query: {question}")
+        
+        async with self._get_query_slots():
+            async for event in self.rag_pipeline.astream_query(
+                question=question,
+                top_k=top_k,
+                filter=filter
+            ):
+                if event["event"] == "done":
+                    query_time = time.perf_counter() - start_time
+                    record_stage("total", query_time)
+                    event["data"]["query_time"] = query_time
+                yield event
+    
+    async def aquery_batch(
+        self, 
+        questions: List[str], 
+        top_k: int = None,
+        max_concurrency: int = None,
+        filter: Optional[Dict] = None
+    ) -> Dict:
+        """Answer a batch of questions on a worker thread"""
+        
+        logger.info(f"📝 Processing batch of {len(questions)} questions")
+        
+        async with self._get_query_slots():
+            return await asyncio.to_thread(
+                self.rag_pipeline.query_batch,
+                questions,
+                top_k=top_k,
+                return_sources=True,
+                max_concurrency=max_concurrency,
+                filter=filter
+            )
+    
+    def _get_query_slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding how many retrievals/generations are in flight at once"""
+        if self._query_slots is None:
+            self._query_slots = asyncio.Semaphore(self.max_concurrent_queries)
+        return self._query_slots
 
+# Singleton instance
 def get_rag_service() -> RAGService:
-    """Get RAG service instance"""
-    global _rag_service
-    if _rag_service is None:
-        _rag_service = RAGService()
-    return _rag_service
\ No newline at end of file
+    """Get RAG service instance (dropped on client shutdown)"""
+    return get_client_registry().get("rag_service", RAGService)
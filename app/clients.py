@@ -0,0 +1,110 @@
+# app/clients.py
+
+import threading
+from typing import Any, Callable, Dict
+import httpx
+from utils.config_loader import config
+from utils.logger import logger
+
+class ClientRegistry:
+    """
+    Process-wide owner of long-lived clients
+    
+    Holds the pooled keep-alive HTTP connections used by the Ollama/OpenAI
+    clients and the shared embeddings, LLM, retriever and RAG pipeline
+    objects, so scripts, Streamlit and the API reuse connections instead
+    of rebuilding them per call.
+    """
+    
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._http_client = None
+        self._async_http_client = None
+    
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the shared instance called `name`, creating it on first use"""
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = factory()
+            return self._instances[name]
+    
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=config.get('clients', 'max_connections', default=20),
+            max_keepalive_connections=config.get('clients', 'max_keepalive_connections', default=10),
+            keepalive_expiry=config.get('clients', 'keepalive_expiry', default=30)
+        )
+    
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(config.get('clients', 'timeout', default=120))
+    
+    def ollama_client_kwargs(self) -> Dict:
+        """httpx settings passed to the Ollama sync/async clients"""
+        return {"limits": self._limits(), "timeout": self._timeout()}
+    
+    def http_client(self) -> httpx.Client:
+        """Shared pooled sync HTTP client (used by OpenAI clients)"""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self._limits(), timeout=self._timeout())
+            return self._http_client
+    
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Shared pooled async HTTP client (used by OpenAI clients)"""
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = httpx.AsyncClient(
+                    limits=self._limits(),
+                    timeout=self._timeout()
+                )
+            return self._async_http_client
+    
+    def warm_up(self) -> None:
+        """Create the shared objects and open connections ahead of the first request"""
+        from app.summarizer.ai_summary import get_rag_pipeline
+        
+        logger.info("🔥 Warming up clients...")
+        
+        try:
+            pipeline = get_rag_pipeline()
+            
+            # Bypass the embedding cache so a real connection is opened
+            embeddings = pipeline.retriever.vectorstore.embeddings
+            getattr(embeddings, "embeddings", embeddings).embed_query("warm-up")
+            
+            # Load the cross-encoder and calibrate its latency budget estimate
+            if pipeline.retriever.reranker is not None:
+                pipeline.retriever.reranker.warm_up()
+                
+            if config.get('clients', 'warm_up_llm', default=False):
+                pipeline.llm.invoke("Reply with OK.")
+                
+            logger.info("✅ Clients warmed up")
+        except Exception as e:
+            # The API should still start if a backend is temporarily down
+            logger.warning(f"⚠️ Client warm-up failed: {e}")
+    
+    async def aclose(self) -> None:
+        """Close pooled connections and drop shared instances"""
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            async_http_client, self._async_http_client = self._async_http_client, None
+            self._instances.clear()
+            
+        if http_client is not None:
+            http_client.close()
+        if async_http_client is not None:
+            await async_http_client.aclose()
+            
+        logger.info("🔌 Client connections closed")
+
+# Global instance
+_registry = None
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry (singleton pattern)"""
+    global _registry
+    if _registry is None:
+        _registry = ClientRegistry()
+    return _registry
@@ -1,6 +1,26 @@
-# Placeholder
 # app/embeddings/__init__.py
 
-from .embedding_factory import get_embeddings, EmbeddingFactory
+# Names are resolved on first access (PEP 562), so importing a submodule
+# such as app.embeddings.metadata_filter does not load the embedding stack
 
-__all__ = ['get_embeddings', 'EmbeddingFactory']
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'get_embeddings': '.embedding_factory',
+    'get_embedding_cache': '.embedding_factory',
+    'EmbeddingFactory': '.embedding_factory',
+    'EmbeddingCache': '.embedding_cache',
+    'CachedEmbeddings': '.embedding_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,194 @@
+# app/embeddings/ann_index.py
+
+import json
+import os
+import threading
+from typing import Dict, List, Tuple
+import numpy as np
+from utils.logger import logger
+
+try:
+    import hnswlib
+except ImportError:  # Optional dependency, only needed when vectorstore.ann is enabled
+    hnswlib = None
+
+class HnswIndex:
+    """
+    Approximate nearest-neighbour index (HNSW via hnswlib)
+    
+    Maps string chunk IDs to integer labels and keeps itself up to date on
+    upserts/deletes once built. `ef_search` trades recall for latency at
+    query time; M and ef_construction are fixed when the index is built.
+    
+    Distances are returned as 2 - 2*cos, the scale used by the exact
+    NumPy search, so score thresholds are unchanged.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64
+    ):
+        if hnswlib is None:
+            raise ImportError("❌ The ANN index requires hnswlib: pip install hnswlib")
+            
+        self.path = path
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._lock = threading.Lock()
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._dirty = False
+        
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+    
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        ids: List[str],
+        vectors: np.ndarray,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        num_threads: int = -1
+    ) -> "HnswIndex":
+        """Build a fresh index over all vectors"""
+        index = cls(path, vectors.shape[1], m=m, ef_construction=ef_construction, ef_search=ef_search)
+        index._index.init_index(
+            max_elements=max(len(ids), 1),
+            M=m,
+            ef_construction=ef_construction,
+            allow_replace_deleted=True
+        )
+        index._index.set_ef(ef_search)
+        
+        labels = np.arange(len(ids))
+        if len(ids):
+            index._index.add_items(np.asarray(vectors, dtype=np.float32), labels, num_threads=num_threads)
+        index._labels = {doc_id: int(label) for doc_id, label in zip(ids, labels)}
+        index._ids = {label: doc_id for doc_id, label in index._labels.items()}
+        index._next_label = len(ids)
+        index._dirty = True
+        
+        logger.info(f"🕸️  Built HNSW index over {len(ids)} vectors (M={m}, ef_construction={ef_construction})")
+        return index
+    
+    @classmethod
+    def load(cls, path: str, ef_search: int = 64) -> "HnswIndex":
+        """Load a previously built index"""
+        with open(f"{path}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+            
+        index = cls(path, meta["dim"], m=meta["m"], ef_construction=meta["ef_construction"], ef_search=ef_search)
+        index._index.load_index(path, max_elements=meta["max_elements"], allow_replace_deleted=True)
+        index._index.set_ef(ef_search)
+        index._labels = meta["labels"]
+        index._ids = {label: doc_id for doc_id, label in index._labels.items()}
+        index._next_label = meta["next_label"]
+        
+        logger.info(f"🕸️  Loaded HNSW index with {len(index._labels)} vectors (ef_search={ef_search})")
+        return index
+    
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(path) and os.path.exists(f"{path}.json")
+    
+    def set_ef(self, ef_search: int) -> None:
+        """Change the query-time recall/latency trade-off"""
+        with self._lock:
+            self.ef_search = ef_search
+            self._index.set_ef(ef_search)
+    
+    def add(self, ids: List[str], vectors: np.ndarray) -> None:
+        """Insert or replace vectors"""
+        with self._lock:
+            labels = []
+            new_labels = 0
+            for doc_id in ids:
+                # Existing IDs keep their label and are updated in place
+                label = self._labels.get(doc_id)
+                if label is None:
+                    label = self._next_label
+                    self._next_label += 1
+                    self._labels[doc_id] = label
+                    self._ids[label] = doc_id
+                    new_labels += 1
+                labels.append(label)
+                
+            needed = self._index.get_current_count() + new_labels
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+                
+            self._index.add_items(
+                np.asarray(vectors, dtype=np.float32),
+                np.asarray(labels),
+                replace_deleted=True
+            )
+            self._dirty = True
+    
+    def delete(self, ids: List[str]) -> None:
+        """Remove vectors (their slots are reused by later inserts)"""
+        with self._lock:
+            for doc_id in ids:
+                label = self._labels.pop(doc_id, None)
+                if label is not None:
+                    del self._ids[label]
+                    self._index.mark_deleted(label)
+            self._dirty = True
+    
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """
+        Approximate top-k search
+        
+        Returns:
+            List of (chunk_id, distance) tuples, closest first
+        """
+        with self._lock:
+            k = min(k, len(self._labels))
+            if k <= 0:
+                return []
+                
+            labels, distances = self._index.knn_query(np.asarray(vector, dtype=np.float32), k=k)
+            
+        return [
+            (self._ids[int(label)], float(2.0 * distance))
+            for label, distance in zip(labels[0], distances[0])
+            if int(label) in self._ids
+        ]
+    
+    def save(self) -> None:
+        """Persist the graph and the label mapping if changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+                
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+                
+            self._index.save_index(f"{self.path}.tmp")
+            with open(f"{self.path}.json.tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "dim": self.dim,
+                    "m": self.m,
+                    "ef_construction": self.ef_construction,
+                    "max_elements": self._index.get_max_elements(),
+                    "next_label": self._next_label,
+                    "labels": self._labels
+                }, f)
+                
+            os.replace(f"{self.path}.tmp", self.path)
+            os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+            self._dirty = False
+            
+        logger.info(f"💾 Saved HNSW index ({len(self._labels)} vectors)")
+    
+    def __len__(self) -> int:
+        return len(self._labels)
@@ -0,0 +1,74 @@
+# app/embeddings/coordinator.py
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, single worker only
+    fcntl = None
+
+class WriteCoordinator:
+    """
+    Cross-process write lock and change counter for one data directory
+
+    API workers are separate processes, each with its own in-memory view
+    of the file-backed indexes (NumPy store, BM25, manifests). Ingestion
+    holds an exclusive flock on `write.lock` from before it loads the
+    latest files until after it has flushed its own, so writers in
+    different workers never overwrite each other. Within a process, a
+    re-entrant thread lock serializes writers, since threads share the
+    in-memory indexes; the flock only excludes other processes.
+
+    Every change is published by bumping the integer in `version`. Readers
+    compare it before each query (one small file read) and reload what
+    changed; answer caches key on it, so they invalidate across workers.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock_path = os.path.join(directory, "write.lock")
+        self._version_path = os.path.join(directory, "version")
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._lock_file = None
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        """Exclusive between threads and processes, re-entrant within a thread"""
+        with self._thread_lock:
+            if self._depth == 0 and fcntl is not None:
+                lock_file = open(self._lock_path, "a+")
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+            self._depth += 1
+            
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def version(self) -> int:
+        """Current collection version (0 before the first write)"""
+        try:
+            with open(self._version_path, "r", encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """Publish a change and return the new version"""
+        with self.write_lock():
+            version = self.version() + 1
+            tmp_path = f"{self._version_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(version))
+            os.replace(tmp_path, self._version_path)
+            return version
@@ -0,0 +1,255 @@
+# app/embeddings/embedding_cache.py
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from utils.logger import logger
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different texts share a cache entry"""
+    return " ".join(text.split())
+
+class EmbeddingCache:
+    """
+    Persistent, size-bounded (LRU) embedding cache stored in SQLite
+    
+    Lookups are read-only: access times of hits are collected in memory
+    and written in one batch when entries are added (just before eviction
+    needs them), every `touch_interval` seconds, or on close, so a cache
+    hit never costs a write transaction.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 200_000, touch_interval: float = 60.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> last access time not yet written (see _write_touches)
+        self._touched: Dict[str, float] = {}
+        self._touches_written_at = time.monotonic()
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access "
+            "ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        
+        logger.info(f"🗃️  Embedding cache at: {path} (max {max_entries} entries)")
+    
+    @staticmethod
+    def make_key(provider: str, model: str, kind: str, text: str) -> str:
+        """Content-addressed key: (provider, model, kind, normalized text hash)"""
+        payload = "\x00".join([provider, model, kind, normalize_text(text)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors
+        
+        Args:
+            keys: Cache keys from make_key
+            
+        Returns:
+            Dict of key -> vector for every key that was found
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        
+        with self._lock:
+            for start in range(0, len(unique_keys), _SQL_BATCH):
+                batch = unique_keys[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+                    
+            now = time.time()
+            for key in found:
+                self._touched[key] = now
+            if time.monotonic() - self._touches_written_at >= self.touch_interval:
+                self._write_touches()
+                self._conn.commit()
+                
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+            
+        return found
+    
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Store vectors and evict least recently used entries above max_entries"""
+        if not items:
+            return
+            
+        now = time.time()
+        rows = [
+            (key, array("f", vector).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        
+        with self._lock:
+            self._write_touches()  # Evict by up-to-date access times
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) "
+                "VALUES (?, ?, ?)",
+                rows
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+    
+    def _write_touches(self) -> None:
+        """Write pending access times (caller holds the lock and commits)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+        self._touches_written_at = time.monotonic()
+    
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+    
+    def clear(self) -> None:
+        """Remove all cached vectors"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._conn.close()
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only calls the model for texts not in the cache"""
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        provider: str,
+        model: str
+    ):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.provider = provider
+        self.model = model
+    
+    def _keys(self, texts: List[str], kind: str) -> List[str]:
+        return [
+            EmbeddingCache.make_key(self.provider, self.model, kind, text)
+            for text in texts
+        ]
+    
+    def _split(self, texts: List[str], kind: str):
+        """Return keys, cached vectors and the texts that still need embedding"""
+        keys = self._keys(texts, kind)
+        cached = self.cache.get_many(keys)
+        
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+                
+        return keys, cached, missing
+    
+    def _merge(
+        self,
+        keys: List[str],
+        cached: Dict[str, List[float]],
+        missing: Dict[str, str],
+        vectors: Optional[List[List[float]]]
+    ) -> List[List[float]]:
+        if missing:
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(computed)
+            cached = {**cached, **computed}
+            logger.debug(
+                f"🗃️  Embedding cache: {len(keys) - len(missing)} hits, "
+                f"{len(missing)} misses"
+            )
+        return [cached[key] for key in keys]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._split(texts, "document")
+        vectors = (
+            self.embeddings.embed_documents(list(missing.values()))
+            if missing else None
+        )
+        return self._merge(keys, cached, missing, vectors)
+    
+    def embed_query(self, text: str) -> List[float]:
+        keys, cached, missing = self._split([text], "query")
+        vectors = [self.embeddings.embed_query(text)] if missing else None
+        return self._merge(keys, cached, missing, vectors)[0]
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed many queries with one model call (cached as queries)"""
+        keys, cached, missing = self._split(texts, "query")
+        vectors = (
+            self.embeddings.embed_documents(list(missing.values()))
+            if missing else None
+        )
+        return self._merge(keys, cached, missing, vectors)
+    
+    # SQLite lookups and writes run in a worker thread, off the event loop
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = await asyncio.to_thread(self._split, texts, "document")
+        vectors = (
+            await self.embeddings.aembed_documents(list(missing.values()))
+            if missing else None
+        )
+        return await asyncio.to_thread(self._merge, keys, cached, missing, vectors)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, cached, missing = await asyncio.to_thread(self._split, [text], "query")
+        vectors = [await self.embeddings.aembed_query(text)] if missing else None
+        return (await asyncio.to_thread(self._merge, keys, cached, missing, vectors))[0]
@@ -1,12 +1,17 @@
 # app/embeddings/embedding_factory.py
 
-from langchain_ollama import OllamaEmbeddings
-from langchain_openai import OpenAIEmbeddings
+from app.clients import get_client_registry
+from app.embeddings.embedding_cache import EmbeddingCache, CachedEmbeddings
 from utils.config_loader import config
 from utils.logger import logger
 
 class EmbeddingFactory:
-    """Factory to create embeddings based on configuration"""
+    """
+    Factory to create embeddings based on configuration
+    
+    Provider packages are imported in their branch, so only the configured
+    provider is loaded (langchain_openai alone takes about a second).
+    """
     
     @staticmethod
     def create_embeddings():
@@ -16,16 +21,21 @@ class EmbeddingFactory:
         logger.info(f"🔧 Initializing embeddings with provider: {provider}")
         
         if provider == "ollama":
+            from langchain_ollama import OllamaEmbeddings
+            
             model = config.get('embeddings', 'ollama', 'model')
             base_url = config.get('embeddings', 'ollama', 'base_url')
             
             logger.info(f"📦 Using Ollama embedding model: {model}")
-            return OllamaEmbeddings(
+            embeddings = OllamaEmbeddings(
                 model=model,
-                base_url=base_url
+                base_url=base_url,
+                client_kwargs=get_client_registry().ollama_client_kwargs()
             )
         
         elif provider == "openai":
+            from langchain_openai import OpenAIEmbeddings
+            
             model = config.get('embeddings', 'openai', 'model')
             api_key = config.get('embeddings', 'openai', 'api_key')
             
@@ -33,15 +43,57 @@ class EmbeddingFactory:
                 raise ValueError("⚠️ OpenAI API key not set in environment!")
             
             logger.info(f"📦 Using OpenAI embedding model: {model}")
-            return OpenAIEmbeddings(
+            registry = get_client_registry()
+            embeddings = OpenAIEmbeddings(
                 model=model,
-                openai_api_key=api_key
+                openai_api_key=api_key,
+                http_client=registry.http_client(),
+                http_async_client=registry.async_http_client()
             )
         
+        elif provider == "fake":
+            # Deterministic local stand-in for benchmarks and tests (no network)
+            from langchain_core.embeddings import DeterministicFakeEmbedding
+            
+            size = config.get('embeddings', 'fake', 'size', default=768)
+            model = f"fake-{size}"
+            
+            logger.info(f"📦 Using deterministic fake embeddings ({size} dims)")
+            embeddings = DeterministicFakeEmbedding(size=size)
+        
         else:
             raise ValueError(f"❌ Unknown embedding provider: {provider}")
+        
+        return EmbeddingFactory._with_cache(embeddings, provider, model)
+    
+    @staticmethod
+    def _with_cache(embeddings, provider: str, model: str):
+        """Wrap embeddings with the persistent cache if enabled in config"""
+        if not config.get('embeddings', 'cache', 'enabled', default=False):
+            return embeddings
+        
+        cache = get_embedding_cache()
+        logger.info("🗃️  Embedding cache enabled")
+        return CachedEmbeddings(embeddings, cache, provider=provider, model=model)
+
+# Shared cache instance
+_embedding_cache = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the embedding cache (singleton pattern)"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            path=config.get(
+                'embeddings', 'cache', 'path',
+                default="./data/embedding_cache/embeddings.sqlite"
+            ),
+            max_entries=config.get('embeddings', 'cache', 'max_entries', default=200000),
+            touch_interval=config.get('embeddings', 'cache', 'touch_interval', default=60)
+        )
+    return _embedding_cache
 
 # Convenience function
 def get_embeddings():
-    """Get embeddings instance"""
-    return EmbeddingFactory.create_embeddings()
\ No newline at end of file
+    """Get the shared embeddings instance"""
+    return get_client_registry().get("embeddings", EmbeddingFactory.create_embeddings)
\ No newline at end of file
@@ -0,0 +1,63 @@
+# app/embeddings/manifest.py
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import List
+from langchain_core.documents import Document
+from utils.logger import logger
+
+def chunk_id(document: Document) -> str:
+    """
+    Deterministic chunk ID derived from (source, page, content hash)
+    
+    Re-ingesting an unchanged chunk yields the same ID, so writes become
+    upserts instead of duplicates.
+    """
+    content_hash = hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+    source = str(document.metadata.get("source", ""))
+    page = str(document.metadata.get("page", ""))
+    key = "\x00".join([source, page, content_hash])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+class DocumentManifest:
+    """Per-source record of the chunk IDs currently stored in the vector store"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, source: str) -> str:
+        name = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+    
+    def load(self, source: str) -> List[str]:
+        """Chunk IDs recorded for a source (empty if never ingested)"""
+        path = self._path(source)
+        if not os.path.exists(path):
+            return []
+            
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("chunk_ids", [])
+    
+    def save(self, source: str, ids: List[str]) -> None:
+        """Atomically replace the manifest of a source"""
+        path = self._path(source)
+        tmp_path = f"{path}.tmp"
+        
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "source": source,
+                "chunk_ids": ids,
+                "updated_at": datetime.utcnow().isoformat()
+            }, f)
+        os.replace(tmp_path, path)
+        
+        logger.info(f"🧾 Manifest updated for {source}: {len(ids)} chunks")
+    
+    def delete(self, source: str) -> None:
+        """Forget a source"""
+        path = self._path(source)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,126 @@
+# app/embeddings/metadata_filter.py
+
+"""
+Structured metadata filters shared by all vector store backends
+
+A filter maps metadata keys to a value (equality) or to a dict of
+operators, and every condition must hold:
+
+    {
+        "source": "paper.pdf",
+        "category": {"$in": ["Title", "NarrativeText"]},
+        "page_end": {"$gte": 3},
+        "page_start": {"$lte": 7},
+        "uploaded_at": {"$gte": 1767225600}
+    }
+
+The operators are Chroma's, so a filter maps 1:1 onto a Chroma where
+clause; pgvector evaluates it in SQL and the NumPy store against its
+column index, so no backend over-fetches and filters in Python.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+OPERATORS = ("$eq", "$in", "$gt", "$gte", "$lt", "$lte")
+
+def normalize_filter(filter: Optional[Dict]) -> List[Tuple[str, str, Any]]:
+    """
+    Flatten a filter into (key, operator, value) clauses
+    
+    Raises:
+        ValueError: On unknown operators or malformed values
+    """
+    clauses = []
+    for key, condition in (filter or {}).items():
+        if not isinstance(condition, dict):
+            clauses.append((key, "$eq", condition))
+            continue
+            
+        for op, value in condition.items():
+            if op not in OPERATORS:
+                raise ValueError(f"❌ Unsupported filter operator for {key}: {op}")
+            if op == "$in" and not isinstance(value, (list, tuple)):
+                raise ValueError(f"❌ $in for {key} needs a list of values")
+            clauses.append((key, op, list(value) if op == "$in" else value))
+    return clauses
+
+def _compare(actual: Any, op: str, value: Any) -> bool:
+    if op == "$eq":
+        return actual == value
+    if op == "$in":
+        return actual in value
+    if actual is None or isinstance(actual, str) != isinstance(value, str):
+        return False
+    if op == "$gt":
+        return actual > value
+    if op == "$gte":
+        return actual >= value
+    if op == "$lt":
+        return actual < value
+    return actual <= value
+
+def matches(metadata: Dict, filter: Optional[Dict]) -> bool:
+    """Evaluate a filter against one metadata dict (e.g. for the BM25 index)"""
+    return all(
+        _compare(metadata.get(key), op, value)
+        for key, op, value in normalize_filter(filter)
+    )
+
+def to_chroma_where(filter: Optional[Dict]) -> Optional[Dict]:
+    """Translate a filter into a Chroma where clause"""
+    clauses = [{key: {op: value}} for key, op, value in normalize_filter(filter)]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def filter_key(filter: Optional[Dict]) -> str:
+    """Canonical string form of a filter (for cache keys)"""
+    return json.dumps(filter or {}, sort_keys=True, default=str)
+
+def _epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def build_filter(
+    source: Union[str, List[str], None] = None,
+    page_from: Optional[int] = None,
+    page_to: Optional[int] = None,
+    category: Union[str, List[str], None] = None,
+    uploaded_after: Optional[datetime] = None,
+    uploaded_before: Optional[datetime] = None
+) -> Optional[Dict]:
+    """
+    Build a filter from user-facing query options
+    
+    Page ranges select chunks that overlap [page_from, page_to] (chunks
+    may span pages, see page_start/page_end). Upload dates are stored as
+    epoch seconds in `uploaded_at`; naive datetimes are taken as UTC.
+    
+    Returns:
+        Filter dict, or None if no option is set
+    """
+    filter: Dict[str, Any] = {}
+    
+    for key, value in (("source", source), ("category", category)):
+        if isinstance(value, (list, tuple)):
+            filter[key] = {"$in": list(value)}
+        elif value is not None:
+            filter[key] = value
+            
+    if page_from is not None:
+        filter["page_end"] = {"$gte": page_from}
+    if page_to is not None:
+        filter["page_start"] = {"$lte": page_to}
+        
+    uploaded = {}
+    if uploaded_after is not None:
+        uploaded["$gte"] = _epoch(uploaded_after)
+    if uploaded_before is not None:
+        uploaded["$lte"] = _epoch(uploaded_before)
+    if uploaded:
+        filter["uploaded_at"] = uploaded
+        
+    return filter or None
@@ -0,0 +1,512 @@
+# app/embeddings/numpy_store.py
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from app.embeddings.metadata_filter import normalize_filter
+from utils.logger import logger
+
+_NUMPY_COMPARISONS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal
+}
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class NumpyVectorStore:
+    """
+    In-process vector index backed by a NumPy matrix
+    
+    Embeddings are stored L2-normalized in a float32 (or float16) .npy file
+    that is memory-mapped at startup, with ids, texts and metadata in a JSON
+    side table. Search is a brute-force matrix-vector product processed in
+    blocks, with top-k selected by argpartition.
+    
+    Scores are squared L2 distances between normalized vectors (2 - 2*cos),
+    the same scale Chroma reports, so score thresholds keep their meaning.
+    
+    Metadata filters are evaluated against per-key columns (float arrays
+    for numeric keys, category codes otherwise) built on first use after
+    a write, so a filter costs a few vectorized comparisons instead of a
+    Python loop over every chunk.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        dtype: str = "float32",
+        block_size: int = 65536
+    ):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self._vectors_path = os.path.join(directory, "vectors.npy")
+        self._table_path = os.path.join(directory, "metadata.json")
+        self._lock = threading.RLock()
+        self._dirty = False
+        
+        self._matrix: Optional[np.ndarray] = None
+        self._count = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        # (mtime, size) of the files last loaded or saved (see reload)
+        self._signature: Optional[Tuple] = None
+        # Secondary metadata index: key -> column (see _column)
+        self._columns: Dict[str, Tuple] = {}
+        # Optional ANN index (see app/embeddings/ann_index.py); exact search if None
+        self.ann = None
+        
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+    
+    def _load(self) -> bool:
+        """
+        Memory-map a previously saved index (zero-copy until first write)
+        
+        Returns:
+            False if the files were caught mid-replacement (state unchanged)
+        """
+        if not (os.path.exists(self._vectors_path) and os.path.exists(self._table_path)):
+            return True
+            
+        signature = self._file_signature()
+        with open(self._table_path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        matrix = np.load(self._vectors_path, mmap_mode="r")
+        
+        # flush replaces the vectors before the table; another process may be in between
+        if len(matrix) != len(table["ids"]):
+            logger.warning("⚠️ NumPy index is being rewritten, keeping the loaded version")
+            return False
+            
+        self._signature = signature
+        self._matrix = matrix
+        self._ids = table["ids"]
+        self._texts = table["documents"]
+        self._metadatas = table["metadatas"]
+        self._count = len(self._ids)
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        
+        self._columns.clear()
+        
+        logger.info(f"📂 Loaded NumPy index with {self._count} vectors ({self._matrix.dtype})")
+        return True
+    
+    def _file_signature(self) -> Optional[Tuple]:
+        """(mtime, size) of the saved files, or None if there are none yet"""
+        try:
+            return tuple(
+                (stat.st_mtime_ns, stat.st_size)
+                for stat in (os.stat(self._vectors_path), os.stat(self._table_path))
+            )
+        except FileNotFoundError:
+            return None
+    
+    def reload(self) -> bool:
+        """
+        Re-read the saved index if another process has replaced it
+        
+        Returns:
+            True if the in-memory index is up to date with the saved files
+        """
+        with self._lock:
+            if self._dirty or self._file_signature() == self._signature:
+                return True
+            return self._load()
+    
+    def _reserve(self, dim: int, rows: int) -> None:
+        """Ensure a writable matrix with capacity for `rows` vectors (lock held)"""
+        if self._matrix is None or self._count == 0:
+            self._matrix = np.zeros((max(rows, 1024), dim), dtype=self.dtype)
+            return
+            
+        if self._matrix.shape[1] != dim:
+            raise ValueError(
+                f"❌ Embedding dimension {dim} does not match index dimension "
+                f"{self._matrix.shape[1]}"
+            )
+            
+        capacity = self._matrix.shape[0]
+        if rows <= capacity and self._matrix.flags.writeable:
+            return
+            
+        # Grow geometrically; this also copies a read-only memmap into RAM
+        new_capacity = max(rows, capacity * 2 if rows > capacity else capacity)
+        matrix = np.zeros((new_capacity, dim), dtype=self.dtype)
+        matrix[:self._count] = self._matrix[:self._count]
+        self._matrix = matrix
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+    
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Optional[Dict]]
+    ) -> None:
+        """Insert or replace vectors with their text and metadata"""
+        if not ids:
+            return
+            
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        
+        with self._lock:
+            new_rows = sum(1 for doc_id in set(ids) if doc_id not in self._rows)
+            self._reserve(vectors.shape[1], self._count + new_rows)
+            
+            for doc_id, vector, text, metadata in zip(ids, vectors, documents, metadatas):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._count
+                    self._rows[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._metadatas.append(metadata or {})
+                    self._count += 1
+                else:
+                    self._texts[row] = text
+                    self._metadatas[row] = metadata or {}
+                self._matrix[row] = vector
+                
+            if self.ann is not None:
+                self.ann.add(ids, vectors)
+            self._columns.clear()
+            self._dirty = True
+    
+    def delete(self, ids: List[str]) -> None:
+        """Remove vectors by ID (the last row is moved into each freed slot)"""
+        with self._lock:
+            doomed = [doc_id for doc_id in dict.fromkeys(ids) if doc_id in self._rows]
+            if not doomed:
+                return
+                
+            self._reserve(self._matrix.shape[1], self._count)
+            for doc_id in doomed:
+                row = self._rows.pop(doc_id)
+                last = self._count - 1
+                
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved_id
+                    self._texts[row] = self._texts[last]
+                    self._metadatas[row] = self._metadatas[last]
+                    self._rows[moved_id] = row
+                    
+                self._ids.pop()
+                self._texts.pop()
+                self._metadatas.pop()
+                self._count -= 1
+                
+            if self.ann is not None:
+                self.ann.delete(doomed)
+            self._columns.clear()
+            self._dirty = True
+    
+    def get_ids(self, ids: List[str]) -> List[str]:
+        """Subset of ids that are present in the index"""
+        with self._lock:
+            return [doc_id for doc_id in ids if doc_id in self._rows]
+    
+    def get_all(self) -> Tuple[List[str], List[Document]]:
+        """All (ids, documents) in the index"""
+        with self._lock:
+            ids = list(self._ids)
+            documents = [
+                Document(page_content=text, metadata=dict(metadata), id=doc_id)
+                for doc_id, text, metadata in zip(ids, self._texts, self._metadatas)
+            ]
+        return ids, documents
+    
+    def search(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Exact top-k search by cosine similarity
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            List of (Document, distance) tuples, closest first
+        """
+        return self.search_within(embedding, k, None, filter)[0]
+    
+    def search_within(
+        self,
+        embedding: List[float],
+        k: int,
+        max_distance: Optional[float],
+        filter: Optional[Dict] = None
+    ) -> Tuple[List[Tuple[Document, float]], int]:
+        """
+        Top-k search that only returns results within max_distance
+        
+        The threshold is applied inside the block scan (as a minimum cosine
+        similarity), so rows out of range are never ranked or materialized.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of candidates to consider
+            max_distance: Largest distance to return (None for no limit)
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            ((Document, distance) tuples closest first, number of candidates
+            the index produced before the distance cut)
+        """
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        # distance = 2 - 2*cos, so distance <= max_distance <=> cos >= 1 - max_distance/2
+        min_score = -np.inf if max_distance is None else 1.0 - max_distance / 2.0
+        
+        with self._lock:
+            if self._count == 0 or k <= 0:
+                return [], 0
+                
+            if self.ann is not None and not filter:
+                candidates = [
+                    (doc_id, distance)
+                    for doc_id, distance in self.ann.search(query, k)
+                    if doc_id in self._rows
+                ]
+                return [
+                    (self._document(self._rows[doc_id]), distance)
+                    for doc_id, distance in candidates
+                    if max_distance is None or distance <= max_distance
+                ], len(candidates)
+                
+            rows = self._filter_rows(filter) if filter else None
+            total = self._count if rows is None else len(rows)
+            
+            best_rows = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float32)
+            
+            for start in range(0, total, self.block_size):
+                stop = min(start + self.block_size, total)
+                if rows is None:
+                    block_rows = np.arange(start, stop)
+                    block = self._matrix[start:stop]
+                else:
+                    block_rows = rows[start:stop]
+                    block = self._matrix[block_rows]
+                scores = block.astype(np.float32, copy=False) @ query
+                if max_distance is not None:
+                    in_range = np.flatnonzero(scores >= min_score)
+                    block_rows, scores = block_rows[in_range], scores[in_range]
+                    
+                if len(scores) > k:
+                    top = np.argpartition(scores, -k)[-k:]
+                else:
+                    top = np.arange(len(scores))
+                    
+                best_rows = np.concatenate([best_rows, block_rows[top]])
+                best_scores = np.concatenate([best_scores, scores[top]])
+                
+                if len(best_scores) > k:
+                    keep = np.argpartition(best_scores, -k)[-k:]
+                    best_rows, best_scores = best_rows[keep], best_scores[keep]
+                    
+            order = np.argsort(-best_scores)
+            return [
+                (self._document(row), float(max(0.0, 2.0 - 2.0 * score)))
+                for row, score in zip(best_rows[order], best_scores[order])
+            ], min(k, total)
+    
+    def search_batch(
+        self,
+        embeddings: List[List[float]],
+        k: int,
+        filter: Optional[Dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Exact top-k search for many queries with one matrix-matrix product
+        
+        Filtered batches and the ANN index are searched query by query.
+        
+        Args:
+            embeddings: Query embeddings
+            k: Number of results per query
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            One list of (Document, distance) tuples per query
+        """
+        if self.ann is not None or filter:
+            return [self.search(embedding, k, filter) for embedding in embeddings]
+            
+        queries = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        
+        with self._lock:
+            if self._count == 0 or k <= 0 or len(queries) == 0:
+                return [[] for _ in embeddings]
+                
+            n_queries = len(queries)
+            best_rows = np.empty((n_queries, 0), dtype=np.int64)
+            best_scores = np.empty((n_queries, 0), dtype=np.float32)
+            
+            for start in range(0, self._count, self.block_size):
+                stop = min(start + self.block_size, self._count)
+                scores = queries @ self._matrix[start:stop].astype(np.float32, copy=False).T
+                
+                if scores.shape[1] > k:
+                    top = np.argpartition(scores, -k, axis=1)[:, -k:]
+                else:
+                    top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+                    
+                best_rows = np.concatenate([best_rows, top + start], axis=1)
+                best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+                
+                if best_scores.shape[1] > k:
+                    keep = np.argpartition(best_scores, -k, axis=1)[:, -k:]
+                    best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                    best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                    
+            order = np.argsort(-best_scores, axis=1)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            return [
+                [
+                    (self._document(row), float(max(0.0, 2.0 - 2.0 * score)))
+                    for row, score in zip(rows, scores)
+                ]
+                for rows, scores in zip(best_rows, best_scores)
+            ]
+    
+    def _column(self, key: str) -> Tuple:
+        """
+        Column of one metadata key (lock held, cached until the next write)
+        
+        Returns:
+            ("num", float array with NaN for missing values) if every value
+            is numeric, else ("cat", int codes with -1 for missing, value -> code)
+        """
+        column = self._columns.get(key)
+        if column is not None:
+            return column
+            
+        values = [metadata.get(key) for metadata in self._metadatas]
+        if all(value is None or _is_number(value) for value in values):
+            column = ("num", np.array([np.nan if v is None else v for v in values], dtype=np.float64))
+        else:
+            codes: Dict = {}
+            data = np.array(
+                [-1 if v is None else codes.setdefault(v, len(codes)) for v in values],
+                dtype=np.int64
+            )
+            column = ("cat", data, codes)
+            
+        self._columns[key] = column
+        return column
+    
+    def _filter_rows(self, filter: Dict) -> np.ndarray:
+        """Rows whose metadata matches the filter (lock held)"""
+        mask = np.ones(self._count, dtype=bool)
+        
+        for key, op, value in normalize_filter(filter):
+            column = self._column(key)
+            targets = [value] if op == "$eq" else value
+            
+            if column[0] == "num":
+                data = column[1]
+                if op in ("$eq", "$in"):
+                    mask &= np.isin(data, [v for v in targets if _is_number(v)])
+                elif not _is_number(value):
+                    mask[:] = False
+                else:
+                    with np.errstate(invalid="ignore"):  # NaN (missing) never matches
+                        mask &= _NUMPY_COMPARISONS[op](data, value)
+            else:
+                _, data, codes = column
+                if op in ("$eq", "$in"):
+                    wanted = [codes[v] for v in targets if v in codes]
+                else:
+                    # Range over non-numeric values (e.g. ISO dates): test each distinct value once
+                    wanted = [
+                        code for v, code in codes.items()
+                        if isinstance(v, type(value)) and _NUMPY_COMPARISONS[op](v, value)
+                    ]
+                mask &= np.isin(data, wanted)
+                
+        return np.flatnonzero(mask)
+    
+    def _document(self, row: int) -> Document:
+        """Document stored at a row (lock held)"""
+        return Document(
+            page_content=self._texts[row],
+            metadata=dict(self._metadatas[row]),
+            id=self._ids[row]
+        )
+    
+    def distances(self, embedding: List[float], ids: List[str]) -> Dict[str, float]:
+        """Distances (2 - 2*cos) from a query to the given chunks (unknown ids are skipped)"""
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        
+        with self._lock:
+            known = [doc_id for doc_id in ids if doc_id in self._rows]
+            if not known:
+                return {}
+            rows = [self._rows[doc_id] for doc_id in known]
+            scores = self._matrix[rows].astype(np.float32, copy=False) @ query
+        return {
+            doc_id: float(max(0.0, 2.0 - 2.0 * score))
+            for doc_id, score in zip(known, scores)
+        }
+    
+    def vectors(self) -> Tuple[List[str], np.ndarray]:
+        """Snapshot of (ids, normalized float32 vectors), e.g. to build an ANN index"""
+        with self._lock:
+            if self._matrix is None:
+                return [], np.zeros((0, 0), dtype=np.float32)
+            return list(self._ids), np.array(self._matrix[:self._count], dtype=np.float32)
+    
+    def count(self) -> int:
+        """Number of stored vectors"""
+        return self._count
+    
+    def flush(self) -> None:
+        """Atomically persist vectors and the metadata table if changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+                
+            vectors_tmp = f"{self._vectors_path}.tmp.npy"
+            table_tmp = f"{self._table_path}.tmp"
+            
+            if self._matrix is None:
+                matrix = np.zeros((0, 0), dtype=self.dtype)
+            else:
+                matrix = np.ascontiguousarray(self._matrix[:self._count])
+            np.save(vectors_tmp, matrix)
+            with open(table_tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "ids": self._ids,
+                    "documents": self._texts,
+                    "metadatas": self._metadatas
+                }, f)
+                
+            os.replace(vectors_tmp, self._vectors_path)
+            os.replace(table_tmp, self._table_path)
+            self._signature = self._file_signature()
+            self._dirty = False
+            
+            if self.ann is not None:
+                self.ann.save()
+                
+        logger.info(f"💾 Saved NumPy index ({self._count} vectors)")
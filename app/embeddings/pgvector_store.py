@@ -0,0 +1,430 @@
+# app/embeddings/pgvector_store.py
+
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.embeddings.metadata_filter import normalize_filter
+from utils.logger import logger
+
+try:
+    from psycopg import sql
+    from psycopg_pool import ConnectionPool
+except ImportError:  # Optional dependency, only needed for provider "pgvector"
+    sql = None
+    ConnectionPool = None
+
+# Metadata keys with a btree expression index for range filters
+RANGE_INDEXED_KEYS = ("page_start", "page_end", "uploaded_at")
+
+_SQL_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+def _vector_literal(vector: List[float]) -> str:
+    """Text representation accepted by the pgvector `vector` type"""
+    return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+class PgVectorStore:
+    """
+    Postgres + pgvector backend with a pooled connection manager
+    
+    Chunks live in one table per collection (id, embedding, document,
+    metadata JSONB). Ingestion stages rows with COPY and upserts them in a
+    single statement; searches order by L2 distance so the HNSW/IVFFlat
+    index is used, and metadata filters are evaluated in SQL (equality via
+    the GIN index, ranges via btree indexes on RANGE_INDEXED_KEYS).
+    
+    Scores are squared L2 distances, the same scale Chroma reports.
+    """
+    
+    def __init__(
+        self,
+        connection_string: str,
+        collection_name: str,
+        index_type: str = "hnsw",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        hnsw_ef_search: int = 40,
+        ivfflat_lists: int = 100,
+        ivfflat_probes: int = 10,
+        min_connections: int = 1,
+        max_connections: int = 10
+    ):
+        if ConnectionPool is None:
+            raise ImportError(
+                "❌ The pgvector backend requires psycopg: "
+                "pip install 'psycopg[binary]' psycopg_pool"
+            )
+        if not connection_string or connection_string.startswith("${"):
+            raise ValueError(
+                "❌ pgvector connection string is not configured "
+                "(set POSTGRES_CONNECTION_STRING)"
+            )
+        if index_type not in ("hnsw", "ivfflat", "none"):
+            raise ValueError(f"❌ Unsupported pgvector index type: {index_type}")
+            
+        self.collection_name = collection_name
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_lists = ivfflat_lists
+        self.ivfflat_probes = ivfflat_probes
+        self._table = sql.Identifier(collection_name)
+        self._dimension: Optional[int] = None
+        
+        self.pool = ConnectionPool(
+            connection_string,
+            min_size=min_connections,
+            max_size=max_connections,
+            open=True
+        )
+        self._setup()
+    
+    def _setup(self) -> None:
+        """Enable the extension and pick up the dimension of an existing table"""
+        with self.pool.connection() as conn:
+            conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            
+        if self._has_table():
+            self._create_metadata_indexes()
+            logger.info(f"🐘 Using pgvector table {self.collection_name} ({self._dimension} dims)")
+    
+    def _has_table(self) -> bool:
+        """
+        Whether the collection table exists (caches its dimension)
+        
+        Re-checked on every call until the table is found, since another
+        API worker may create it with its first write.
+        """
+        if self._dimension is None:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT atttypmod FROM pg_attribute "
+                    "WHERE attrelid = to_regclass(%s) AND attname = 'embedding'",
+                    (self._table.as_string(conn),)
+                ).fetchone()
+            if row is not None:
+                self._dimension = row[0]
+        return self._dimension is not None
+    
+    def _ensure_table(self, dimension: int) -> None:
+        """Create the table and its indexes on the first write"""
+        if self._has_table():
+            if self._dimension != dimension:
+                raise ValueError(
+                    f"❌ Embedding dimension {dimension} does not match table "
+                    f"dimension {self._dimension}"
+                )
+            return
+            
+        with self.pool.connection() as conn:
+            conn.execute(sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} ("
+                "id TEXT PRIMARY KEY, "
+                "embedding vector({}) NOT NULL, "
+                "document TEXT, "
+                "metadata JSONB NOT NULL DEFAULT '{{}}')"
+            ).format(self._table, sql.Literal(dimension)))
+            
+        self._create_metadata_indexes()
+        self._dimension = dimension
+        logger.info(f"🐘 Created pgvector table {self.collection_name} ({dimension} dims)")
+        
+        # HNSW builds incrementally; IVFFlat waits for data (see flush)
+        if self.index_type == "hnsw":
+            self.create_index()
+    
+    def _create_metadata_indexes(self) -> None:
+        """GIN index for containment (equality) filters, btree indexes for ranges"""
+        with self.pool.connection() as conn:
+            conn.execute(sql.SQL(
+                "CREATE INDEX IF NOT EXISTS {} ON {} USING gin (metadata jsonb_path_ops)"
+            ).format(sql.Identifier(f"{self.collection_name}_metadata_idx"), self._table))
+            for key in RANGE_INDEXED_KEYS:
+                conn.execute(sql.SQL(
+                    "CREATE INDEX IF NOT EXISTS {} ON {} ((metadata -> {}))"
+                ).format(
+                    sql.Identifier(f"{self.collection_name}_{key}_idx"),
+                    self._table,
+                    sql.Literal(key)
+                ))
+    
+    def create_index(self) -> None:
+        """Create the configured ANN index if it does not exist yet"""
+        if self.index_type == "none" or not self._has_table():
+            return
+            
+        name = sql.Identifier(f"{self.collection_name}_embedding_{self.index_type}")
+        if self.index_type == "hnsw":
+            statement = sql.SQL(
+                "CREATE INDEX IF NOT EXISTS {} ON {} USING hnsw (embedding vector_l2_ops) "
+                "WITH (m = {}, ef_construction = {})"
+            ).format(
+                name,
+                self._table,
+                sql.Literal(self.hnsw_m),
+                sql.Literal(self.hnsw_ef_construction)
+            )
+        else:
+            statement = sql.SQL(
+                "CREATE INDEX IF NOT EXISTS {} ON {} USING ivfflat (embedding vector_l2_ops) "
+                "WITH (lists = {})"
+            ).format(name, self._table, sql.Literal(self.ivfflat_lists))
+            
+        with self.pool.connection() as conn:
+            conn.execute(statement)
+            
+        logger.info(f"🐘 Ensured {self.index_type} index on {self.collection_name}")
+    
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Optional[Dict]]
+    ) -> None:
+        """Bulk insert or replace rows via COPY into a staging table"""
+        if not ids:
+            return
+            
+        self._ensure_table(len(embeddings[0]))
+        
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL(
+                    "CREATE TEMP TABLE staging (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+                ).format(self._table))
+                
+                with cur.copy("COPY staging (id, embedding, document, metadata) FROM STDIN") as copy:
+                    for doc_id, vector, text, metadata in zip(ids, embeddings, documents, metadatas):
+                        copy.write_row((
+                            doc_id,
+                            _vector_literal(vector),
+                            text,
+                            json.dumps(metadata or {})
+                        ))
+                        
+                cur.execute(sql.SQL(
+                    "INSERT INTO {} (id, embedding, document, metadata) "
+                    "SELECT DISTINCT ON (id) id, embedding, document, metadata FROM staging "
+                    "ON CONFLICT (id) DO UPDATE SET "
+                    "embedding = EXCLUDED.embedding, "
+                    "document = EXCLUDED.document, "
+                    "metadata = EXCLUDED.metadata"
+                ).format(self._table))
+    
+    def delete(self, ids: List[str]) -> None:
+        """Remove rows by ID"""
+        if not ids or not self._has_table():
+            return
+            
+        with self.pool.connection() as conn:
+            conn.execute(
+                sql.SQL("DELETE FROM {} WHERE id = ANY(%s)").format(self._table),
+                (list(ids),)
+            )
+    
+    def get_ids(self, ids: List[str]) -> List[str]:
+        """Subset of ids that are present in the table"""
+        if not ids or not self._has_table():
+            return []
+            
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                sql.SQL("SELECT id FROM {} WHERE id = ANY(%s)").format(self._table),
+                (list(ids),)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def get_all(self) -> Tuple[List[str], List[Document]]:
+        """All (ids, documents) in the table"""
+        if not self._has_table():
+            return [], []
+            
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                sql.SQL("SELECT id, document, metadata FROM {}").format(self._table)
+            ).fetchall()
+            
+        ids = [row[0] for row in rows]
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {}, id=doc_id)
+            for doc_id, text, metadata in rows
+        ]
+        return ids, documents
+    
+    def search(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Nearest-neighbour search with optional metadata filter
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            List of (Document, squared_l2_distance) tuples, closest first
+        """
+        if k <= 0 or not self._has_table():
+            return []
+            
+        where, where_params = self._where(filter)
+        query = sql.SQL(
+            "SELECT id, document, metadata, embedding <-> %s::vector AS distance "
+            "FROM {} {} ORDER BY distance LIMIT %s"
+        ).format(self._table, where)
+        
+        rows = self._execute_search(query, [_vector_literal(embedding), *where_params, k], k)
+        return [
+            (
+                Document(page_content=text or "", metadata=metadata or {}, id=doc_id),
+                float(distance) ** 2
+            )
+            for doc_id, text, metadata, distance in rows
+        ]
+    
+    def search_within(
+        self,
+        embedding: List[float],
+        k: int,
+        max_distance: Optional[float],
+        filter: Optional[Dict] = None
+    ) -> Tuple[List[Tuple[Document, float]], int]:
+        """
+        Top-k search that only returns results within max_distance
+        
+        The k nearest ids are ranked by the index first and joined back to
+        their text and metadata only when in range, so candidates past the
+        threshold cost a few bytes each instead of a whole chunk.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of candidates to consider
+            max_distance: Largest squared L2 distance to return (None for no limit)
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            ((Document, distance) tuples closest first, number of candidates
+            the index produced before the distance cut)
+        """
+        if max_distance is None:
+            results = self.search(embedding, k, filter=filter)
+            return results, len(results)
+            
+        if k <= 0 or not self._has_table():
+            return [], 0
+            
+        where, where_params = self._where(filter)
+        query = sql.SQL(
+            "WITH nearest AS ("
+            "SELECT id, embedding <-> %s::vector AS distance "
+            "FROM {} {} ORDER BY distance LIMIT %s) "
+            "SELECT nearest.id, chunk.document, chunk.metadata, nearest.distance "
+            "FROM nearest LEFT JOIN {} AS chunk "
+            "ON chunk.id = nearest.id AND nearest.distance <= %s "
+            "ORDER BY nearest.distance"
+        ).format(self._table, where, self._table)
+        
+        # The operator returns plain L2 distances; scores are squared
+        limit = math.sqrt(max(max_distance, 0.0))
+        rows = self._execute_search(
+            query,
+            [_vector_literal(embedding), *where_params, k, limit],
+            k
+        )
+        return [
+            (
+                Document(page_content=text or "", metadata=metadata or {}, id=doc_id),
+                float(distance) ** 2
+            )
+            for doc_id, text, metadata, distance in rows
+            if distance <= limit
+        ], len(rows)
+    
+    def _execute_search(self, query, params: List, k: int) -> List[Tuple]:
+        """Run a nearest-neighbour query with the index's search-time recall knobs"""
+        with self.pool.connection() as conn:
+            # Scoped to this transaction; HNSW never returns more than ef_search rows
+            if self.index_type == "hnsw":
+                conn.execute(sql.SQL("SET LOCAL hnsw.ef_search = {}").format(
+                    sql.Literal(max(self.hnsw_ef_search, k))
+                ))
+            elif self.index_type == "ivfflat":
+                conn.execute(sql.SQL("SET LOCAL ivfflat.probes = {}").format(
+                    sql.Literal(self.ivfflat_probes)
+                ))
+            return conn.execute(query, params).fetchall()
+    
+    @staticmethod
+    def _where(filter: Optional[Dict]) -> Tuple:
+        """
+        WHERE clause for a metadata filter
+        
+        Equalities are merged into one containment test (GIN index); ranges
+        compare jsonb values, which order numbers numerically, so they can
+        use the btree expression indexes.
+        
+        Returns:
+            (sql.Composable, params)
+        """
+        clauses = normalize_filter(filter)
+        if not clauses:
+            return sql.SQL(""), []
+            
+        conditions = []
+        params = []
+        equal = {key: value for key, op, value in clauses if op == "$eq"}
+        if equal:
+            conditions.append(sql.SQL("metadata @> %s::jsonb"))
+            params.append(json.dumps(equal))
+            
+        for key, op, value in clauses:
+            if op == "$in":
+                conditions.append(sql.SQL("metadata -> {} = ANY(%s::jsonb[])").format(sql.Literal(key)))
+                params.append([json.dumps(item) for item in value])
+            elif op != "$eq":
+                conditions.append(sql.SQL("metadata -> {} {} %s::jsonb").format(
+                    sql.Literal(key),
+                    sql.SQL(_SQL_OPERATORS[op])
+                ))
+                params.append(json.dumps(value))
+                
+        return sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions), params
+    
+    def distances(self, embedding: List[float], ids: List[str]) -> Dict[str, float]:
+        """Squared L2 distances from a query to the given rows (unknown ids are skipped)"""
+        if not ids or not self._has_table():
+            return {}
+            
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                sql.SQL(
+                    "SELECT id, embedding <-> %s::vector FROM {} WHERE id = ANY(%s)"
+                ).format(self._table),
+                (_vector_literal(embedding), list(ids))
+            ).fetchall()
+        return {doc_id: float(distance) ** 2 for doc_id, distance in rows}
+    
+    def count(self) -> int:
+        """Number of stored rows"""
+        if not self._has_table():
+            return 0
+            
+        with self.pool.connection() as conn:
+            return conn.execute(
+                sql.SQL("SELECT count(*) FROM {}").format(self._table)
+            ).fetchone()[0]
+    
+    def flush(self) -> None:
+        """Build a deferred IVFFlat index once there is enough data to train it"""
+        if self.index_type == "ivfflat" and self.count() >= self.ivfflat_lists:
+            self.create_index()
+    
+    def close(self) -> None:
+        """Close the connection pool"""
+        self.pool.close()
@@ -1,10 +1,23 @@
 # Placeholder
 # app/embeddings/vectorstore.py
 
-from typing import List
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 from langchain_core.documents import Document
-from langchain_chroma import Chroma
+from app.clients import get_client_registry
 from app.embeddings.embedding_factory import get_embeddings
+from app.embeddings.ann_index import HnswIndex
+from app.embeddings.coordinator import WriteCoordinator
+from app.embeddings.manifest import DocumentManifest, chunk_id
+from app.embeddings.metadata_filter import matches, to_chroma_where
+from app.embeddings.numpy_store import NumpyVectorStore
+from app.retriever.bm25_index import BM25Index
 from utils.config_loader import config
 from utils.logger import logger
 import os
@@ -15,60 +28,507 @@ class VectorStoreManager:
     def __init__(self):
         self.embeddings = get_embeddings()
         self.vectorstore = None
+        self.manifest = DocumentManifest(
+            config.get('vectorstore', 'manifest_directory', default="./data/manifests")
+        )
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # Serializes writers across API worker processes and publishes their changes
+        self.coordinator = WriteCoordinator(
+            config.get('server', 'state_directory', default="./data/state")
+        )
+        self._version = self.coordinator.version()
         self._initialize_vectorstore()
+        self.bm25_index = self._initialize_bm25_index()
+    
+    @property
+    def collection_version(self) -> int:
+        """Shared change counter, bumped by every write in any worker (cache invalidation)"""
+        return self.coordinator.version()
     
     def _initialize_vectorstore(self):
-        """Initialize ChromaDB vector store"""
+        """Initialize the configured vector store backend"""
         provider = config.get('vectorstore', 'provider')
+        self.provider = provider
         
+        # Backend packages are imported in their branch (chromadb alone takes ~0.7 s)
         if provider == "chroma":
-            persist_dir = config.get('vectorstore', 'chroma', 'persist_directory')
-            collection_name = config.get('vectorstore', 'chroma', 'collection_name')
+            import chromadb
+            from langchain_chroma import Chroma
             
-            # Create directory if it doesn't exist
-            os.makedirs(persist_dir, exist_ok=True)
+            collection_name = config.get('vectorstore', 'chroma', 'collection_name')
+            mode = config.get('vectorstore', 'chroma', 'mode', default="embedded")
             
-            logger.info(f"🗄️  Initializing ChromaDB at: {persist_dir}")
+            if mode == "http":
+                host = config.get('vectorstore', 'chroma', 'host', default="localhost")
+                port = config.get('vectorstore', 'chroma', 'port', default=8001)
+                
+                logger.info(f"🗄️  Connecting to Chroma server at: {host}:{port}")
+                client = chromadb.HttpClient(host=host, port=port)
+            elif mode == "embedded":
+                # Each process would keep its own copy of the HNSW index
+                if config.get('server', 'workers', default=1) > 1:
+                    raise ValueError(
+                        "❌ Embedded Chroma supports a single API worker; set "
+                        "vectorstore.chroma.mode to http (chroma run) or use the "
+                        "pgvector or numpy provider"
+                    )
+                    
+                persist_dir = config.get('vectorstore', 'chroma', 'persist_directory')
+                
+                # Create directory if it doesn't exist
+                os.makedirs(persist_dir, exist_ok=True)
+                
+                logger.info(f"🗄️  Initializing ChromaDB at: {persist_dir}")
+                client = chromadb.PersistentClient(path=persist_dir)
+            else:
+                raise ValueError(f"❌ Unsupported Chroma mode: {mode}")
+                
             logger.info(f"📚 Collection name: {collection_name}")
             
             self.vectorstore = Chroma(
                 collection_name=collection_name,
                 embedding_function=self.embeddings,
-                persist_directory=persist_dir
+                client=client
+            )
+            
+            logger.info("✅ Vector store initialized successfully")
+        elif provider == "numpy":
+            directory = config.get('vectorstore', 'numpy', 'directory', default="./data/numpy_index")
+            dtype = config.get('vectorstore', 'numpy', 'dtype', default="float32")
+            
+            logger.info(f"🗄️  Initializing NumPy index at: {directory} ({dtype})")
+            
+            self.vectorstore = NumpyVectorStore(directory=directory, dtype=dtype)
+            self.vectorstore.ann = self._load_ann_index()
+            
+            logger.info("✅ Vector store initialized successfully")
+        elif provider == "pgvector":
+            from app.embeddings.pgvector_store import PgVectorStore
+            
+            collection_name = config.get('vectorstore', 'pgvector', 'collection_name')
+            
+            logger.info(f"🐘 Initializing pgvector collection: {collection_name}")
+            
+            self.vectorstore = PgVectorStore(
+                connection_string=config.get('vectorstore', 'pgvector', 'connection_string'),
+                collection_name=collection_name,
+                index_type=config.get('vectorstore', 'pgvector', 'index_type', default="hnsw"),
+                hnsw_m=config.get('vectorstore', 'pgvector', 'hnsw', 'm', default=16),
+                hnsw_ef_construction=config.get('vectorstore', 'pgvector', 'hnsw', 'ef_construction', default=64),
+                hnsw_ef_search=config.get('vectorstore', 'pgvector', 'hnsw', 'ef_search', default=40),
+                ivfflat_lists=config.get('vectorstore', 'pgvector', 'ivfflat', 'lists', default=100),
+                ivfflat_probes=config.get('vectorstore', 'pgvector', 'ivfflat', 'probes', default=10),
+                min_connections=config.get('vectorstore', 'pgvector', 'pool', 'min_size', default=1),
+                max_connections=config.get('vectorstore', 'pgvector', 'pool', 'max_size', default=10)
             )
             
             logger.info("✅ Vector store initialized successfully")
         else:
             raise ValueError(f"❌ Unsupported vector store provider: {provider}")
     
-    def add_documents(self, documents: List[Document]) -> List[str]:
+    def _load_ann_index(self) -> Optional[HnswIndex]:
+        """Load the offline-built HNSW index for the NumPy backend, if enabled"""
+        if not config.get('vectorstore', 'ann', 'enabled', default=False):
+            return None
+        
+        path = config.get('vectorstore', 'ann', 'path', default="./data/numpy_index/hnsw.bin")
+        if not HnswIndex.exists(path):
+            logger.warning(
+                f"⚠️ ANN index not found at {path}; using exact search "
+                f"(build it with scripts/build_ann_index.py)"
+            )
+            return None
+        
+        return HnswIndex.load(
+            path,
+            ef_search=config.get('vectorstore', 'ann', 'ef_search', default=64)
+        )
+    
+    def _initialize_bm25_index(self) -> Optional[BM25Index]:
+        """Create the keyword index kept in sync with the collection"""
+        if not config.get('retrieval', 'bm25', 'enabled', default=False):
+            return None
+        
+        return BM25Index(
+            path=config.get('retrieval', 'bm25', 'path', default="./data/bm25/index.json"),
+            k1=config.get('retrieval', 'bm25', 'k1', default=1.5),
+            b=config.get('retrieval', 'bm25', 'b', default=0.75),
+            bootstrap=self._all_documents
+        )
+    
+    def _all_documents(self) -> tuple:
+        """All (ids, documents) in the collection, used to build the keyword index"""
+        if self.provider != "chroma":
+            return self.vectorstore.get_all()
+        
+        result = self.vectorstore._collection.get(include=["documents", "metadatas"])
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {}, id=doc_id)
+            for doc_id, text, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        ]
+        return result["ids"], documents
+    
+    def refresh(self) -> None:
+        """
+        Pick up writes published by other worker processes
+        
+        Cheap when nothing changed (one small file read). Shared backends
+        (pgvector, a Chroma server) keep no per-process copy, and pgvector
+        looks for a table created by another worker on its own; the
+        file-backed NumPy and BM25 indexes are re-read once their files
+        have been replaced.
+        """
+        version = self.coordinator.version()
+        if version == self._version:
+            return
+            
+        if self.provider == "numpy":
+            signature = self.vectorstore._signature
+            if not self.vectorstore.reload():
+                return  # Caught mid-flush; retried on the next query
+            if self.vectorstore.ann is not None and self.vectorstore._signature != signature:
+                self.vectorstore.ann = self._load_ann_index()
+        if self.bm25_index is not None:
+            self.bm25_index.reload()
+            
+        self._version = version
+    
+    @contextmanager
+    def _write_access(self) -> Iterator[None]:
+        """Hold the cross-worker write lock, starting from the latest saved state"""
+        with self.coordinator.write_lock():
+            self.refresh()
+            yield
+    
+    def add_documents(
+        self, 
+        documents: List[Document],
+        batch_size: int = None,
+        progress_callback: Callable[[int], None] = None
+    ) -> List[str]:
         """
         Add documents to vector store
         
+        Documents are embedded in batches with several embedding requests in
+        flight at once; each batch is written as soon as its vectors arrive.
+        
         Args:
             documents: List of LangChain Document objects
+            batch_size: Chunks per embedding request (defaults to config)
+            progress_callback: Called with the number of chunks written so far
             
         Returns:
-            List of document IDs
+            List of document IDs (deterministic; identical chunks collapse)
         """
         if not documents:
             logger.warning("⚠️ No documents to add")
             return []
         
+        if batch_size is None:
+            batch_size = config.get('ingestion', 'batch_size', default=64)
+        
         logger.info(f"📥 Adding {len(documents)} documents to vector store...")
         
+        batches = (
+            documents[start:start + batch_size]
+            for start in range(0, len(documents), batch_size)
+        )
+        
         try:
-            ids = self.vectorstore.add_documents(documents)
+            with self._write_access():
+                ids = self._embed_and_write(batches, progress_callback)
             logger.info(f"✅ Successfully added {len(ids)} documents")
             return ids
         except Exception as e:
             logger.error(f"❌ Failed to add documents: {e}")
             raise
     
+    def add_documents_stream(
+        self, 
+        documents: Iterable[Document],
+        batch_size: int = None,
+        progress_callback: Callable[[int], None] = None
+    ) -> List[str]:
+        """
+        Add documents from an iterator without materializing them
+        
+        Batches are pulled lazily from the iterator, so chunks become
+        searchable while later pages are still being parsed.
+        
+        Args:
+            documents: Iterable of LangChain Document objects
+            batch_size: Chunks per embedding request (defaults to config)
+            progress_callback: Called with the number of chunks written so far
+            
+        Returns:
+            List of document IDs
+        """
+        if batch_size is None:
+            batch_size = config.get('ingestion', 'batch_size', default=64)
+        
+        logger.info("📥 Streaming documents into vector store...")
+        
+        doc_iter = iter(documents)
+        batches = iter(lambda: list(islice(doc_iter, batch_size)), [])
+        
+        try:
+            with self._write_access():
+                ids = self._embed_and_write(batches, progress_callback)
+            logger.info(f"✅ Successfully added {len(ids)} documents")
+            return ids
+        except Exception as e:
+            logger.error(f"❌ Failed to add documents: {e}")
+            raise
+    
+    def _embed_and_write(
+        self, 
+        batches: Iterable[List[Document]],
+        progress_callback: Callable[[int], None] = None
+    ) -> List[str]:
+        """
+        Embed batches concurrently and write each one when it completes
+        
+        At most `embedding_concurrency` batches are in flight, so memory stays
+        bounded by the window rather than by the number of documents.
+        
+        Returns:
+            List of unique document IDs in input order
+        """
+        concurrency = config.get('ingestion', 'embedding_concurrency', default=4)
+        batch_ids: Dict[int, List[str]] = {}
+        written = 0
+        start_time = time.perf_counter()
+        
+        for index, ids, docs, vectors in self._embed_batches(batches):
+            self._write_batch(ids, docs, vectors)
+            batch_ids[index] = ids
+            written += len(ids)
+            
+            if progress_callback:
+                progress_callback(written)
+        
+        self._flush()
+        self._bump_version()  # Published again once the files are saved
+        
+        elapsed = time.perf_counter() - start_time
+        throughput = written / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"⚡ Embedded {written} chunks in {elapsed:.2f}s "
+            f"({throughput:.1f} chunks/sec, concurrency {concurrency})"
+        )
+        return [doc_id for index in sorted(batch_ids) for doc_id in batch_ids[index]]
+    
+    def _embed_batches(
+        self, 
+        batches: Iterable[List[Document]]
+    ) -> Iterator[tuple]:
+        """
+        Embed batches concurrently, yielding each one as it completes
+        
+        At most `embedding_concurrency` batches are in flight; identical
+        chunks within the stream are embedded once.
+        
+        Yields:
+            (batch index, ids, documents, embeddings), in completion order
+        """
+        concurrency = config.get('ingestion', 'embedding_concurrency', default=4)
+        batch_iter = enumerate(batches)
+        seen_ids = set()
+        
+        def submit_next(pool, in_flight) -> bool:
+            for index, batch in batch_iter:
+                # Identical chunks map to the same ID; embed them once
+                ids, docs = [], []
+                for doc in batch:
+                    doc_id = chunk_id(doc)
+                    if doc_id not in seen_ids:
+                        seen_ids.add(doc_id)
+                        ids.append(doc_id)
+                        docs.append(doc)
+                if not docs:
+                    continue
+                
+                texts = [doc.page_content for doc in docs]
+                future = pool.submit(self.embeddings.embed_documents, texts)
+                in_flight[future] = (index, ids, docs)
+                return True
+            return False
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as pool:
+            in_flight: Dict[Future, tuple] = {}
+            while len(in_flight) < concurrency and submit_next(pool, in_flight):
+                pass
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, ids, docs = in_flight.pop(future)
+                    yield index, ids, docs, future.result()
+                    submit_next(pool, in_flight)
+    
+    def _write_batch(
+        self, 
+        ids: List[str],
+        documents: List[Document], 
+        embeddings: List[List[float]]
+    ) -> None:
+        """Upsert pre-computed embeddings for one batch into the collection"""
+        uploaded_at = int(time.time())
+        for doc in documents:
+            _add_filter_metadata(doc.metadata, uploaded_at)
+            
+        texts = [doc.page_content for doc in documents]
+        metadatas = [_clean_metadata(doc.metadata) for doc in documents]
+        
+        if self.provider != "chroma":
+            self.vectorstore.upsert(ids, embeddings, texts, metadatas)
+        else:
+            self.vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas
+            )
+        if self.bm25_index is not None:
+            self.bm25_index.add(ids, documents)
+        self._bump_version()
+    
+    def sync_document(
+        self, 
+        source_name: str,
+        documents: Iterable[Document],
+        progress_callback: Callable[[int], None] = None
+    ) -> Dict:
+        """
+        Incrementally (re-)ingest one source document
+        
+        Chunks whose deterministic ID is already recorded in the source's
+        manifest are skipped without embedding; chunks that disappeared
+        since the last ingestion are deleted. Parsing, chunking and
+        embedding run before the cross-worker write lock is taken, so
+        only the store writes are serialized between workers.
+        
+        Args:
+            source_name: Source the documents belong to
+            documents: Iterable of the source's chunk Documents
+            progress_callback: Called with the number of new chunks written
+            
+        Returns:
+            Dict with chunks_total, chunks_added, chunks_unchanged, chunks_removed
+        """
+        batch_size = config.get('ingestion', 'batch_size', default=64)
+        
+        with self._source_lock(source_name):
+            chunks: Dict[str, Document] = {}
+            for doc in documents:
+                chunks.setdefault(chunk_id(doc), doc)
+            current_ids = list(chunks)
+            
+            # Only trust manifest IDs that are actually in the collection
+            self.refresh()
+            previous_ids = self._existing_ids(self.manifest.load(source_name))
+            embedded = list(self._embed_batches(
+                self._batched(chunks, current_ids, previous_ids, batch_size)
+            ))
+            
+            with self._write_access():
+                # Another worker may have changed the source meanwhile
+                previous_ids = self._existing_ids(self.manifest.load(source_name))
+                embedded_ids = {doc_id for _, ids, _, _ in embedded for doc_id in ids}
+                missing = self._batched(chunks, current_ids, previous_ids | embedded_ids, batch_size)
+                embedded.extend(self._embed_batches(missing))
+                
+                added_ids: List[str] = []
+                for _, ids, docs, vectors in embedded:
+                    self._write_batch(ids, docs, vectors)
+                    added_ids.extend(ids)
+                    if progress_callback:
+                        progress_callback(len(added_ids))
+                
+                removed_ids = [doc_id for doc_id in previous_ids if doc_id not in chunks]
+                if removed_ids:
+                    self.delete(removed_ids)  # Flushes and publishes the writes too
+                elif added_ids:
+                    self._flush()
+                    self._bump_version()
+                
+                self.manifest.save(source_name, current_ids)
+        
+        unchanged = len(current_ids) - len(added_ids)
+        logger.info(
+            f"🔁 Synced {source_name}: {len(added_ids)} added, "
+            f"{unchanged} unchanged, {len(removed_ids)} removed"
+        )
+        
+        return {
+            "chunks_total": len(current_ids),
+            "chunks_added": len(added_ids),
+            "chunks_unchanged": unchanged,
+            "chunks_removed": len(removed_ids)
+        }
+    
+    @staticmethod
+    def _batched(
+        chunks: Dict[str, Document],
+        ids: List[str],
+        skip: set,
+        batch_size: int
+    ) -> List[List[Document]]:
+        """Batches of the chunks whose ID is not in skip"""
+        docs = [chunks[doc_id] for doc_id in ids if doc_id not in skip]
+        return [docs[start:start + batch_size] for start in range(0, len(docs), batch_size)]
+    
+    def delete(self, ids: List[str]) -> None:
+        """Delete documents by ID"""
+        if not ids:
+            return
+        
+        logger.info(f"🗑️  Deleting {len(ids)} documents from vector store")
+        with self._write_access():
+            if self.provider != "chroma":
+                self.vectorstore.delete(ids)
+            else:
+                self.vectorstore._collection.delete(ids=ids)
+            if self.bm25_index is not None:
+                self.bm25_index.delete(ids)
+            self._flush()
+            self._bump_version()
+    
+    def _flush(self) -> None:
+        """Persist in-process indexes and finish deferred backend index builds"""
+        if self.provider != "chroma":
+            self.vectorstore.flush()
+        if self.bm25_index is not None:
+            self.bm25_index.flush()
+    
+    def _bump_version(self) -> None:
+        """Mark the collection as changed for every worker"""
+        self._version = self.coordinator.bump()
+    
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Subset of ids that are present in the collection"""
+        if not ids:
+            return set()
+        
+        if self.provider != "chroma":
+            return set(self.vectorstore.get_ids(ids))
+        
+        result = self.vectorstore._collection.get(ids=ids, include=[])
+        return set(result["ids"])
+    
+    def _source_lock(self, source_name: str) -> threading.Lock:
+        """Lock serializing concurrent ingestion of the same source"""
+        with self._locks_guard:
+            return self._source_locks.setdefault(source_name, threading.Lock())
+    
     def similarity_search(
         self, 
         query: str, 
-        k: int = None
+        k: int = None,
+        filter: Dict = None
     ) -> List[Document]:
         """
         Search for similar documents
@@ -76,6 +536,7 @@ class VectorStoreManager:
         Args:
             query: Search query
             k: Number of results to return
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
             
         Returns:
             List of relevant documents
@@ -86,7 +547,11 @@ class VectorStoreManager:
         logger.info(f"🔍 Searching for: '{query}' (top {k} results)")
         
         try:
-            results = self.vectorstore.similarity_search(query, k=k)
+            if self.provider != "chroma":
+                embedding = self.embeddings.embed_query(query)
+                results = [doc for doc, _ in self.vectorstore.search(embedding, k, filter=filter)]
+            else:
+                results = self.vectorstore.similarity_search(query, k=k, filter=to_chroma_where(filter))
             logger.info(f"✅ Found {len(results)} relevant documents")
             return results
         except Exception as e:
@@ -96,7 +561,8 @@ class VectorStoreManager:
     def similarity_search_with_score(
         self, 
         query: str, 
-        k: int = None
+        k: int = None,
+        filter: Dict = None
     ) -> List[tuple]:
         """
         Search with similarity scores
@@ -110,29 +576,333 @@ class VectorStoreManager:
         logger.info(f"🔍 Searching with scores: '{query}'")
         
         try:
-            results = self.vectorstore.similarity_search_with_score(query, k=k)
+            if self.provider != "chroma":
+                embedding = self.embeddings.embed_query(query)
+                results = self.vectorstore.search(embedding, k, filter=filter)
+            else:
+                results = self.vectorstore.similarity_search_with_score(
+                    query, k=k, filter=to_chroma_where(filter)
+                )
             logger.info(f"✅ Found {len(results)} results with scores")
             return results
         except Exception as e:
             logger.error(f"❌ Search with scores failed: {e}")
             raise
     
+    async def asimilarity_search_with_score(
+        self, 
+        query: str, 
+        k: int = None,
+        filter: Dict = None
+    ) -> List[tuple]:
+        """
+        Async search with similarity scores (does not block the event loop)
+        
+        Returns:
+            List of (Document, score) tuples
+        """
+        if k is None:
+            k = config.get('retrieval', 'top_k', default=5)
+        
+        logger.info(f"🔍 Searching with scores (async): '{query}'")
+        
+        try:
+            if self.provider != "chroma":
+                embedding = await self.embeddings.aembed_query(query)
+                results = self.vectorstore.search(embedding, k, filter=filter)
+            else:
+                results = await self.vectorstore.asimilarity_search_with_score(
+                    query, k=k, filter=to_chroma_where(filter)
+                )
+            logger.info(f"✅ Found {len(results)} results with scores")
+            return results
+        except Exception as e:
+            logger.error(f"❌ Async search with scores failed: {e}")
+            raise
+    
+    def similarity_search_by_vector_with_score(
+        self, 
+        embedding: List[float], 
+        k: int = None,
+        filter: Dict = None
+    ) -> List[tuple]:
+        """
+        Search with similarity scores using a pre-computed query embedding
+        
+        Args:
+            embedding: Query embedding
+            k: Number of results to return
+            filter: Metadata filter (see app/embeddings/metadata_filter.py),
+                evaluated natively by the backend
+            
+        Returns:
+            List of (Document, score) tuples
+        """
+        if k is None:
+            k = config.get('retrieval', 'top_k', default=5)
+        
+        try:
+            if self.provider != "chroma":
+                results = self.vectorstore.search(embedding, k, filter=filter)
+            else:
+                results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    embedding, k=k, filter=to_chroma_where(filter)
+                )
+            logger.info(f"✅ Found {len(results)} results with scores")
+            return results
+        except Exception as e:
+            logger.error(f"❌ Search by vector failed: {e}")
+            raise
+    
+    def similarity_search_within(
+        self, 
+        embedding: List[float], 
+        k: int,
+        max_distance: Optional[float],
+        filter: Dict = None
+    ) -> Tuple[List[tuple], int]:
+        """
+        Search that only returns results within a distance threshold
+        
+        The threshold is pushed into the backend so candidates past it are
+        not materialized: the NumPy store skips them in its scan, pgvector
+        joins text and metadata for in-range ids only, and Chroma is asked
+        for ids and distances first and fetches the kept chunks afterwards.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of candidates to consider
+            max_distance: Largest distance to return (None for no limit)
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Returns:
+            (List of (Document, score) tuples, number of candidates the
+            index produced before the distance cut)
+        """
+        try:
+            if self.provider != "chroma":
+                results, candidates = self.vectorstore.search_within(
+                    embedding, k, max_distance, filter=filter
+                )
+            else:
+                results, candidates = self._chroma_search_within(
+                    embedding, k, max_distance, filter
+                )
+            logger.info(f"✅ Found {len(results)} of {candidates} candidates within threshold")
+            return results, candidates
+        except Exception as e:
+            logger.error(f"❌ Threshold search failed: {e}")
+            raise
+    
+    def _chroma_search_within(
+        self, 
+        embedding: List[float], 
+        k: int,
+        max_distance: Optional[float],
+        filter: Dict = None
+    ) -> Tuple[List[tuple], int]:
+        """Rank ids and distances in Chroma, then fetch only in-range chunks"""
+        collection = self.vectorstore._collection
+        response = collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=to_chroma_where(filter),
+            include=["distances"]
+        )
+        ranked = [
+            (doc_id, distance)
+            for doc_id, distance in zip(response["ids"][0], response["distances"][0])
+            if max_distance is None or distance <= max_distance
+        ]
+        if not ranked:
+            return [], len(response["ids"][0])
+            
+        stored = collection.get(
+            ids=[doc_id for doc_id, _ in ranked],
+            include=["documents", "metadatas"]
+        )
+        chunks = {
+            doc_id: (text, metadata)
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        }
+        results = [
+            (
+                Document(page_content=chunks[doc_id][0] or "", metadata=chunks[doc_id][1] or {}, id=doc_id),
+                distance
+            )
+            for doc_id, distance in ranked
+            if doc_id in chunks
+        ]
+        return results, len(response["ids"][0])
+    
+    def distances(self, embedding: List[float], ids: List[str]) -> Dict[str, float]:
+        """
+        Distances from a query embedding to specific chunks
+        
+        Used to hold chunks found by another retriever (BM25) to the same
+        score threshold as vector search results.
+        
+        Returns:
+            {chunk id: distance} on the backend's scale; unknown ids are skipped
+        """
+        if not ids:
+            return {}
+        if self.provider != "chroma":
+            return self.vectorstore.distances(embedding, ids)
+            
+        collection = self.vectorstore._collection
+        stored = collection.get(ids=list(ids), include=["embeddings"])
+        if not len(stored["ids"]):
+            return {}
+            
+        vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+            values = 1.0 - (vectors @ query) / np.where(norms > 0, norms, 1.0)
+        elif space == "ip":
+            values = 1.0 - vectors @ query
+        else:
+            values = ((vectors - query) ** 2).sum(axis=1)
+        return {doc_id: float(value) for doc_id, value in zip(stored["ids"], values)}
+    
+    def is_exact(self, filter: Dict = None) -> bool:
+        """
+        Whether searches rank every (matching) chunk exactly
+        
+        An exact search that returns fewer than k candidates has run out of
+        chunks; an approximate one (HNSW/IVFFlat, post-filtered graph search)
+        may find more when asked for a larger k.
+        """
+        if self.provider == "numpy":
+            return self.vectorstore.ann is None or bool(filter)
+        if self.provider == "pgvector":
+            return self.vectorstore.index_type == "none"
+        return False  # Chroma searches an HNSW graph
+    
+    def similarity_search_by_vectors_with_score(
+        self, 
+        embeddings: List[List[float]], 
+        k: int = None,
+        filter: Dict = None
+    ) -> List[List[tuple]]:
+        """
+        Multi-query search: one backend call for a batch of query embeddings
+        
+        Args:
+            embeddings: Query embeddings
+            k: Number of results per query
+            filter: Metadata filter applied to every query
+            
+        Returns:
+            One list of (Document, score) tuples per query embedding
+        """
+        if k is None:
+            k = config.get('retrieval', 'top_k', default=5)
+        
+        if not embeddings:
+            return []
+        
+        try:
+            if self.provider == "numpy":
+                results = self.vectorstore.search_batch(embeddings, k, filter=filter)
+            elif self.provider == "pgvector":
+                results = [
+                    self.vectorstore.search(embedding, k, filter=filter)
+                    for embedding in embeddings
+                ]
+            else:
+                response = self.vectorstore._collection.query(
+                    query_embeddings=embeddings,
+                    n_results=k,
+                    where=to_chroma_where(filter),
+                    include=["documents", "metadatas", "distances"]
+                )
+                results = [
+                    [
+                        (
+                            Document(page_content=text or "", metadata=metadata or {}, id=doc_id),
+                            distance
+                        )
+                        for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+                    ]
+                    for ids, texts, metadatas, distances in zip(
+                        response["ids"],
+                        response["documents"],
+                        response["metadatas"],
+                        response["distances"]
+                    )
+                ]
+            logger.info(f"✅ Batch search for {len(embeddings)} queries completed")
+            return results
+        except Exception as e:
+            logger.error(f"❌ Batch search by vector failed: {e}")
+            raise
+    
+    async def asimilarity_search_by_vector_with_score(
+        self, 
+        embedding: List[float], 
+        k: int = None,
+        filter: Dict = None
+    ) -> List[tuple]:
+        """Async version of similarity_search_by_vector_with_score"""
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector_with_score, embedding, k, filter
+        )
+    
+    def keyword_search(
+        self, 
+        query: str, 
+        k: int = None,
+        filter: Dict = None
+    ) -> List[tuple]:
+        """
+        BM25 keyword search over the stored chunks (optionally metadata-filtered)
+        
+        Returns:
+            List of (Document, bm25_score) tuples, best first (empty if the
+            keyword index is disabled)
+        """
+        if k is None:
+            k = config.get('retrieval', 'top_k', default=5)
+        
+        if self.bm25_index is None:
+            return []
+        
+        predicate = (lambda metadata: matches(metadata, filter)) if filter else None
+        results = self.bm25_index.search(query, k, predicate=predicate)
+        logger.info(f"✅ Found {len(results)} keyword matches")
+        return results
+    
     def get_collection_count(self) -> int:
         """Get number of documents in collection"""
         try:
-            count = self.vectorstore._collection.count()
+            self.refresh()
+            if self.provider != "chroma":
+                count = self.vectorstore.count()
+            else:
+                count = self.vectorstore._collection.count()
             logger.info(f"📊 Collection contains {count} documents")
             return count
         except Exception as e:
             logger.error(f"❌ Failed to get collection count: {e}")
             return 0
 
-# Global instance
-_vectorstore_instance = None
+def _clean_metadata(metadata: Dict) -> Optional[Dict]:
+    """Drop None values; Chroma rejects them and empty metadata dicts"""
+    cleaned = {key: value for key, value in metadata.items() if value is not None}
+    return cleaned or None
+
+def _add_filter_metadata(metadata: Dict, uploaded_at: int) -> None:
+    """Add the fields range filters rely on (page range, upload time)"""
+    page = metadata.get("page")
+    if isinstance(page, int):
+        metadata.setdefault("page_start", page)
+        metadata.setdefault("page_end", page)
+    metadata.setdefault("uploaded_at", uploaded_at)
 
+# Global instance
 def get_vectorstore() -> VectorStoreManager:
-    """Get or create vector store instance (singleton pattern)"""
-    global _vectorstore_instance
-    if _vectorstore_instance is None:
-        _vectorstore_instance = VectorStoreManager()
-    return _vectorstore_instance
\ No newline at end of file
+    """Get the shared vector store instance (dropped on client shutdown)"""
+    return get_client_registry().get("vectorstore", VectorStoreManager)
\ No newline at end of file
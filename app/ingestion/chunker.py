@@ -1 +1,183 @@
-# Placeholder
+# app/ingestion/chunker.py
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from langchain_core.documents import Document
+from app.pipeline.text_cleaning import clean_pdf_text
+from utils.config_loader import config
+from utils.logger import logger
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency, token counts are estimated without it
+    tiktoken = None
+
+# Sentence boundaries in cleaned (single-spaced) text
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?]) ")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English BPE vocabularies)"""
+    return (len(text) + 3) // 4
+
+@lru_cache(maxsize=8)
+def _get_encoder(encoding: str):
+    """tiktoken encoder, or None when tiktoken or the encoding is unavailable"""
+    if tiktoken is None:
+        logger.info("💡 tiktoken not installed, estimating token counts (pip install tiktoken)")
+        return None
+    try:
+        return tiktoken.get_encoding(encoding)
+    except Exception as e:  # tiktoken downloads encodings on first use
+        logger.warning(f"⚠️ Could not load tiktoken encoding {encoding} ({e}), estimating tokens")
+        return None
+
+def get_token_counter(encoding: str = "cl100k_base") -> Callable[[str], int]:
+    """
+    Token counting function for a tiktoken encoding
+    
+    Falls back to estimate_tokens when tiktoken is not installed or the
+    encoding cannot be loaded.
+    """
+    encoder = _get_encoder(encoding)
+    if encoder is None:
+        return estimate_tokens
+    return lambda text: len(encoder.encode_ordinary(text))
+
+def truncate_tokens(text: str, max_tokens: int, encoding: str = "cl100k_base") -> str:
+    """Cut text to at most max_tokens tokens (at a word boundary when estimating)"""
+    if max_tokens <= 0:
+        return ""
+        
+    encoder = _get_encoder(encoding)
+    if encoder is not None:
+        tokens = encoder.encode_ordinary(text)
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+        
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars + 1)
+    return text[:cut if cut > 0 else max_chars]
+
+class TokenChunker:
+    """
+    Token-budgeted chunker over a stream of pages
+    
+    Pages are cleaned and cut into sentences, each counted once; sentences
+    are packed into chunks of at most `chunk_tokens` tokens, and the last
+    `overlap_tokens` worth of sentences is carried into the next chunk.
+    Chunks may span pages and record the range as page_start/page_end
+    (`page` is the first page). Every sentence is added and evicted once,
+    so the whole document is chunked in linear time.
+    
+    Text shorter than `min_chunk_length` (a heading, a page number) does
+    not become a chunk of its own: it is carried into the next chunk,
+    which may then exceed the budget by that fragment. Every sentence
+    ends up in at least one chunk.
+    """
+    
+    def __init__(
+        self,
+        chunk_tokens: int = 256,
+        overlap_tokens: int = 48,
+        encoding: str = "cl100k_base",
+        min_chunk_length: int = 80
+    ):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("❌ chunking.overlap_tokens must be smaller than chunking.chunk_tokens")
+            
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_chunk_length = min_chunk_length
+        self.count_tokens = get_token_counter(encoding)
+    
+    @classmethod
+    def from_config(cls) -> "TokenChunker":
+        return cls(
+            chunk_tokens=config.get('chunking', 'chunk_tokens', default=256),
+            overlap_tokens=config.get('chunking', 'overlap_tokens', default=48),
+            encoding=config.get('chunking', 'encoding', default="cl100k_base"),
+            min_chunk_length=config.get('chunking', 'min_chunk_length', default=80)
+        )
+    
+    def _segments(self, text: str) -> Iterator[Tuple[str, int]]:
+        """(sentence, tokens) pairs; sentences over budget are split on words"""
+        for sentence in _SENTENCE_BREAK.split(text):
+            tokens = self.count_tokens(sentence)
+            if tokens <= self.chunk_tokens:
+                yield sentence, tokens
+                continue
+                
+            words: List[str] = []
+            budget = 0
+            for word in sentence.split(" "):
+                word_tokens = self.count_tokens(" " + word)
+                if words and budget + word_tokens > self.chunk_tokens:
+                    yield " ".join(words), budget
+                    words, budget = [], 0
+                words.append(word)
+                budget += word_tokens
+            if words:
+                yield " ".join(words), budget
+    
+    def iter_chunks(self, pages: Iterable[Dict], source_name: str) -> Iterator[Document]:
+        """
+        Lazily chunk a stream of page dicts
+        
+        Args:
+            pages: Iterable of page dictionaries (e.g. from iter_pdf_pages)
+            source_name: Name of the source document
+            
+        Yields:
+            LangChain Documents
+        """
+        window = deque()  # (sentence, tokens, page)
+        window_tokens = 0
+        unemitted = 0  # Sentences at the end of the window that are in no chunk yet
+        chunk_index = 0
+        
+        def emit(text: str) -> Document:
+            nonlocal chunk_index, unemitted
+            document = Document(
+                page_content=text,
+                metadata={
+                    "source": source_name,
+                    "page": window[0][2],
+                    "page_start": window[0][2],
+                    "page_end": window[-1][2],
+                    "chunk_index": chunk_index,
+                    "token_count": window_tokens
+                }
+            )
+            chunk_index += 1
+            unemitted = 0
+            return document
+            
+        for page_data in pages:
+            page_num = page_data["page_number"]
+            text = clean_pdf_text(page_data["page_content"])
+            if not text:
+                continue
+                
+            for sentence, tokens in self._segments(text):
+                if window and window_tokens + tokens > self.chunk_tokens:
+                    window_text = " ".join(sentence for sentence, _, _ in window)
+                    # Text too short to stand alone stays and is merged into the next chunk
+                    if len(window_text) >= self.min_chunk_length:
+                        yield emit(window_text)
+                        # Keep the tail of the window as overlap for the next chunk
+                        while window and (
+                            window_tokens > self.overlap_tokens
+                            or window_tokens + tokens > self.chunk_tokens
+                        ):
+                            window_tokens -= window.popleft()[1]
+                            
+                window.append((sentence, tokens, page_num))
+                window_tokens += tokens
+                unemitted += 1
+                
+        # The tail is kept however short, unless it only repeats the previous chunk
+        if unemitted:
+            yield emit(" ".join(sentence for sentence, _, _ in window))
@@ -2,10 +2,20 @@
 
 import os
 from typing import List
-from unstructured.partition.pdf import partition_pdf
-from unstructured.chunking.title import chunk_by_title
 from utils.logger import logger
 
+# unstructured (with its OCR and layout models) is imported on first use,
+# so importing this module stays cheap
+
+def _require_unstructured() -> None:
+    """Fail with an install hint when the unstructured stack is missing"""
+    try:
+        import unstructured  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "❌ Unstructured parsing requires unstructured: pip install \"unstructured[all-docs]\""
+        )
+
 def partition_document(file_path: str):
     """
     Extract elements from a PDF using Unstructured.
@@ -15,6 +25,9 @@ def partition_document(file_path: str):
         logger.error(f"File not found: {file_path}")
         raise FileNotFoundError(f"{file_path} does not exist.")
     
+    _require_unstructured()
+    from unstructured.partition.pdf import partition_pdf
+    
     logger.info(f"📄 Partitioning document: {file_path}")
     
     try:
@@ -46,6 +59,9 @@ def create_chunks_by_title(
     """
     Splits PDF elements into intelligent chunks based on titles.
     """
+    _require_unstructured()
+    from unstructured.chunking.title import chunk_by_title
+    
     logger.info("🔨 Creating chunks based on titles...")
     
     try:
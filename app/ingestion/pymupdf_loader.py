@@ -1,24 +1,109 @@
 # app/ingestion/pymupdf_loader.py
 
-import fitz  # PyMuPDF
-from typing import List, Dict
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List
 from langchain_core.documents import Document
+from app.ingestion.chunker import TokenChunker
+from app.pipeline.text_cleaning import clean_pdf_text
+from utils.config_loader import config
 from utils.logger import logger
 
-def extract_text_from_pdf(pdf_path: str) -> List[Dict]:
+def extract_text_from_pdf(pdf_path: str, workers: int = None) -> List[Dict]:
     """
     Extract text from PDF using PyMuPDF with better accuracy
     
+    Large PDFs are split into page ranges extracted by a process pool
+    (each worker opens the file itself); small ones are read serially.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Number of extraction processes (defaults to config)
+    
     Returns:
         List of dicts with page_content, page_number, and metadata
     """
     logger.info(f"📄 Extracting text from: {pdf_path}")
     
     try:
-        doc = fitz.open(pdf_path)
-        pages_content = []
+        try:
+            pages_content = list(iter_pdf_pages(pdf_path, workers=workers))
+        except (RuntimeError, OSError, BrokenProcessPool) as e:
+            logger.warning(f"⚠️ Parallel extraction failed ({e}), falling back to serial")
+            pages_content = list(iter_pdf_pages(pdf_path, workers=1))
+        
+        logger.info(f"✅ Extracted text from {len(pages_content)} pages")
+        return pages_content
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to extract text: {e}")
+        raise
+
+def iter_pdf_pages(pdf_path: str, workers: int = None) -> Iterator[Dict]:
+    """
+    Lazily yield page dicts in page order
+    
+    Large PDFs are extracted by a process pool in ranges of
+    `ingestion.pages_per_task` pages; at most `workers` ranges are in
+    flight, so memory stays bounded no matter how long the PDF is.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Number of extraction processes (defaults to config)
         
-        for page_num in range(len(doc)):
+    Yields:
+        Dicts with page_content, page_number, and total_pages
+    """
+    import fitz  # PyMuPDF, imported on first use to keep API startup fast
+    
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+    
+    if workers is None:
+        workers = config.get('ingestion', 'extraction_workers', default=os.cpu_count())
+    min_pages = config.get('ingestion', 'parallel_extraction_min_pages', default=64)
+    
+    if workers <= 1 or total_pages < min_pages:
+        yield from _iter_page_range(pdf_path, 0, total_pages)
+        return
+    
+    pages_per_task = config.get('ingestion', 'pages_per_task', default=32)
+    ranges = [
+        (start, min(start + pages_per_task, total_pages))
+        for start in range(0, total_pages, pages_per_task)
+    ]
+    workers = min(workers, len(ranges))
+    
+    logger.info(f"⚙️  Extracting {total_pages} pages with {workers} worker processes")
+    
+    # spawn: forking a threaded API process is unsafe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(pool.submit(_extract_page_range, pdf_path, start, end))
+            if len(pending) >= workers:
+                yield from pending.popleft().result()
+        
+        while pending:
+            yield from pending.popleft().result()
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict]:
+    """Extract pages [start, end) from a PDF (also used as process pool task)"""
+    return list(_iter_page_range(pdf_path, start, end))
+
+def _iter_page_range(pdf_path: str, start: int, end: int) -> Iterator[Dict]:
+    """Yield non-empty pages [start, end) of a PDF"""
+    import fitz
+    
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+        
+        for page_num in range(start, end):
             page = doc[page_num]
             
             # Extract text with layout preservation
@@ -28,18 +113,11 @@ def extract_text_from_pdf(pdf_path: str) -> List[Dict]:
             # text = page.get_text("blocks")
             
             if text.strip():
-                pages_content.append({
+                yield {
                     "page_content": text,
                     "page_number": page_num + 1,
-                    "total_pages": len(doc)
-                })
-        
-        logger.info(f"✅ Extracted text from {len(pages_content)} pages")
-        return pages_content
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to extract text: {e}")
-        raise
+                    "total_pages": total_pages
+                }
 
 def chunk_text_by_pages(
     pages_content: List[Dict],
@@ -59,25 +137,49 @@ def chunk_text_by_pages(
     Returns:
         List of LangChain Documents
     """
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    
     logger.info("🔨 Creating chunks from pages...")
     
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ".", " ", ""],
-        length_function=len,
-    )
+    documents = list(iter_chunks(pages_content, source_name, chunk_size, chunk_overlap))
     
-    documents = []
+    logger.info(f"✅ Created {len(documents)} document chunks")
+    return documents
+
+def iter_chunks(
+    pages: Iterable[Dict],
+    source_name: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[Document]:
+    """
+    Lazily turn a stream of page dicts into chunk Documents
+    
+    `chunking.strategy` selects the token-budgeted TokenChunker ("token",
+    chunks may span pages) or per-page character splitting ("character").
+    
+    Args:
+        pages: Iterable of page dictionaries (e.g. from iter_pdf_pages)
+        source_name: Name of the source document
+        chunk_size: Maximum chunk size in characters ("character" strategy)
+        chunk_overlap: Overlap between chunks ("character" strategy)
+        
+    Yields:
+        LangChain Documents
+    """
+    strategy = config.get('chunking', 'strategy', default="character")
+    if strategy == "token":
+        yield from TokenChunker.from_config().iter_chunks(pages, source_name)
+        return
+    if strategy != "character":
+        raise ValueError(f"❌ Unknown chunking strategy: {strategy}")
+        
+    splitter = _character_splitter(chunk_size, chunk_overlap)
     
-    for page_data in pages_content:
+    for page_data in pages:
         page_content = page_data["page_content"]
         page_num = page_data["page_number"]
         
         # Clean the text
-        cleaned_text = clean_text(page_content)
+        cleaned_text = clean_pdf_text(page_content)
         
         if len(cleaned_text) < 50:  # Skip very short pages
             continue
@@ -90,7 +192,7 @@ def chunk_text_by_pages(
             if len(chunk.strip()) < 100:  # Skip tiny chunks
                 continue
                 
-            doc = Document(
+            yield Document(
                 page_content=chunk,
                 metadata={
                     "source": source_name,
@@ -99,28 +201,18 @@ def chunk_text_by_pages(
                     "total_chunks": len(chunks)
                 }
             )
-            documents.append(doc)
-    
-    logger.info(f"✅ Created {len(documents)} document chunks")
-    return documents
 
-def clean_text(text: str) -> str:
-    """Clean extracted text"""
-    import re
-    
-    if not text:
-        return ""
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove page numbers and common artifacts
-    text = re.sub(r'\n\d+\n', ' ', text)
-    
-    # Remove multiple dots (common in TOCs)
-    text = re.sub(r'\.{3,}', ' ', text)
+@lru_cache(maxsize=8)
+def _character_splitter(chunk_size: int, chunk_overlap: int):
+    """Shared splitter per size/overlap (construction is not free)"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
     
-    return text.strip()
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ".", " ", ""],
+        length_function=len,
+    )
 
 def load_and_process_pdf(pdf_path: str, source_name: str = None) -> List[Document]:
     """
@@ -133,8 +225,6 @@ def load_and_process_pdf(pdf_path: str, source_name: str = None) -> List[Documen
     Returns:
         List of processed Document objects
     """
-    import os
-    
     if source_name is None:
         source_name = os.path.basename(pdf_path)
     
@@ -144,4 +234,26 @@ def load_and_process_pdf(pdf_path: str, source_name: str = None) -> List[Documen
     # Create chunks
     documents = chunk_text_by_pages(pages_content, source_name)
     
-    return documents
\ No newline at end of file
+    return documents
+
+def stream_process_pdf(pdf_path: str, source_name: str = None) -> Iterator[Document]:
+    """
+    Streaming counterpart of load_and_process_pdf
+    
+    Pages are extracted and chunked lazily, so memory stays bounded
+    regardless of PDF length. Feed the result to
+    VectorStoreManager.add_documents_stream to index chunks as they come.
+    
+    Args:
+        pdf_path: Path to PDF file
+        source_name: Name to use in metadata (defaults to filename)
+        
+    Yields:
+        Processed Document objects
+    """
+    if source_name is None:
+        source_name = os.path.basename(pdf_path)
+    
+    logger.info(f"📄 Streaming text from: {pdf_path}")
+    
+    yield from iter_chunks(iter_pdf_pages(pdf_path), source_name)
\ No newline at end of file
@@ -1,30 +1,8 @@
 # app/pipeline/document_normalizer.py
 
-import re
 from typing import List
 from langchain_core.documents import Document
-
-def clean_text(text: str) -> str:
-    """
-    Clean OCR / PDF extracted text more aggressively.
-    """
-    if not text:
-        return ""
-    
-    # Remove excessive newlines
-    text = re.sub(r"\n+", " ", text)
-    
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text)
-    
-    # Remove weird characters that look like OCR errors
-    # Keep only: letters, numbers, punctuation, spaces
-    text = re.sub(r"[^\w\s.,!?;:()\-\"\'%$€]", "", text)
-    
-    # Remove standalone single characters (likely OCR errors)
-    text = re.sub(r"\s[a-zA-Z]\s", " ", text)
-    
-    return text.strip()
+from app.pipeline.text_cleaning import clean_texts
 
 def build_documents(
     chunks,
@@ -35,10 +13,10 @@ def build_documents(
     """
     documents: List[Document] = []
     
-    for chunk in chunks:
-        raw_text = getattr(chunk, "text", "")
-        cleaned_text = clean_text(raw_text)
-        
+    chunks = list(chunks)
+    cleaned_texts = clean_texts((getattr(chunk, "text", "") for chunk in chunks), ocr=True)
+    
+    for chunk, cleaned_text in zip(chunks, cleaned_texts):
         # Drop garbage / very small chunks
         if len(cleaned_text) < 100:  # Increased minimum length
             continue
@@ -0,0 +1,223 @@
+# app/retriever/bm25_index.py
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from utils.logger import logger
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens (keeps numbers and identifiers intact)"""
+    return _TOKEN_RE.findall(text.lower())
+
+class BM25Index:
+    """
+    Local inverted index with Okapi BM25 scoring
+    
+    Maintained alongside the vector store so exact identifiers, part
+    numbers and names can be matched lexically. The index is persisted as
+    JSON and loaded lazily on first use.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        k1: float = 1.5,
+        b: float = 0.75,
+        bootstrap: Optional[Callable[[], Tuple[List[str], List[Document]]]] = None
+    ):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._bootstrap = bootstrap
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        # (mtime, size) of the file last loaded or saved (see reload)
+        self._signature: Optional[Tuple[int, int]] = None
+        
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, Dict]] = {}
+        self._total_length = 0
+    
+    def _ensure_loaded(self) -> None:
+        """Load the index from disk (or bootstrap it) on first use"""
+        if self._loaded:
+            return
+            
+        with self._lock:
+            if self._loaded:
+                return
+                
+            if os.path.exists(self.path):
+                self._signature = self._file_signature()
+                with open(self.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                for doc_id, (text, metadata) in stored["documents"].items():
+                    self._index(doc_id, text, metadata)
+                logger.info(f"📖 Loaded BM25 index with {len(self._documents)} documents")
+            elif self._bootstrap is not None:
+                ids, documents = self._bootstrap()
+                for doc_id, doc in zip(ids, documents):
+                    self._index(doc_id, doc.page_content, doc.metadata)
+                self._dirty = bool(ids)
+                logger.info(f"📖 Built BM25 index from collection ({len(ids)} documents)")
+                
+            self._loaded = True
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def reload(self) -> bool:
+        """
+        Drop the in-memory index if another process has replaced the file
+        
+        The new file is read lazily on next use.
+        
+        Returns:
+            True if the index will be reloaded
+        """
+        with self._lock:
+            if not self._loaded or self._dirty or self._file_signature() == self._signature:
+                return False
+                
+            self._postings.clear()
+            self._doc_lengths.clear()
+            self._documents.clear()
+            self._total_length = 0
+            self._loaded = False
+            return True
+    
+    def _index(self, doc_id: str, text: str, metadata: Dict) -> None:
+        """Add one document to the in-memory structures (lock held)"""
+        if doc_id in self._documents:
+            self._unindex(doc_id)
+            
+        term_counts = Counter(tokenize(text))
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+            
+        length = sum(term_counts.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._documents[doc_id] = (text, metadata)
+    
+    def _unindex(self, doc_id: str) -> None:
+        """Remove one document from the in-memory structures (lock held)"""
+        text, _ = self._documents.pop(doc_id)
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+    
+    def add(self, ids: List[str], documents: List[Document]) -> None:
+        """Upsert documents into the index"""
+        self._ensure_loaded()
+        with self._lock:
+            for doc_id, doc in zip(ids, documents):
+                self._index(doc_id, doc.page_content, dict(doc.metadata))
+            self._dirty = True
+    
+    def delete(self, ids: List[str]) -> None:
+        """Remove documents from the index"""
+        self._ensure_loaded()
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._documents:
+                    self._unindex(doc_id)
+            self._dirty = True
+    
+    def search(
+        self,
+        query: str,
+        k: int,
+        predicate: Optional[Callable[[Dict], bool]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Rank documents by BM25 score
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            predicate: Optional metadata filter
+            
+        Returns:
+            List of (Document, bm25_score) tuples, best first
+        """
+        self._ensure_loaded()
+        
+        with self._lock:
+            n_docs = len(self._documents)
+            if n_docs == 0:
+                return []
+                
+            avg_length = self._total_length / n_docs
+            scores: Dict[str, float] = {}
+            
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                    
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    
+            if predicate is not None:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if predicate(self._documents[doc_id][1])
+                }
+                
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                (
+                    Document(
+                        page_content=self._documents[doc_id][0],
+                        metadata=dict(self._documents[doc_id][1]),
+                        id=doc_id
+                    ),
+                    score
+                )
+                for doc_id, score in best
+            ]
+    
+    def flush(self) -> None:
+        """Persist the index if it changed since the last flush"""
+        with self._lock:
+            if not self._loaded or not self._dirty:
+                return
+                
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+                
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"documents": self._documents}, f)
+            os.replace(tmp_path, self.path)
+            self._signature = self._file_signature()
+            self._dirty = False
+            
+        logger.info(f"💾 Saved BM25 index ({len(self._documents)} documents)")
+    
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._documents)
@@ -0,0 +1,124 @@
+# app/retriever/context_packer.py
+
+import re
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from app.ingestion.chunker import get_token_counter, truncate_tokens
+from utils.config_loader import config
+from utils.logger import logger
+
+_WORD = re.compile(r"\w+")
+
+def _shingles(text: str, size: int = 3) -> set:
+    """Hashed word n-grams used for near-duplicate detection"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {hash(tuple(words))}
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+class ContextPacker:
+    """
+    Build the LLM context from retrieved chunks within a token budget
+    
+    Chunks are taken best score first. Near-duplicates of an already
+    selected chunk (word 3-gram Jaccard similarity at or above
+    `dedup_threshold`) are dropped, and the first chunk that does not fit
+    is cut at a token boundary if at least `min_chunk_tokens` remain;
+    otherwise it is skipped and smaller lower-ranked chunks may still fit.
+    Headers count against the budget, so the prompt stays bounded no
+    matter how large top_k is.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: Optional[int] = 1500,
+        dedup_threshold: float = 0.85,
+        min_chunk_tokens: int = 50,
+        encoding: str = "cl100k_base"
+    ):
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.min_chunk_tokens = min_chunk_tokens
+        self.encoding = encoding
+        self.count_tokens = get_token_counter(encoding)
+    
+    @classmethod
+    def from_config(cls) -> "ContextPacker":
+        return cls(
+            max_tokens=config.get('context', 'max_tokens', default=1500),
+            dedup_threshold=config.get('context', 'dedup_threshold', default=0.85),
+            min_chunk_tokens=config.get('context', 'min_chunk_tokens', default=50),
+            encoding=config.get('chunking', 'encoding', default="cl100k_base")
+        )
+    
+    @staticmethod
+    def _header(i: int, doc: Document, score: Optional[float]) -> str:
+        source = doc.metadata.get('source', 'Unbekannt')
+        page = doc.metadata.get('page', 'N/A')
+        score_text = f" (Relevanz: {1-score:.2f})" if score is not None else ""
+        return f"[Dokument {i} - Quelle: {source}, Seite: {page}{score_text}]\n"
+    
+    def pack(self, documents: List[Document] | List[Tuple[Document, float]]) -> Dict:
+        """
+        Select, deduplicate and trim documents into a context string
+        
+        Args:
+            documents: List of documents or (document, score) tuples
+            
+        Returns:
+            Dict with "context", "documents" (the items actually used, in
+            input format), "tokens" (context size), "duplicates" (dropped
+            near-duplicates) and "truncated" (whether a chunk was cut)
+        """
+        items = [item if isinstance(item, tuple) else (item, None) for item in documents]
+        # Lower score = more similar; unscored items keep their order
+        items.sort(key=lambda item: item[1] if item[1] is not None else 0.0)
+        
+        parts: List[str] = []
+        used = []
+        seen: List[set] = []
+        tokens = 0
+        duplicates = 0
+        truncated = False
+        
+        for doc, score in items:
+            shingles = _shingles(doc.page_content)
+            if any(
+                len(shingles & other) / len(shingles | other) >= self.dedup_threshold
+                for other in seen
+            ):
+                duplicates += 1
+                continue
+                
+            header = self._header(len(parts) + 1, doc, score)
+            # +1 for the blank line joining parts
+            header_tokens = self.count_tokens(header) + 1
+            content = doc.page_content
+            content_tokens = self.count_tokens(content)
+            
+            if self.max_tokens and tokens + header_tokens + content_tokens > self.max_tokens:
+                remaining = self.max_tokens - tokens - header_tokens
+                if remaining < self.min_chunk_tokens:
+                    continue
+                content = truncate_tokens(content, remaining, self.encoding)
+                content_tokens = self.count_tokens(content)
+                truncated = True
+                
+            parts.append(f"{header}{content}\n")
+            used.append((doc, score) if score is not None else doc)
+            seen.append(shingles)
+            tokens += header_tokens + content_tokens
+            if truncated:
+                break
+                
+        logger.info(
+            f"📦 Packed {len(used)}/{len(items)} documents into {tokens} context tokens "
+            f"({duplicates} near-duplicates dropped{', last one truncated' if truncated else ''})"
+        )
+        return {
+            "context": "\n".join(parts),
+            "documents": used,
+            "tokens": tokens,
+            "duplicates": duplicates,
+            "truncated": truncated
+        }
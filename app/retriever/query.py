@@ -1,10 +1,15 @@
 # app/retriever/query.py
 
-from typing import List, Dict, Tuple
+import asyncio
+from typing import List, Dict, Optional, Tuple
 from langchain_core.documents import Document
+from app.clients import get_client_registry
 from app.embeddings.vectorstore import get_vectorstore
+from app.retriever.context_packer import ContextPacker
+from app.retriever.reranker import get_reranker
 from utils.config_loader import config
 from utils.logger import logger
+from utils.metrics import record_context_tokens, record_retrieval, stage
 
 class Retriever:
     """Handle document retrieval"""
@@ -13,12 +18,25 @@ class Retriever:
         self.vectorstore = get_vectorstore()
         self.top_k = config.get('retrieval', 'top_k', default=5)
         self.score_threshold = config.get('retrieval', 'score_threshold', default=0.7)
+        # "dense" (vector only) or "hybrid" (vector + BM25 with reciprocal-rank fusion)
+        self.mode = config.get('retrieval', 'mode', default="dense")
+        self.candidate_k = config.get('retrieval', 'hybrid', 'candidate_k', default=20)
+        self.rrf_k = config.get('retrieval', 'hybrid', 'rrf_k', default=60)
+        # Adaptive top-k: threshold pushed into the search, k grown only while needed
+        self.adaptive = config.get('retrieval', 'adaptive', 'enabled', default=False)
+        self.max_k = config.get('retrieval', 'adaptive', 'max_k', default=100)
+        self.growth_factor = config.get('retrieval', 'adaptive', 'growth_factor', default=2)
+        self.context_packer = ContextPacker.from_config()
+        # Optional cross-encoder: retrieve `candidates`, keep the best top_k
+        self.reranker = get_reranker()
     
     def retrieve(
         self, 
         query: str, 
         top_k: int = None,
-        with_scores: bool = True
+        with_scores: bool = True,
+        query_embedding: List[float] = None,
+        filter: Optional[Dict] = None
     ) -> List[Document] | List[Tuple[Document, float]]:
         """
         Retrieve relevant documents for a query
@@ -27,6 +45,8 @@ class Retriever:
             query: User query
             top_k: Number of documents to retrieve
             with_scores: Whether to return similarity scores
+            query_embedding: Pre-computed embedding of the query (skips re-embedding)
+            filter: Metadata filter applied inside the vector store and BM25 index
             
         Returns:
             List of documents or (document, score) tuples
@@ -35,21 +55,33 @@ class Retriever:
             top_k = self.top_k
         
         logger.info(f"🔍 Retrieving top {top_k} documents for query: '{query}'")
+        fetch_k = self._fetch_k(top_k)
+        self.vectorstore.refresh()
         
         try:
+            if self.mode == "hybrid":
+                results = self._hybrid_search(query, fetch_k, query_embedding, filter)
+                results = self._rerank(query, results, top_k)
+                return results if with_scores else [doc for doc, _ in results]
+            
+            if with_scores and self.adaptive:
+                results = self._adaptive_search(query, fetch_k, query_embedding, filter)
+                return self._rerank(query, results, top_k)
+            
             if with_scores:
-                results = self.vectorstore.similarity_search_with_score(query, k=top_k)
-                
-                # Filter by score threshold
-                filtered_results = [
-                    (doc, score) for doc, score in results 
-                    if score <= self.score_threshold  # Lower score = more similar
-                ]
-                
-                logger.info(f"✅ Retrieved {len(filtered_results)} documents (after filtering)")
-                return filtered_results
+                with stage("vector_search"):
+                    if query_embedding is not None:
+                        results = self.vectorstore.similarity_search_by_vector_with_score(
+                            query_embedding, k=fetch_k, filter=filter
+                        )
+                    else:
+                        results = self.vectorstore.similarity_search_with_score(
+                            query, k=fetch_k, filter=filter
+                        )
+                return self._rerank(query, self._filter_by_threshold(results), top_k)
             else:
-                results = self.vectorstore.similarity_search(query, k=top_k)
+                with stage("vector_search"):
+                    results = self.vectorstore.similarity_search(query, k=top_k, filter=filter)
                 logger.info(f"✅ Retrieved {len(results)} documents")
                 return results
                 
@@ -57,41 +89,325 @@ class Retriever:
             logger.error(f"❌ Retrieval failed: {e}")
             raise
     
-    def format_context(
+    async def aretrieve(
         self, 
-        documents: List[Document] | List[Tuple[Document, float]]
-    ) -> str:
+        query: str, 
+        top_k: int = None,
+        query_embedding: List[float] = None,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
         """
-        Format retrieved documents into context string
+        Async version of retrieve (always returns (document, score) tuples)
         
         Args:
-            documents: List of documents or (document, score) tuples
+            query: User query
+            top_k: Number of documents to retrieve
+            query_embedding: Pre-computed embedding of the query (skips re-embedding)
+            filter: Metadata filter applied inside the vector store and BM25 index
             
         Returns:
-            Formatted context string
+            List of (document, score) tuples
         """
-        context_parts = []
+        if top_k is None:
+            top_k = self.top_k
         
-        for i, item in enumerate(documents, 1):
-            # Handle both Document and (Document, score) formats
-            if isinstance(item, tuple):
-                doc, score = item
-                score_text = f" (Relevanz: {1-score:.2f})"
+        logger.info(f"🔍 Retrieving top {top_k} documents for query (async): '{query}'")
+        fetch_k = self._fetch_k(top_k)
+        # May re-read index files written by another worker
+        await asyncio.to_thread(self.vectorstore.refresh)
+        
+        try:
+            if self.mode == "hybrid":
+                results = await asyncio.to_thread(
+                    self._hybrid_search, query, fetch_k, query_embedding, filter
+                )
+            elif self.adaptive:
+                if query_embedding is None:
+                    with stage("query_embedding"):
+                        query_embedding = await self.vectorstore.embeddings.aembed_query(query)
+                results = await asyncio.to_thread(
+                    self._adaptive_search, query, fetch_k, query_embedding, filter
+                )
             else:
-                doc = item
-                score_text = ""
+                with stage("vector_search"):
+                    if query_embedding is not None:
+                        results = await self.vectorstore.asimilarity_search_by_vector_with_score(
+                            query_embedding, k=fetch_k, filter=filter
+                        )
+                    else:
+                        results = await self.vectorstore.asimilarity_search_with_score(
+                            query, k=fetch_k, filter=filter
+                        )
+                results = self._filter_by_threshold(results)
             
-            source = doc.metadata.get('source', 'Unbekannt')
-            page = doc.metadata.get('page', 'N/A')
+            if self.reranker is None:
+                return results
+            return await asyncio.to_thread(self._rerank, query, results, top_k)
+        except Exception as e:
+            logger.error(f"❌ Async retrieval failed: {e}")
+            raise
+    
+    def retrieve_batch(
+        self, 
+        queries: List[str], 
+        top_k: int = None,
+        query_embeddings: List[List[float]] = None,
+        filter: Optional[Dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve for many queries with a single multi-query vector search
+        
+        Each query gets the same results as retrieve(). With adaptive top-k
+        the threshold is pushed into one search per query instead, since
+        how far k grows depends on the query.
+        
+        Args:
+            queries: User queries
+            top_k: Number of documents to retrieve per query
+            query_embeddings: Pre-computed embeddings, one per query
+            filter: Metadata filter applied to every query
+            
+        Returns:
+            One list of (document, score) tuples per query
+        """
+        if top_k is None:
+            top_k = self.top_k
+        
+        if not queries:
+            return []
+        
+        logger.info(f"🔍 Retrieving top {top_k} documents for {len(queries)} queries")
+        self.vectorstore.refresh()
+        
+        try:
+            if query_embeddings is None:
+                query_embeddings = embed_queries(self.vectorstore.embeddings, queries)
             
-            context_parts.append(
-                f"[Dokument {i} - Quelle: {source}, Seite: {page}{score_text}]\n"
-                f"{doc.page_content}\n"
+            fetch_k = self._fetch_k(top_k)
+            k = max(self.candidate_k, fetch_k) if self.mode == "hybrid" else fetch_k
+            if self.adaptive:
+                dense_results = [
+                    self._adaptive_search(query, k, query_embedding, filter)
+                    for query, query_embedding in zip(queries, query_embeddings)
+                ]
+            else:
+                with stage("vector_search"):
+                    dense_results = self.vectorstore.similarity_search_by_vectors_with_score(
+                        query_embeddings, k=k, filter=filter
+                    )
+                dense_results = [self._filter_by_threshold(dense) for dense in dense_results]
+            
+            if self.mode == "hybrid":
+                results = [
+                    self._fuse(query, dense, fetch_k, query_embedding, filter)
+                    for query, dense, query_embedding in zip(queries, dense_results, query_embeddings)
+                ]
+            else:
+                results = dense_results
+            return [
+                self._rerank(query, query_results, top_k)
+                for query, query_results in zip(queries, results)
+            ]
+        except Exception as e:
+            logger.error(f"❌ Batch retrieval failed: {e}")
+            raise
+    
+    def _fetch_k(self, top_k: int) -> int:
+        """Candidates to retrieve: top_k, or the wider rerank candidate set"""
+        if self.reranker is None:
+            return top_k
+        return max(top_k, self.reranker.candidates)
+    
+    def _rerank(
+        self, 
+        query: str, 
+        results: List[Tuple[Document, float]],
+        top_k: int
+    ) -> List[Tuple[Document, float]]:
+        """Reorder candidates with the cross-encoder and keep top_k (no-op if disabled)"""
+        if self.reranker is None:
+            return results
+        
+        with stage("rerank"):
+            return self.reranker.rerank(query, results, top_k)
+    
+    def _hybrid_search(
+        self, 
+        query: str, 
+        top_k: int,
+        query_embedding: List[float] = None,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Fuse dense and BM25 candidates with reciprocal-rank fusion
+        
+        Every candidate must be within the score threshold: dense results
+        are filtered as usual, and chunks only BM25 found are checked
+        against their own vector distance (see _fuse), so an off-topic
+        query that merely shares a word with the corpus gets no context.
+        The returned score is a distance-like value in [0, 1] (0 = ranked
+        first by both retrievers), so callers treat it like a dense distance.
+        """
+        candidate_k = max(self.candidate_k, top_k)
+        
+        if query_embedding is None:
+            with stage("query_embedding"):
+                query_embedding = self.vectorstore.embeddings.embed_query(query)
+        
+        if self.adaptive:
+            dense = self._adaptive_search(query, candidate_k, query_embedding, filter)
+            return self._fuse(query, dense, top_k, query_embedding, filter)
+        
+        with stage("vector_search"):
+            dense = self.vectorstore.similarity_search_by_vector_with_score(
+                query_embedding, k=candidate_k, filter=filter
             )
+        return self._fuse(query, self._filter_by_threshold(dense), top_k, query_embedding, filter)
+    
+    def _adaptive_search(
+        self, 
+        query: str, 
+        top_k: int,
+        query_embedding: List[float] = None,
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Up to top_k results within the score threshold, fetching no more than needed
+        
+        The threshold is applied inside the vector store, so candidates past
+        it are never materialized. k starts at top_k and is multiplied by
+        growth_factor (up to max_k) only while an approximate index comes
+        back short of k candidates, e.g. a graph search starved by a
+        metadata filter. A full page of candidates means everything further
+        is also further away, and an exact search that comes back short has
+        nothing left, so both stop after one round.
+        """
+        if query_embedding is None:
+            with stage("query_embedding"):
+                query_embedding = self.vectorstore.embeddings.embed_query(query)
+        
+        k = top_k
+        fetched = 0
+        previous = 0
+        rounds = 0
+        with stage("vector_search"):
+            while True:
+                results, candidates = self.vectorstore.similarity_search_within(
+                    query_embedding, k, self.score_threshold, filter=filter
+                )
+                fetched += candidates
+                rounds += 1
+                
+                if (
+                    len(results) >= top_k
+                    or candidates >= k
+                    or candidates <= previous  # No progress: the collection is exhausted
+                    or k >= self.max_k
+                    or self.vectorstore.is_exact(filter)
+                ):
+                    break
+                previous = candidates
+                k = min(k * self.growth_factor, self.max_k)
+        
+        results = results[:top_k]
+        record_retrieval(fetched, len(results), rounds)
+        logger.info(
+            f"✅ Retrieved {len(results)} documents within threshold "
+            f"({fetched} candidates, {rounds} search{'es' if rounds > 1 else ''})"
+        )
+        return results
+    
+    def _fuse(
+        self, 
+        query: str, 
+        dense: List[Tuple[Document, float]],
+        top_k: int,
+        query_embedding: List[float],
+        filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """Reciprocal-rank fusion of threshold-filtered dense results with BM25 matches"""
+        with stage("keyword_search"):
+            keyword = self.vectorstore.keyword_search(
+                query, k=max(self.candidate_k, top_k), filter=filter
+            )
+            
+            # BM25 scores are not comparable across queries, so keyword-only
+            # matches have to pass the dense threshold on their own distance
+            dense_ids = {doc.id for doc, _ in dense}
+            keyword_only = [doc.id for doc, _ in keyword if doc.id not in dense_ids]
+            distances = self.vectorstore.distances(query_embedding, keyword_only)
+            matched = len(keyword)
+            keyword = [
+                (doc, score) for doc, score in keyword
+                if doc.id in dense_ids or distances.get(doc.id, float("inf")) <= self.score_threshold
+            ]
+        
+        fused: Dict[str, float] = {}
+        documents: Dict[str, Document] = {}
+        for results in (dense, keyword):
+            for rank, (doc, _) in enumerate(results, 1):
+                doc_id = doc.id or doc.page_content
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (self.rrf_k + rank)
+                documents.setdefault(doc_id, doc)
+        
+        best_possible = 2.0 / (self.rrf_k + 1)
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
         
-        return "\n".join(context_parts)
+        logger.info(
+            f"🔀 Hybrid retrieval: {len(dense)} dense + {len(keyword)} keyword "
+            f"candidates ({matched - len(keyword)} beyond threshold) -> {len(ranked)} fused"
+        )
+        return [(documents[doc_id], 1.0 - score / best_possible) for doc_id, score in ranked]
+    
+    def _filter_by_threshold(
+        self, 
+        results: List[Tuple[Document, float]]
+    ) -> List[Tuple[Document, float]]:
+        """Drop results whose distance is above the score threshold"""
+        with stage("threshold_filter"):
+            filtered_results = [
+                (doc, score) for doc, score in results 
+                if score <= self.score_threshold  # Lower score = more similar
+            ]
+        record_retrieval(len(results), len(filtered_results))
+        
+        logger.info(f"✅ Retrieved {len(filtered_results)} documents (after filtering)")
+        return filtered_results
+    
+    def format_context(
+        self, 
+        documents: List[Document] | List[Tuple[Document, float]]
+    ) -> str:
+        """
+        Format retrieved documents into context string
+        
+        Args:
+            documents: List of documents or (document, score) tuples
+            
+        Returns:
+            Formatted context string (within the context token budget)
+        """
+        return self.pack_context(documents)["context"]
+    
+    def pack_context(
+        self, 
+        documents: List[Document] | List[Tuple[Document, float]]
+    ) -> Dict:
+        """
+        Build the LLM context within the token budget (see ContextPacker)
+        
+        Returns:
+            Dict with "context", the "documents" used and their "tokens"
+        """
+        packed = self.context_packer.pack(documents)
+        record_context_tokens(packed["tokens"])
+        return packed
+
+def embed_queries(embeddings, queries: List[str]) -> List[List[float]]:
+    """Embed a batch of queries in one model call (query-cached when available)"""
+    return getattr(embeddings, "embed_queries", embeddings.embed_documents)(queries)
 
 # Global instance
 def get_retriever() -> Retriever:
-    """Get retriever instance"""
-    return Retriever()
\ No newline at end of file
+    """Get the shared retriever instance"""
+    return get_client_registry().get("retriever", Retriever)
\ No newline at end of file
@@ -0,0 +1,197 @@
+# app/retriever/reranker.py
+
+import hashlib
+import importlib.util
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from langchain_core.documents import Document
+from app.clients import get_client_registry
+from utils.config_loader import config
+from utils.logger import logger
+from utils.metrics import RERANKS
+
+class CrossEncoderReranker:
+    """
+    Reorder retrieved chunks with a small local cross-encoder
+    
+    The retriever fetches `candidates` chunks, and the cross-encoder scores
+    each (question, chunk) pair jointly, which ranks far better than
+    embedding distance, so only the best top_k reach the LLM. Scoring runs
+    batched on CPU; scores are kept in an LRU cache keyed by question and
+    chunk text, so repeated questions only score new chunks.
+    
+    The model (sentence-transformers, which pulls in torch) is loaded on
+    first use. The cost per pair is measured on every call; when scoring the
+    uncached pairs is expected to exceed `budget_ms`, reranking is skipped
+    and the retrieval order is kept.
+    
+    The ms-marco cross-encoders output raw logits; they are mapped to a
+    relevance in [0, 1] with a sigmoid, and returned scores are distance-like
+    (1 - relevance, lower = better), the same convention as dense and
+    hybrid retrieval.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        candidates: int = 20,
+        batch_size: int = 16,
+        max_length: int = 512,
+        budget_ms: Optional[float] = 150,
+        cache_size: int = 10000,
+        threads: Optional[int] = None
+    ):
+        self.model_name = model_name
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.threads = threads
+        
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Moving average of the measured scoring time per pair (None until first call)
+        self._seconds_per_pair: Optional[float] = None
+    
+    @classmethod
+    def from_config(cls) -> "CrossEncoderReranker":
+        # Fail at startup rather than on the first query (without importing torch yet)
+        if importlib.util.find_spec("sentence_transformers") is None:
+            raise ImportError(
+                "❌ reranker.enabled requires sentence-transformers: pip install sentence-transformers"
+            )
+        return cls(
+            model_name=config.get('reranker', 'model', default="cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            candidates=config.get('reranker', 'candidates', default=20),
+            batch_size=config.get('reranker', 'batch_size', default=16),
+            max_length=config.get('reranker', 'max_length', default=512),
+            budget_ms=config.get('reranker', 'budget_ms', default=150),
+            cache_size=config.get('reranker', 'cache_size', default=10000),
+            threads=config.get('reranker', 'threads', default=None)
+        )
+    
+    def _load_model(self):
+        """Load the cross-encoder on CPU (once, thread-safe)"""
+        with self._model_lock:
+            if self._model is not None:
+                return self._model
+                
+            try:
+                from sentence_transformers import CrossEncoder
+            except ImportError:
+                raise ImportError(
+                    "❌ Reranking requires sentence-transformers: pip install sentence-transformers"
+                )
+                
+            if self.threads:
+                import torch
+                torch.set_num_threads(self.threads)
+                
+            logger.info(f"🧮 Loading cross-encoder: {self.model_name}")
+            self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+            return self._model
+    
+    def warm_up(self) -> None:
+        """Load the model and measure the cost per pair ahead of the first request"""
+        self._score([("warm-up", "warm-up")] * self.batch_size)
+    
+    @staticmethod
+    def _relevance(logit: float) -> float:
+        """Sigmoid of a cross-encoder logit (overflow-safe)"""
+        if logit >= 0:
+            return 1.0 / (1.0 + math.exp(-logit))
+        odds = math.exp(logit)
+        return odds / (1.0 + odds)
+    
+    @staticmethod
+    def _cache_key(question: str, text: str) -> str:
+        return hashlib.sha1(f"{question}\0{text}".encode("utf-8")).hexdigest()
+    
+    def _score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Relevance in [0, 1] of (question, chunk) pairs; updates the cost estimate"""
+        model = self._load_model()  # Not part of the measured cost
+        
+        start = time.perf_counter()
+        scores = model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        per_pair = (time.perf_counter() - start) / len(pairs)
+        
+        if self._seconds_per_pair is None:
+            self._seconds_per_pair = per_pair
+        else:
+            # Damp one-off stalls so a single slow call does not disable reranking
+            per_pair = min(per_pair, 2 * self._seconds_per_pair)
+            self._seconds_per_pair = 0.8 * self._seconds_per_pair + 0.2 * per_pair
+        return [self._relevance(float(score)) for score in scores]
+    
+    def rerank(
+        self,
+        question: str,
+        results: List[Tuple[Document, float]],
+        top_k: int
+    ) -> List[Tuple[Document, float]]:
+        """
+        Reorder retrieved (document, score) tuples by cross-encoder relevance
+        
+        Args:
+            question: User question
+            results: Retrieved candidates, best first
+            top_k: Number of results to keep
+            
+        Returns:
+            Up to top_k (document, 1 - relevance) tuples, best first; the
+            first top_k results unchanged if reranking was skipped
+        """
+        if len(results) <= 1:
+            return results[:top_k]
+            
+        keys = [self._cache_key(question, doc.page_content) for doc, _ in results]
+        with self._cache_lock:
+            scores = {key: self._cache[key] for key in keys if key in self._cache}
+            for key in scores:
+                self._cache.move_to_end(key)
+                
+        missing = [
+            (key, doc.page_content)
+            for key, (doc, _) in dict(zip(keys, results)).items()
+            if key not in scores
+        ]
+        if missing and self.budget_ms is not None and self._seconds_per_pair is not None:
+            expected_ms = len(missing) * self._seconds_per_pair * 1000
+            if expected_ms > self.budget_ms:
+                RERANKS.inc(outcome="skipped")
+                logger.warning(
+                    f"⏱️ Skipping rerank: {len(missing)} pairs would take ~{expected_ms:.0f} ms "
+                    f"(budget {self.budget_ms} ms)"
+                )
+                return results[:top_k]
+                
+        if missing:
+            new_scores = self._score([(question, text) for _, text in missing])
+            with self._cache_lock:
+                for (key, _), score in zip(missing, new_scores):
+                    scores[key] = score
+                    self._cache[key] = score
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                    
+        RERANKS.inc(outcome="reranked" if missing else "cached")
+        ranked = sorted(zip(keys, results), key=lambda item: scores[item[0]], reverse=True)
+        
+        logger.info(
+            f"🎯 Reranked {len(results)} candidates "
+            f"({len(results) - len(missing)} cached) -> top {min(top_k, len(results))}"
+        )
+        return [(doc, 1.0 - scores[key]) for key, (doc, _) in ranked[:top_k]]
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Get the shared reranker, or None if reranking is disabled"""
+    if not config.get('reranker', 'enabled', default=False):
+        return None
+    return get_client_registry().get("reranker", CrossEncoderReranker.from_config)
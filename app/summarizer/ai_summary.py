@@ -1,11 +1,20 @@
 # app/summarizer/ai_summary.py
 
-from typing import Dict, List
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
+from app.clients import get_client_registry
+from app.embeddings.metadata_filter import filter_key
+from app.summarizer.answer_cache import get_answer_cache
 from app.summarizer.llm_factory import get_llm
-from app.retriever.query import get_retriever
+from app.retriever.query import embed_queries, get_retriever
+from utils.config_loader import config
 from utils.logger import logger
+from utils.metrics import QUERIES, record_stage, record_tokens, stage
 
 class RAGPipeline:
     """Complete RAG pipeline: Retrieval + Generation"""
@@ -13,6 +22,7 @@ class RAGPipeline:
     def __init__(self):
         self.llm = get_llm()
         self.retriever = get_retriever()
+        self.answer_cache = get_answer_cache()
         self._setup_prompt()
     
     def _setup_prompt(self):
@@ -37,7 +47,8 @@ Here are the relevant documents:
         self, 
         question: str, 
         top_k: int = None,
-        return_sources: bool = True
+        return_sources: bool = True,
+        filter: Optional[Dict] = None
     ) -> Dict:
         """
         Complete RAG query: retrieve + generate answer
@@ -46,6 +57,7 @@ Here are the relevant documents:
             question: User question
             top_k: Number of documents to retrieve
             return_sources: Whether to return source documents
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
             
         Returns:
             Dict with answer, sources, and metadata
@@ -53,60 +65,439 @@ Here are the relevant documents:
         logger.info(f"❓ Processing question: '{question}'")
         
         try:
+            # Step 0: Embed once; reuse the answer of a near-identical question
+            with stage("query_embedding"):
+                embedding = self.retriever.vectorstore.embeddings.embed_query(question)
+            
+            cache_key = None
+            if self.answer_cache is not None:
+                cache_key = self._answer_cache_key(embedding, top_k, return_sources, filter)
+                cached = self._cached_answer(cache_key)
+                if cached is not None:
+                    return cached
+            
             # Step 1: Retrieve relevant documents
             retrieved_docs = self.retriever.retrieve(
                 question, 
                 top_k=top_k,
-                with_scores=True
+                with_scores=True,
+                query_embedding=embedding,
+                filter=filter
             )
             
             if not retrieved_docs:
-                logger.warning("⚠️ No relevant documents found")
-                return {
-                    "answer": "I could not find relevant information to answer your question.",
-                    "sources": [],
-                    "retrieved_docs": 0
-                }
+                return self._empty_result()
             
-            # Step 2: Format context
-            context = self.retriever.format_context(retrieved_docs)
+            # Step 2: Pack context within the token budget
+            with stage("context_formatting"):
+                packed = self.retriever.pack_context(retrieved_docs)
             
             # Step 3: Generate answer using LLM
             logger.info("🤖 Generating answer with LLM...")
+            answer, usage = self._generate(packed["context"], question)
             
-            chain = self.prompt | self.llm
-            response = chain.invoke({
-                "context": context,
-                "question": question
-            })
+            # Step 4: Prepare response
+            result = self._build_result(answer, retrieved_docs, return_sources, packed)
+            result["tokens"] = record_tokens(usage)
+            self._store_answer(cache_key, result)
+            QUERIES.inc(cached="false")
             
-            answer = response.content
+            logger.info("✅ Answer generated successfully")
+            return result
             
-            # Step 4: Prepare response
-            result = {
-                "answer": answer,
-                "retrieved_docs": len(retrieved_docs)
-            }
+        except Exception as e:
+            logger.error(f"❌ Query failed: {e}")
+            raise
+    
+    async def aquery(
+        self, 
+        question: str, 
+        top_k: int = None,
+        return_sources: bool = True,
+        filter: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Async RAG query: retrieval and generation without blocking the event loop
+        
+        Args:
+            question: User question
+            top_k: Number of documents to retrieve
+            return_sources: Whether to return source documents
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
             
-            if return_sources:
-                sources = []
-                for doc, score in retrieved_docs:
-                    sources.append({
-                        "source": doc.metadata.get('source', 'Unknown'),
-                        "page": doc.metadata.get('page', 'N/A'),
-                        "relevance": round(1 - score, 3),
-                        "content_preview": doc.page_content[:200] + "..."
-                    })
-                result["sources"] = sources
+        Returns:
+            Dict with answer, sources, and metadata
+        """
+        logger.info(f"❓ Processing question (async): '{question}'")
+        
+        try:
+            with stage("query_embedding"):
+                embedding = await self.retriever.vectorstore.embeddings.aembed_query(question)
+            
+            cache_key = None
+            if self.answer_cache is not None:
+                # Reads the shared version file: keep it off the event loop
+                cache_key = await asyncio.to_thread(
+                    self._answer_cache_key, embedding, top_k, return_sources, filter
+                )
+                cached = self._cached_answer(cache_key)
+                if cached is not None:
+                    return cached
+            
+            retrieved_docs = await self.retriever.aretrieve(
+                question,
+                top_k=top_k,
+                query_embedding=embedding,
+                filter=filter
+            )
+            
+            if not retrieved_docs:
+                return self._empty_result()
+            
+            with stage("context_formatting"):
+                packed = self.retriever.pack_context(retrieved_docs)
+            
+            logger.info("🤖 Generating answer with LLM (async)...")
+            answer, usage = await self._agenerate(packed["context"], question)
+            
+            result = self._build_result(answer, retrieved_docs, return_sources, packed)
+            result["tokens"] = record_tokens(usage)
+            self._store_answer(cache_key, result)
+            QUERIES.inc(cached="false")
             
             logger.info("✅ Answer generated successfully")
             return result
             
         except Exception as e:
-            logger.error(f"❌ Query failed: {e}")
+            logger.error(f"❌ Async query failed: {e}")
             raise
+    
+    async def astream_query(
+        self, 
+        question: str, 
+        top_k: int = None,
+        filter: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a RAG answer: sources first, then LLM tokens as they are produced
+        
+        Args:
+            question: User question
+            top_k: Number of documents to retrieve
+            filter: Metadata filter (see app/embeddings/metadata_filter.py)
+            
+        Yields:
+            Event dicts with "event" ("sources", "token" or "done") and "data"
+        """
+        logger.info(f"❓ Streaming answer for question: '{question}'")
+        
+        with stage("query_embedding"):
+            embedding = await self.retriever.vectorstore.embeddings.aembed_query(question)
+        
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key = await asyncio.to_thread(self._answer_cache_key, embedding, top_k, True, filter)
+            cached = self._cached_answer(cache_key)
+            if cached is not None:
+                yield {
+                    "event": "sources",
+                    "data": {
+                        "sources": cached.get("sources", []),
+                        "retrieved_docs": cached["retrieved_docs"]
+                    }
+                }
+                yield {"event": "token", "data": {"content": cached["answer"]}}
+                yield {
+                    "event": "done",
+                    "data": {"retrieved_docs": cached["retrieved_docs"], "cached": True}
+                }
+                return
+        
+        retrieved_docs = await self.retriever.aretrieve(
+            question,
+            top_k=top_k,
+            query_embedding=embedding,
+            filter=filter
+        )
+        
+        if not retrieved_docs:
+            result = self._empty_result()
+            yield {"event": "sources", "data": {"sources": [], "retrieved_docs": 0}}
+            yield {"event": "token", "data": {"content": result["answer"]}}
+            yield {"event": "done", "data": {"retrieved_docs": 0}}
+            return
+        
+        with stage("context_formatting"):
+            packed = self.retriever.pack_context(retrieved_docs)
+        
+        yield {
+            "event": "sources",
+            "data": {
+                "sources": self._format_sources(packed["documents"]),
+                "retrieved_docs": len(retrieved_docs),
+                "context_tokens": packed["tokens"]
+            }
+        }
+        
+        logger.info("🤖 Streaming answer from LLM...")
+        
+        chain = self.prompt | self.llm
+        answer_parts = []
+        usage = None
+        start = time.perf_counter()
+        async for chunk in chain.astream({
+            "context": packed["context"],
+            "question": question
+        }):
+            if chunk.content:
+                if not answer_parts:
+                    record_stage("llm_time_to_first_token", time.perf_counter() - start)
+                answer_parts.append(chunk.content)
+                yield {"event": "token", "data": {"content": chunk.content}}
+            usage = chunk.usage_metadata or usage
+        record_stage("llm_generation", time.perf_counter() - start)
+        
+        self._store_answer(
+            cache_key,
+            self._build_result("".join(answer_parts), retrieved_docs, True, packed)
+        )
+        record_tokens(usage)
+        QUERIES.inc(cached="false")
+        
+        logger.info("✅ Answer streamed successfully")
+        yield {
+            "event": "done",
+            "data": {"retrieved_docs": len(retrieved_docs), "cached": False}
+        }
+    
+    def _generate(self, context: str, question: str) -> Tuple[str, Optional[Dict]]:
+        """
+        Run the LLM, streaming internally to measure time to first token
+        
+        Returns:
+            (answer, usage_metadata or None)
+        """
+        chain = self.prompt | self.llm
+        parts = []
+        usage = None
+        start = time.perf_counter()
+        
+        for chunk in chain.stream({"context": context, "question": question}):
+            if chunk.content:
+                if not parts:
+                    record_stage("llm_time_to_first_token", time.perf_counter() - start)
+                parts.append(chunk.content)
+            usage = chunk.usage_metadata or usage
+            
+        record_stage("llm_generation", time.perf_counter() - start)
+        return "".join(parts), usage
+    
+    async def _agenerate(self, context: str, question: str) -> Tuple[str, Optional[Dict]]:
+        """Async version of _generate"""
+        chain = self.prompt | self.llm
+        parts = []
+        usage = None
+        start = time.perf_counter()
+        
+        async for chunk in chain.astream({"context": context, "question": question}):
+            if chunk.content:
+                if not parts:
+                    record_stage("llm_time_to_first_token", time.perf_counter() - start)
+                parts.append(chunk.content)
+            usage = chunk.usage_metadata or usage
+            
+        record_stage("llm_generation", time.perf_counter() - start)
+        return "".join(parts), usage
+    
+    def query_batch(
+        self, 
+        questions: List[str], 
+        top_k: int = None,
+        return_sources: bool = True,
+        max_concurrency: int = None,
+        filter: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Answer many questions at once
+        
+        All questions are embedded in one batched call and retrieved with a
+        single multi-query search; answers are generated with at most
+        `max_concurrency` LLM calls in flight. A failing question does not
+        fail the batch; its result carries an "error" instead.
+        
+        Args:
+            questions: User questions
+            top_k: Number of documents to retrieve per question
+            return_sources: Whether to return source documents
+            max_concurrency: Parallel LLM calls (defaults to config)
+            filter: Metadata filter applied to every question
+            
+        Returns:
+            Dict with "results" (one dict per question, in order, each with
+            its own "timings") and batch-level "timings" in seconds
+        """
+        if max_concurrency is None:
+            max_concurrency = config.get('batch', 'generation_concurrency', default=4)
+        
+        logger.info(f"❓ Processing batch of {len(questions)} questions")
+        start_time = time.perf_counter()
+        results: List[Optional[Dict]] = [None] * len(questions)
+        
+        # Step 1: One embedding call for the whole batch
+        embeddings = embed_queries(self.retriever.vectorstore.embeddings, questions)
+        embedding_time = time.perf_counter() - start_time
+        
+        # Step 2: Serve near-identical questions from the answer cache
+        cache_keys: List[Optional[Tuple]] = [None] * len(questions)
+        pending = []
+        for i, embedding in enumerate(embeddings):
+            if self.answer_cache is not None:
+                cache_keys[i] = self._answer_cache_key(embedding, top_k, return_sources, filter)
+                cached = self._cached_answer(cache_keys[i])
+                if cached is not None:
+                    cached["timings"] = {"generation": 0.0}
+                    cached["query_time"] = time.perf_counter() - start_time
+                    results[i] = cached
+                    continue
+            pending.append(i)
+        
+        # Step 3: One multi-query search for the remaining questions
+        retrieval_start = time.perf_counter()
+        retrieved = self.retriever.retrieve_batch(
+            [questions[i] for i in pending],
+            top_k=top_k,
+            query_embeddings=[embeddings[i] for i in pending],
+            filter=filter
+        )
+        retrieval_time = time.perf_counter() - retrieval_start
+        
+        # Step 4: Generate answers with bounded concurrency
+        def generate(i: int, retrieved_docs: List[tuple]) -> Tuple[int, Dict]:
+            generation_start = time.perf_counter()
+            try:
+                if not retrieved_docs:
+                    result = self._empty_result()
+                else:
+                    packed = self.retriever.pack_context(retrieved_docs)
+                    answer, usage = self._generate(packed["context"], questions[i])
+                    result = self._build_result(answer, retrieved_docs, return_sources, packed)
+                    result["tokens"] = record_tokens(usage)
+                    self._store_answer(cache_keys[i], result)
+                    QUERIES.inc(cached="false")
+            except Exception as e:
+                logger.error(f"❌ Batch question {i + 1} failed: {e}")
+                result = {"answer": "", "sources": [], "retrieved_docs": 0, "error": str(e)}
+            
+            end = time.perf_counter()
+            result["timings"] = {"generation": end - generation_start}
+            result["query_time"] = end - start_time
+            return i, result
+        
+        generation_start = time.perf_counter()
+        if pending:
+            with ThreadPoolExecutor(
+                max_workers=max(1, max_concurrency),
+                thread_name_prefix="generate"
+            ) as pool:
+                for i, result in pool.map(lambda item: generate(*item), zip(pending, retrieved)):
+                    results[i] = result
+        generation_time = time.perf_counter() - generation_start
+        
+        for question, result in zip(questions, results):
+            result["question"] = question
+        
+        total_time = time.perf_counter() - start_time
+        logger.info(
+            f"✅ Answered {len(questions)} questions in {total_time:.2f}s "
+            f"({len(questions) - len(pending)} from cache)"
+        )
+        
+        return {
+            "results": results,
+            "timings": {
+                "embedding": embedding_time,
+                "retrieval": retrieval_time,
+                "generation": generation_time,
+                "total": total_time
+            }
+        }
+    
+    def _answer_cache_key(
+        self, 
+        embedding: List[float], 
+        top_k: Optional[int],
+        return_sources: bool,
+        filter: Optional[Dict] = None
+    ) -> Tuple[List[float], int, str]:
+        """
+        Build the answer cache key for a query
+        
+        The collection version is captured before retrieval, so an answer
+        generated while documents are being ingested is stored as stale.
+        """
+        params_key = json.dumps({
+            "top_k": top_k or self.retriever.top_k,
+            "return_sources": return_sources,
+            "filter": filter_key(filter)
+        }, sort_keys=True)
+        return embedding, self.retriever.vectorstore.collection_version, params_key
+    
+    def _cached_answer(self, cache_key: Tuple) -> Optional[Dict]:
+        """Return a cached result flagged as such, or None"""
+        with stage("answer_cache_lookup"):
+            cached = self.answer_cache.lookup(*cache_key)
+        if cached is not None:
+            cached["cached"] = True
+            QUERIES.inc(cached="true")
+        return cached
+    
+    def _store_answer(self, cache_key: Optional[Tuple], result: Dict) -> None:
+        """Cache a freshly generated result"""
+        if self.answer_cache is not None and cache_key is not None:
+            self.answer_cache.store(*cache_key, result)
+    
+    def _empty_result(self) -> Dict:
+        """Result returned when no document passes the score threshold"""
+        logger.warning("⚠️ No relevant documents found")
+        return {
+            "answer": "I could not find relevant information to answer your question.",
+            "sources": [],
+            "retrieved_docs": 0
+        }
+    
+    def _build_result(
+        self, 
+        answer: str, 
+        retrieved_docs: List[tuple],
+        return_sources: bool,
+        packed: Dict
+    ) -> Dict:
+        """Assemble the answer dict returned to callers (sources = documents in the context)"""
+        result = {
+            "answer": answer,
+            "retrieved_docs": len(retrieved_docs),
+            "context_tokens": packed["tokens"],
+            "cached": False
+        }
+        
+        if return_sources:
+            result["sources"] = self._format_sources(packed["documents"])
+        
+        return result
+    
+    def _format_sources(self, retrieved_docs: List[tuple]) -> List[Dict]:
+        """Convert (document, score) tuples into source dicts"""
+        sources = []
+        for doc, score in retrieved_docs:
+            sources.append({
+                "source": doc.metadata.get('source', 'Unknown'),
+                "page": doc.metadata.get('page', 'N/A'),
+                "relevance": round(1 - score, 3),
+                "content_preview": doc.page_content[:200] + "..."
+            })
+        return sources
 
 # Global instance
 def get_rag_pipeline() -> RAGPipeline:
-    """Get RAG pipeline instance"""
-    return RAGPipeline()
\ No newline at end of file
+    """Get the shared RAG pipeline instance"""
+    return get_client_registry().get("rag_pipeline", RAGPipeline)
\ No newline at end of file
@@ -0,0 +1,148 @@
+# app/summarizer/answer_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from utils.config_loader import config
+from utils.logger import logger
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed on query-embedding similarity
+    
+    An entry is reused when a new question's embedding has cosine
+    similarity >= threshold with a cached question, the query parameters
+    match, and the collection version is unchanged since it was stored.
+    """
+    
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def lookup(
+        self,
+        embedding: List[float],
+        collection_version: int,
+        params_key: str
+    ) -> Optional[Dict]:
+        """
+        Find a cached result for a similar question
+        
+        Args:
+            embedding: Query embedding
+            collection_version: Current version of the vector store
+            params_key: Serialized query parameters (top_k, filters, ...)
+            
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        query = self._normalize(embedding)
+        
+        with self._lock:
+            self._purge(collection_version)
+            
+            candidates = [
+                (entry_id, entry) for entry_id, entry in self._entries.items()
+                if entry["params_key"] == params_key
+            ]
+            if candidates:
+                matrix = np.stack([entry["vector"] for _, entry in candidates])
+                similarities = matrix @ query
+                best = int(np.argmax(similarities))
+                
+                if similarities[best] >= self.similarity_threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    logger.info(
+                        f"⚡ Answer cache hit (similarity {similarities[best]:.3f})"
+                    )
+                    return dict(entry["result"])
+                    
+            self.misses += 1
+            return None
+    
+    def store(
+        self,
+        embedding: List[float],
+        collection_version: int,
+        params_key: str,
+        result: Dict
+    ) -> None:
+        """Cache a result, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[self._next_id] = {
+                "vector": self._normalize(embedding),
+                "version": collection_version,
+                "params_key": params_key,
+                "result": dict(result),
+                "created_at": time.monotonic()
+            }
+            self._next_id += 1
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self) -> None:
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+        logger.info("🧹 Answer cache invalidated")
+    
+    def _purge(self, collection_version: int) -> None:
+        """Remove expired and out-of-date entries (lock held)"""
+        now = time.monotonic()
+        stale = [
+            entry_id for entry_id, entry in self._entries.items()
+            if entry["version"] != collection_version
+            or now - entry["created_at"] > self.ttl_seconds
+        ]
+        for entry_id in stale:
+            del self._entries[entry_id]
+    
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Global instance
+_answer_cache = None
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Get the shared answer cache, or None if disabled in config"""
+    global _answer_cache
+    if not config.get('answer_cache', 'enabled', default=False):
+        return None
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            similarity_threshold=config.get('answer_cache', 'similarity_threshold', default=0.95),
+            ttl_seconds=config.get('answer_cache', 'ttl_seconds', default=3600),
+            max_entries=config.get('answer_cache', 'max_entries', default=1000)
+        )
+    return _answer_cache
@@ -1,12 +1,16 @@
 # app/summarizer/llm_factory.py
 
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+from app.clients import get_client_registry
 from utils.config_loader import config
 from utils.logger import logger
 
 class LLMFactory:
-    """Factory to create LLM instances based on configuration"""
+    """
+    Factory to create LLM instances based on configuration
+    
+    Provider packages are imported in their branch, so only the configured
+    provider is loaded.
+    """
     
     @staticmethod
     def create_llm():
@@ -16,6 +20,8 @@ class LLMFactory:
         logger.info(f"🤖 Initializing LLM with provider: {provider}")
         
         if provider == "ollama":
+            from langchain_ollama import ChatOllama
+            
             model = config.get('llm', 'ollama', 'model')
             base_url = config.get('llm', 'ollama', 'base_url')
             temperature = config.get('llm', 'ollama', 'temperature', default=0.1)
@@ -24,10 +30,13 @@ class LLMFactory:
             return ChatOllama(
                 model=model,
                 base_url=base_url,
-                temperature=temperature
+                temperature=temperature,
+                client_kwargs=get_client_registry().ollama_client_kwargs()
             )
         
         elif provider == "openai":
+            from langchain_openai import ChatOpenAI
+            
             model = config.get('llm', 'openai', 'model')
             api_key = config.get('llm', 'openai', 'api_key')
             temperature = config.get('llm', 'openai', 'temperature', default=0.1)
@@ -36,10 +45,28 @@ class LLMFactory:
                 raise ValueError("⚠️ OpenAI API key not set in environment!")
             
             logger.info(f"📦 Using OpenAI model: {model}")
+            registry = get_client_registry()
             return ChatOpenAI(
                 model=model,
                 openai_api_key=api_key,
-                temperature=temperature
+                temperature=temperature,
+                http_client=registry.http_client(),
+                http_async_client=registry.async_http_client()
+            )
+        
+        elif provider == "fake":
+            # Local stand-in for benchmarks and tests (no network)
+            from langchain_core.language_models.fake_chat_models import FakeListChatModel
+            
+            response = config.get(
+                'llm', 'fake', 'response',
+                default="This is a fixed answer from the fake LLM."
+            )
+            
+            logger.info("📦 Using fake LLM")
+            return FakeListChatModel(
+                responses=[response],
+                sleep=config.get('llm', 'fake', 'token_delay', default=None)
             )
         
         else:
@@ -47,5 +74,5 @@ class LLMFactory:
 
 # Convenience function
 def get_llm():
-    """Get LLM instance"""
-    return LLMFactory.create_llm()
\ No newline at end of file
+    """Get the shared LLM instance"""
+    return get_client_registry().get("llm", LLMFactory.create_llm)
\ No newline at end of file
@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+
+"""
+Gunicorn settings for multi-worker API deployments
+
+    gunicorn -c gunicorn.conf.py api.main:app
+
+Workers are separate processes: ingestion writes are serialized across
+them and published through server.state_directory, and job status lives
+in the shared job store. Use a shared vector store (pgvector, or Chroma
+in http mode) or the numpy provider; embedded Chroma is single-worker.
+"""
+
+from utils.config_loader import config
+
+bind = f"{config.get('server', 'host', default='0.0.0.0')}:{config.get('server', 'port', default=8000)}"
+workers = config.get('server', 'workers', default=1)
+worker_class = "uvicorn.workers.UvicornWorker"
+# LLM answers can take a while; match the client timeout
+timeout = config.get('clients', 'timeout', default=120)
+graceful_timeout = 30
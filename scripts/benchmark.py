@@ -0,0 +1,351 @@
+# scripts/benchmark.py
+
+"""
+Reproducible benchmark for the ingestion, query and API paths
+
+Usage:
+    python -m scripts.benchmark [--iterations 10] [--requests 200] [--concurrency 8]
+                                [--output data/benchmark/results.json]
+                                [--baseline benchmarks/baseline.json] [--save-baseline]
+
+Runs with config/benchmark.yaml (unless RAG_CONFIG is set): deterministic
+fake embeddings and LLM, no network, and throwaway data under
+./data/benchmark that is wiped before each run. Numbers therefore measure
+this code (extraction, chunking, indexing, retrieval, API overhead), not
+model servers.
+
+Results are written as JSON and compared with the stored baseline; the
+script exits with status 1 when a metric is worse than the baseline by
+more than --tolerance. There is no committed baseline: record one on the
+reference machine with --save-baseline.
+"""
+
+import os
+
+# Must be set before anything imports utils.config_loader
+os.environ.setdefault("RAG_CONFIG", "config/benchmark.yaml")
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+import httpx
+import numpy as np
+from app.ingestion.pymupdf_loader import load_and_process_pdf
+from app.embeddings.vectorstore import get_vectorstore
+from app.summarizer.ai_summary import get_rag_pipeline
+from utils.config_loader import config
+from utils.logger import logger
+from utils.metrics import collect_breakdown
+
+BENCHMARK_CONFIG = "config/benchmark.yaml"
+BENCHMARK_DATA_DIR = "./data/benchmark"
+
+QUESTIONS = [
+    "What is app.build and what problem does it solve?",
+    "Who are the authors of this paper? List their names and affiliations.",
+    "What is environment scaffolding and how does it work?",
+    "What are the key differences between model-centric generation and environment scaffolding?",
+    "What were the main experimental results and findings?",
+]
+
+# (metric path, direction) pairs compared against the baseline
+TRACKED_METRICS = [
+    ("ingestion.load_chunks_per_second", "higher"),
+    ("ingestion.index_chunks_per_second", "higher"),
+    ("query.p50_ms", "lower"),
+    ("query.p95_ms", "lower"),
+    ("api.requests_per_second", "higher"),
+    ("api.p95_ms", "lower"),
+]
+
+def latency_summary(samples: List[float]) -> Dict:
+    """Percentiles of latency samples (seconds) in milliseconds"""
+    ms = np.asarray(samples) * 1000
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3)
+    }
+
+def bench_ingestion(pdf_path: str, repeat: int) -> Dict:
+    """PDF extraction + chunking throughput, then vector store indexing throughput"""
+    source_name = os.path.basename(pdf_path)
+    
+    load_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = load_and_process_pdf(pdf_path, source_name=source_name)
+        load_times.append(time.perf_counter() - start)
+    load_seconds = float(np.median(load_times))
+    
+    store = get_vectorstore()
+    start = time.perf_counter()
+    store.add_documents(documents)
+    index_seconds = time.perf_counter() - start
+    
+    return {
+        "pdf": pdf_path,
+        "chunks": len(documents),
+        "characters": sum(len(doc.page_content) for doc in documents),
+        "load_seconds": round(load_seconds, 4),
+        "load_chunks_per_second": round(len(documents) / load_seconds, 1),
+        "index_seconds": round(index_seconds, 4),
+        "index_chunks_per_second": round(len(documents) / index_seconds, 1)
+    }
+
+def bench_queries(iterations: int, top_k: int) -> Dict:
+    """
+    End-to-end RAGPipeline.query latency with a per-stage breakdown
+    
+    The answer cache (if enabled) is cleared before every pass, so the
+    latencies cover retrieval and generation plus the cache lookup and
+    store; answers served from the cache are timed in a final pass.
+    """
+    rag = get_rag_pipeline()
+    rag.query(QUESTIONS[0], top_k=top_k)  # Warm-up (lazy clients, imports)
+    
+    latencies = []
+    stages: Dict[str, List[float]] = {}
+    retrieval = {"fetched": 0, "used": 0}
+    for _ in range(iterations):
+        if rag.answer_cache is not None:
+            rag.answer_cache.invalidate()
+        for question in QUESTIONS:
+            with collect_breakdown() as breakdown:
+                start = time.perf_counter()
+                rag.query(question, top_k=top_k)
+                latencies.append(time.perf_counter() - start)
+            for name, seconds in breakdown["timings"].items():
+                stages.setdefault(name, []).append(seconds)
+            for key in retrieval:
+                retrieval[key] += breakdown["retrieval"].get(key, 0)
+                
+    cache_hits = []
+    if rag.answer_cache is not None:
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            rag.query(question, top_k=top_k)
+            cache_hits.append(time.perf_counter() - start)
+            
+    return {
+        "queries": len(latencies),
+        **latency_summary(latencies),
+        "cache_hit_p50_ms": (
+            round(float(np.percentile(cache_hits, 50)) * 1000, 3) if cache_hits else None
+        ),
+        "candidates_fetched_per_query": round(retrieval["fetched"] / len(latencies), 2),
+        "candidates_used_per_query": round(retrieval["used"] / len(latencies), 2),
+        "stages_p50_ms": {
+            name: round(float(np.percentile(samples, 50)) * 1000, 3)
+            for name, samples in sorted(stages.items())
+        }
+    }
+
+async def _load_test(client: httpx.AsyncClient, total: int, concurrency: int, top_k: int) -> Dict:
+    """Send `total` POST /query requests from `concurrency` clients"""
+    latencies = []
+    errors = 0
+    pending = iter(range(total))
+    
+    async def client_loop() -> None:
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            response = await client.post(
+                "/query",
+                json={"question": QUESTIONS[i % len(QUESTIONS)], "top_k": top_k}
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+                
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - start
+    
+    return {
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(total / wall_seconds, 2),
+        **latency_summary(latencies)
+    }
+
+async def bench_api(total: int, concurrency: int, top_k: int) -> Dict:
+    """
+    POST /query throughput with `concurrency` clients (in-process ASGI transport)
+    
+    The main load test runs with the answer cache switched off, so it
+    measures retrieval and generation like the default configuration.
+    If the cache is enabled, a second load test on the already-answered
+    questions is reported separately as "cache_hit".
+    """
+    from api.main import app
+    
+    rag = get_rag_pipeline()
+    answer_cache, rag.answer_cache = rag.answer_cache, None
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        try:
+            await client.post("/query", json={"question": QUESTIONS[0], "top_k": top_k})  # Warm-up
+            results = await _load_test(client, total, concurrency, top_k)
+        finally:
+            rag.answer_cache = answer_cache
+            
+        if answer_cache is not None:
+            answer_cache.invalidate()
+            for question in QUESTIONS:
+                await client.post("/query", json={"question": question, "top_k": top_k})
+            results["cache_hit"] = await _load_test(client, total, concurrency, top_k)
+            
+    return {"requests": total, "concurrency": concurrency, **results}
+
+def _metric(results: Dict, path: str):
+    value = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Compare tracked metrics with a baseline
+    
+    Returns:
+        One row per metric present in both, with the relative change and
+        whether it is a regression beyond the tolerance
+    """
+    rows = []
+    for path, direction in TRACKED_METRICS:
+        current, previous = _metric(results, path), _metric(baseline, path)
+        if current is None or not previous:
+            continue
+            
+        change = (current - previous) / previous
+        worse = -change if direction == "higher" else change
+        rows.append({
+            "metric": path,
+            "baseline": previous,
+            "current": current,
+            "change": round(change, 4),
+            "regression": worse > tolerance
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="./docs/sample.pdf")
+    parser.add_argument("--load-repeat", type=int, default=3, help="PDF load runs (median is reported)")
+    parser.add_argument("--iterations", type=int, default=10, help="Passes over the question set")
+    parser.add_argument("--requests", type=int, default=200, help="API requests in the load test")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent API clients")
+    parser.add_argument("--top-k", type=int, default=config.get('retrieval', 'top_k', default=5))
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DATA_DIR, "results.json"))
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+    
+    print("\n" + "="*70)
+    print("⏱️  RAG BENCHMARK")
+    print("="*70 + "\n")
+    
+    if config.config_path == BENCHMARK_CONFIG:
+        shutil.rmtree(BENCHMARK_DATA_DIR, ignore_errors=True)
+    else:
+        logger.warning(f"⚠️  Using {config.config_path}; existing data is not reset")
+        
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": config.config_path,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "providers": {
+            "embeddings": config.get('embeddings', 'provider'),
+            "llm": config.get('llm', 'provider'),
+            "vectorstore": config.get('vectorstore', 'provider'),
+            "retrieval_mode": config.get('retrieval', 'mode', default="dense")
+        }
+    }
+    
+    logger.info("📄 Benchmarking ingestion...")
+    results["ingestion"] = bench_ingestion(args.pdf, args.load_repeat)
+    
+    logger.info("💬 Benchmarking queries...")
+    results["query"] = bench_queries(args.iterations, args.top_k)
+    
+    logger.info("🌐 Benchmarking the API...")
+    results["api"] = asyncio.run(bench_api(args.requests, args.concurrency, args.top_k))
+    
+    ingestion, query, api = results["ingestion"], results["query"], results["api"]
+    print(f"\n📄 Ingestion: {ingestion['chunks']} chunks")
+    print(f"   load   {ingestion['load_seconds']:.3f}s  ({ingestion['load_chunks_per_second']:.1f} chunks/s)")
+    print(f"   index  {ingestion['index_seconds']:.3f}s  ({ingestion['index_chunks_per_second']:.1f} chunks/s)")
+    print(f"\n💬 Query latency ({query['queries']} queries)")
+    print(f"   p50 {query['p50_ms']:.2f} ms   p95 {query['p95_ms']:.2f} ms   p99 {query['p99_ms']:.2f} ms")
+    for name, ms in query["stages_p50_ms"].items():
+        print(f"     {name:<28}{ms:>10.3f} ms")
+    if query["cache_hit_p50_ms"] is not None:
+        print(f"   answer cache hit p50 {query['cache_hit_p50_ms']:.2f} ms")
+    print(f"\n🌐 API: {api['requests']} requests, concurrency {api['concurrency']}, {api['errors']} errors")
+    print(f"   {api['requests_per_second']:.1f} req/s   p50 {api['p50_ms']:.2f} ms   p95 {api['p95_ms']:.2f} ms")
+    if "cache_hit" in api:
+        hits = api["cache_hit"]
+        print(
+            f"   answer cache hits: {hits['requests_per_second']:.1f} req/s   "
+            f"p50 {hits['p50_ms']:.2f} ms   p95 {hits['p95_ms']:.2f} ms"
+        )
+    
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"💾 Results written to {args.output}")
+    
+    if args.save_baseline:
+        baseline_dir = os.path.dirname(args.baseline)
+        if baseline_dir:
+            os.makedirs(baseline_dir, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.baseline}")
+        return
+        
+    if not os.path.exists(args.baseline):
+        print(f"\n💡 No baseline at {args.baseline}; record one with --save-baseline")
+        return
+        
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+        
+    if baseline.get("environment") != results["environment"]:
+        print("\n⚠️  Baseline was recorded in a different environment; compare with care")
+        
+    rows = compare(results, baseline, args.tolerance)
+    print(f"\n📊 Compared with {args.baseline} (tolerance {args.tolerance:.0%})\n")
+    print(f"   {'metric':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for row in rows:
+        flag = "  ❌" if row["regression"] else ""
+        print(f"   {row['metric']:<36}{row['baseline']:>12.2f}{row['current']:>12.2f}{row['change']:>+10.1%}{flag}")
+        
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
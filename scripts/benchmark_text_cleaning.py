@@ -0,0 +1,85 @@
+# scripts/benchmark_text_cleaning.py
+
+"""
+Micro-benchmark: app.pipeline.text_cleaning vs the original clean_text functions
+
+Usage:
+    python -m scripts.benchmark_text_cleaning [--pdf ./docs/sample.pdf] [--noise 0.05] [--number 20]
+
+Cleans every page of the PDF, plus a copy with random OCR-style noise
+(stray symbols, form feeds, blank lines), with both implementations,
+checks the outputs are identical and reports the best-of-5 timings.
+"""
+
+import argparse
+import random
+import re
+import timeit
+from app.pipeline.text_cleaning import clean_texts
+
+def legacy_clean_ocr_text(text: str) -> str:
+    """Original app.pipeline.document_normalizer.clean_text"""
+    if not text:
+        return ""
+    text = re.sub(r"\n+", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"[^\w\s.,!?;:()\-\"\'%$€]", "", text)
+    text = re.sub(r"\s[a-zA-Z]\s", " ", text)
+    return text.strip()
+
+def legacy_clean_pdf_text(text: str) -> str:
+    """Original app.ingestion.pymupdf_loader.clean_text"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\d+\n', ' ', text)
+    text = re.sub(r'\.{3,}', ' ', text)
+    return text.strip()
+
+def add_ocr_noise(text: str, rate: float, rng: random.Random) -> str:
+    noise = "@#^&*~|<>[]{}•–—“”’©®\x0c\t\r\n\n  ....a"
+    return "".join(rng.choice(noise) if rng.random() < rate else c for c in text)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="./docs/sample.pdf")
+    parser.add_argument("--noise", type=float, default=0.05, help="Noise rate of the OCR-style copy")
+    parser.add_argument("--number", type=int, default=20, help="Passes over all pages per timing")
+    args = parser.parse_args()
+    
+    import fitz  # PyMuPDF
+    
+    with fitz.open(args.pdf) as doc:
+        pages = [page.get_text() for page in doc]
+    rng = random.Random(0)
+    corpora = {
+        "pdf": pages,
+        "ocr-noise": [add_ocr_noise(page, args.noise, rng) for page in pages]
+    }
+    cases = [
+        ("pdf", legacy_clean_pdf_text, lambda texts: clean_texts(texts)),
+        ("ocr", legacy_clean_ocr_text, lambda texts: clean_texts(texts, ocr=True))
+    ]
+    
+    print("\n" + "="*70)
+    print("🧹 TEXT CLEANING BENCHMARK")
+    print("="*70 + "\n")
+    print(f"   {len(pages)} pages, {sum(map(len, pages))} characters, {args.number} passes\n")
+    print(f"   {'cleaner':<8}{'corpus':<12}{'legacy ms':>12}{'new ms':>12}{'speedup':>10}")
+    
+    for name, legacy, batch in cases:
+        for corpus_name, texts in corpora.items():
+            if batch(texts) != [legacy(text) for text in texts]:
+                raise AssertionError(f"❌ Output differs for {name} on {corpus_name}")
+                
+            legacy_time = min(timeit.repeat(lambda: [legacy(text) for text in texts], number=args.number, repeat=5))
+            new_time = min(timeit.repeat(lambda: batch(texts), number=args.number, repeat=5))
+            print(
+                f"   {name:<8}{corpus_name:<12}{legacy_time / args.number * 1000:>12.3f}"
+                f"{new_time / args.number * 1000:>12.3f}{legacy_time / new_time:>9.2f}x"
+            )
+            
+    print("\n✅ Outputs identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# scripts/build_ann_index.py
+
+"""
+Build the HNSW index for the NumPy vector store and report recall vs latency
+
+Usage:
+    python -m scripts.build_ann_index [--k 5] [--queries 200] [--ef 16 32 64 128 256]
+
+The report compares approximate results with exact brute-force search on
+the current collection, so ef_search can be chosen deliberately. Queries
+are stored chunk vectors with small random perturbations.
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from app.embeddings.ann_index import HnswIndex
+from app.embeddings.vectorstore import get_vectorstore
+from utils.config_loader import config
+from utils.logger import logger
+
+def exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    top = np.argpartition(scores, -k)[-k:]
+    return top[np.argsort(-scores[top])]
+
+def percentile_ms(samples: list, q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=config.get('retrieval', 'top_k', default=5))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--noise", type=float, default=0.05, help="Query perturbation scale")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+    
+    print("\n" + "="*70)
+    print("🕸️  BUILDING ANN INDEX")
+    print("="*70 + "\n")
+    
+    if config.get('vectorstore', 'provider') != "numpy":
+        raise ValueError("❌ The ANN index is only used by the numpy vector store provider")
+        
+    store = get_vectorstore()
+    ids, matrix = store.vectorstore.vectors()
+    if not ids:
+        raise ValueError("❌ The collection is empty; ingest documents first")
+        
+    path = config.get('vectorstore', 'ann', 'path', default="./data/numpy_index/hnsw.bin")
+    m = config.get('vectorstore', 'ann', 'm', default=16)
+    ef_construction = config.get('vectorstore', 'ann', 'ef_construction', default=200)
+    
+    start = time.perf_counter()
+    index = HnswIndex.build(path, ids, matrix, m=m, ef_construction=ef_construction)
+    build_seconds = time.perf_counter() - start
+    index.save()
+    print(f"✅ Built index over {len(ids)} vectors in {build_seconds:.2f}s -> {path}\n")
+    
+    # Perturbed stored vectors as queries
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = matrix[sample] + rng.normal(scale=args.noise, size=(len(sample), matrix.shape[1]))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    queries = queries.astype(np.float32)
+    k = min(args.k, len(ids))
+    
+    exact_times, ground_truth = [], []
+    for query in queries:
+        start = time.perf_counter()
+        top = exact_top_k(matrix, query, k)
+        exact_times.append(time.perf_counter() - start)
+        ground_truth.append({ids[row] for row in top})
+        
+    report = {
+        "vectors": len(ids),
+        "dimension": int(matrix.shape[1]),
+        "k": k,
+        "queries": len(queries),
+        "m": m,
+        "ef_construction": ef_construction,
+        "build_seconds": round(build_seconds, 3),
+        "exact": {"p50_ms": percentile_ms(exact_times, 50), "p95_ms": percentile_ms(exact_times, 95)},
+        "ann": []
+    }
+    
+    for ef in args.ef:
+        index.set_ef(max(ef, k))
+        times, recalls = [], []
+        for query, truth in zip(queries, ground_truth):
+            start = time.perf_counter()
+            results = index.search(query, k)
+            times.append(time.perf_counter() - start)
+            recalls.append(len(truth & {doc_id for doc_id, _ in results}) / k)
+            
+        report["ann"].append({
+            "ef_search": ef,
+            "recall": round(float(np.mean(recalls)), 4),
+            "p50_ms": percentile_ms(times, 50),
+            "p95_ms": percentile_ms(times, 95)
+        })
+        
+    print(f"📊 Recall@{k} vs latency ({len(queries)} queries, {len(ids)} vectors)\n")
+    print(f"   {'setting':<14}{'recall':>10}{'p50 ms':>12}{'p95 ms':>12}")
+    print(f"   {'exact':<14}{1.0:>10.4f}{report['exact']['p50_ms']:>12.3f}{report['exact']['p95_ms']:>12.3f}")
+    for row in report["ann"]:
+        print(f"   {'ef=' + str(row['ef_search']):<14}{row['recall']:>10.4f}{row['p50_ms']:>12.3f}{row['p95_ms']:>12.3f}")
+        
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"💾 Report written to {args.output}")
+        
+    print("\n💡 Set vectorstore.ann.ef_search and enable vectorstore.ann in config.yaml")
+
+if __name__ == "__main__":
+    main()
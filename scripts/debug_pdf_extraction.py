@@ -1,7 +1,8 @@
 # scripts/debug_pdf_extraction.py
 
 from app.ingestion.pdf_loader import partition_document, create_chunks_by_title
-from app.pipeline.document_normalizer import build_documents, clean_text
+from app.pipeline.document_normalizer import build_documents
+from app.pipeline.text_cleaning import clean_ocr_text
 
 pdf_file = "./docs/sample.pdf"
 
@@ -33,7 +34,7 @@ if chunks:
     print("\n")
     
     print("🧹 First chunk (after cleaning):")
-    cleaned = clean_text(chunks[0].text)
+    cleaned = clean_ocr_text(chunks[0].text)
     print(cleaned[:500])
     print("\n")
 
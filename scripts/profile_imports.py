@@ -0,0 +1,109 @@
+# scripts/profile_imports.py
+
+"""
+Report the import time of the entry points, by package
+
+Usage:
+    python -m scripts.profile_imports [api.main scripts.run_full_pipeline ...]
+                                      [--repeat 3] [--top 15] [--max-ms 2000]
+                                      [--output data/import_profile.json]
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+(the best of --repeat runs is kept). Self times are summed per top-level
+package, so the report shows which dependency a cold start pays for;
+providers and parsers should only appear when selected in config. With
+--max-ms the script exits with status 1 when an entry point is slower.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = ["api.main", "scripts.run_full_pipeline"]
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Column header
+        imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return imports
+
+def profile_module(module: str) -> Dict:
+    """Import a module in a fresh interpreter and summarize -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"❌ Importing {module} failed:\n{result.stderr[-2000:]}")
+        
+    imports = parse_importtime(result.stderr)
+    total_us = next(cumulative for name, _, cumulative in imports if name == module)
+    
+    packages = defaultdict(int)
+    for name, self_us, _ in imports:
+        packages[name.split(".")[0]] += self_us
+        
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(imports),
+        "loaded": sorted({name for name, _, _ in imports}),
+        "packages_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per module (best is kept)")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown per module")
+    parser.add_argument("--max-ms", type=float, help="Fail when an import takes longer")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+    
+    print("\n" + "="*70)
+    print("⏱️  IMPORT TIME PROFILE")
+    print("="*70 + "\n")
+    
+    report = {}
+    for module in args.modules:
+        runs = [profile_module(module) for _ in range(max(args.repeat, 1))]
+        report[module] = min(runs, key=lambda run: run["total_ms"])
+        
+    for module, profile in report.items():
+        print(f"📦 {module}: {profile['total_ms']:.1f} ms ({profile['modules']} modules)\n")
+        print(f"   {'package':<32}{'self ms':>10}")
+        for package, ms in list(profile["packages_ms"].items())[:args.top]:
+            print(f"   {package:<32}{ms:>10.1f}")
+        print()
+        
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+        
+    if args.max_ms is not None:
+        slow = [module for module, profile in report.items() if profile["total_ms"] > args.max_ms]
+        if slow:
+            print(f"❌ Slower than {args.max_ms:.0f} ms: {', '.join(slow)}")
+            sys.exit(1)
+        print(f"✅ All imports under {args.max_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -56,14 +56,20 @@ def main():
         "What were the main experimental results and findings?",
     ]
     
-    for i, query in enumerate(test_queries, 1):
+    # Embed, retrieve and generate for all questions in one batch
+    batch = rag.query_batch(test_queries, top_k=3)
+    
+    for i, (query, result) in enumerate(zip(test_queries, batch["results"]), 1):
         print(f"\n{'─'*70}")
         print(f"❓ Question {i}: {query}")
         print('─'*70)
         
-        result = rag.query(query, top_k=3)
+        if result.get("error"):
+            print(f"\n❌ Failed: {result['error']}\n")
+            continue
         
         print(f"\n🤖 Answer:\n{result['answer']}\n")
+        print(f"⏱️  Generation: {result['timings']['generation']:.2f}s, done after {result['query_time']:.2f}s")
         
         print(f"📚 Sources ({result['retrieved_docs']} documents retrieved):")
         for j, source in enumerate(result['sources'], 1):
@@ -72,6 +78,13 @@ def main():
         
         print()
     
+    timings = batch["timings"]
+    print(
+        f"⏱️  Batch timings: embedding {timings['embedding']:.2f}s, "
+        f"retrieval {timings['retrieval']:.2f}s, generation {timings['generation']:.2f}s, "
+        f"total {timings['total']:.2f}s"
+    )
+    
     print("\n" + "="*70)
     print("✅ COMPLETE PIPELINE TEST FINISHED!")
     print("="*70 + "\n")
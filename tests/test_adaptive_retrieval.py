@@ -0,0 +1,93 @@
+# tests/test_adaptive_retrieval.py
+
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+from app.embeddings.numpy_store import NumpyVectorStore
+from app.retriever.query import Retriever
+from utils.metrics import collect_breakdown
+
+class StarvedIndex:
+    """Approximate index that returns at most k // 4 candidates (e.g. post-filtered HNSW)"""
+    
+    def __init__(self, distances):
+        self.distances = distances
+        self.calls = []
+    
+    def similarity_search_within(self, embedding, k, max_distance, filter=None):
+        self.calls.append(k)
+        candidates = [
+            (Document(page_content=str(i), id=str(i)), distance)
+            for i, distance in enumerate(self.distances[:k // 4])
+        ]
+        return [(doc, d) for doc, d in candidates if d <= max_distance], len(candidates)
+    
+    def is_exact(self, filter=None):
+        return False
+
+class ExactIndex:
+    """Exact NumPy store behind the VectorStoreManager interface"""
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def similarity_search_within(self, embedding, k, max_distance, filter=None):
+        return self.store.search_within(embedding, k, max_distance, filter)
+    
+    def is_exact(self, filter=None):
+        return True
+
+def test_adaptive_retrieval():
+    """Test threshold pushdown in the NumPy store and adaptive k expansion"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING ADAPTIVE RETRIEVAL")
+    print("="*60 + "\n")
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(400, 8)).astype(np.float32)
+    ids = [f"doc-{i}" for i in range(400)]
+    store = NumpyVectorStore(tempfile.mkdtemp(), block_size=64)
+    store.upsert(ids, vectors.tolist(), ids, [{"row": i} for i in range(400)])
+    
+    # Pushed-down threshold returns exactly the in-range prefix of a plain search
+    query = rng.normal(size=8).tolist()
+    full = store.search(query, k=50)
+    max_distance = full[9][1]
+    results, candidates = store.search_within(query, 50, max_distance)
+    assert [doc.id for doc, _ in results] == [doc.id for doc, _ in full[:10]]
+    assert candidates == 50
+    assert store.search_within(query, 50, 0.0) == ([], 50)
+    
+    # Exact search: one round, never expanded
+    retriever = Retriever.__new__(Retriever)
+    retriever.vectorstore = ExactIndex(store)
+    retriever.score_threshold = max_distance
+    retriever.max_k = 100
+    retriever.growth_factor = 2
+    with collect_breakdown() as breakdown:
+        assert len(retriever._adaptive_search("q", 20, query_embedding=query)) == 10
+    assert breakdown["retrieval"] == {"fetched": 20, "used": 10, "rounds": 1}
+    
+    # Starved approximate index: k grows until enough in-range results are found
+    index = StarvedIndex([0.1] * 30 + [0.9] * 30)
+    retriever.vectorstore = index
+    retriever.score_threshold = 0.5
+    with collect_breakdown() as breakdown:
+        results = retriever._adaptive_search("q", 5, query_embedding=[0.0])
+    assert len(results) == 5
+    assert index.calls == [5, 10, 20]
+    assert breakdown["retrieval"]["rounds"] == 3
+    
+    # ... and stops at max_k when the threshold leaves too few
+    index.calls = []
+    retriever.max_k = 64
+    assert len(retriever._adaptive_search("q", 40, query_embedding=[0.0])) == 16
+    assert index.calls == [40, 64]
+    
+    print("\n" + "="*60)
+    print("✅ ALL ADAPTIVE RETRIEVAL TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_adaptive_retrieval()
@@ -0,0 +1,53 @@
+# tests/test_ann_index.py
+
+import os
+import tempfile
+import numpy as np
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from app.embeddings.ann_index import HnswIndex
+
+def test_ann_index():
+    """Test recall against exact search, updates and persistence"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING HNSW ANN INDEX")
+    print("="*60 + "\n")
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"doc-{i}" for i in range(2000)]
+    
+    path = os.path.join(tempfile.mkdtemp(), "hnsw.bin")
+    index = HnswIndex.build(path, ids, vectors, m=16, ef_construction=200, ef_search=128)
+    
+    # High ef_search recovers (almost) all exact neighbours
+    hits = 0
+    for query in vectors[:50]:
+        exact = {ids[i] for i in np.argsort(-(vectors @ query))[:5]}
+        hits += len(exact & {doc_id for doc_id, _ in index.search(query, 5)})
+    assert hits / 250 >= 0.95
+    
+    # Distances use the 2 - 2*cos scale
+    doc_id, distance = index.search(vectors[3], 1)[0]
+    assert doc_id == "doc-3" and abs(distance) < 1e-4
+    
+    # Deleted IDs disappear, new IDs are searchable
+    index.delete(["doc-3"])
+    index.add(["new"], vectors[3:4])
+    assert index.search(vectors[3], 1)[0][0] == "new"
+    
+    index.save()
+    reloaded = HnswIndex.load(path, ef_search=64)
+    assert len(reloaded) == 2000
+    assert reloaded.search(vectors[3], 1)[0][0] == "new"
+    
+    print("\n" + "="*60)
+    print("✅ ALL ANN INDEX TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_ann_index()
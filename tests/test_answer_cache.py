@@ -0,0 +1,40 @@
+# tests/test_answer_cache.py
+
+from app.summarizer.answer_cache import SemanticAnswerCache
+
+def test_answer_cache():
+    """Test similarity hits, version invalidation and eviction"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING SEMANTIC ANSWER CACHE")
+    print("="*60 + "\n")
+    
+    cache = SemanticAnswerCache(similarity_threshold=0.95, ttl_seconds=60, max_entries=2)
+    result = {"answer": "Die DSGVO regelt den Datenschutz.", "retrieved_docs": 2}
+    
+    cache.store([1.0, 0.0, 0.0], 1, "k3", result)
+    
+    # Near-identical question hits, different question misses
+    assert cache.lookup([0.99, 0.05, 0.0], 1, "k3")["answer"] == result["answer"]
+    assert cache.lookup([0.0, 1.0, 0.0], 1, "k3") is None
+    
+    # Different query parameters never share answers
+    assert cache.lookup([1.0, 0.0, 0.0], 1, "k5") is None
+    
+    # A new collection version invalidates the entry
+    assert cache.lookup([1.0, 0.0, 0.0], 2, "k3") is None
+    assert cache.get_stats()["entries"] == 0
+    
+    # LRU eviction keeps at most max_entries
+    for i in range(3):
+        cache.store([float(i), 1.0, 0.0], 2, "k3", result)
+    assert cache.get_stats()["entries"] == 2
+    
+    print(f"✅ Cache stats: {cache.get_stats()}")
+    
+    print("\n" + "="*60)
+    print("✅ ALL ANSWER CACHE TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_answer_cache()
@@ -0,0 +1,147 @@
+# tests/test_batch_query.py
+
+import tempfile
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from app.embeddings.numpy_store import NumpyVectorStore
+from app.retriever.context_packer import ContextPacker
+from app.retriever.query import Retriever, embed_queries
+from app.summarizer.ai_summary import RAGPipeline
+
+TOPICS = ["invoice", "warranty", "shipping"]
+
+class TopicEmbeddings:
+    """One axis per topic word; embed_documents counts its calls"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed_query(self, text):
+        return [1.0 if topic in text else 0.05 for topic in TOPICS]
+    
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self.embed_query(text) for text in texts]
+
+class LocalIndex:
+    """NumPy store behind the VectorStoreManager interface"""
+    
+    collection_version = 0
+    
+    def __init__(self, store, embeddings):
+        self.store = store
+        self.embeddings = embeddings
+        self.batch_searches = 0
+    
+    def refresh(self):
+        pass
+    
+    def similarity_search_with_score(self, query, k, filter=None):
+        return self.store.search(self.embeddings.embed_query(query), k, filter=filter)
+    
+    def similarity_search_by_vector_with_score(self, embedding, k, filter=None):
+        return self.store.search(embedding, k, filter=filter)
+    
+    def similarity_search_by_vectors_with_score(self, embeddings, k, filter=None):
+        self.batch_searches += 1
+        return self.store.search_batch(embeddings, k, filter=filter)
+    
+    def similarity_search_within(self, embedding, k, max_distance, filter=None):
+        return self.store.search_within(embedding, k, max_distance, filter)
+    
+    def is_exact(self, filter=None):
+        return True
+
+class EchoChatModel(BaseChatModel):
+    """Answers with the question it was asked"""
+    
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=messages[-1].content))])
+
+def make_retriever(adaptive: bool) -> Retriever:
+    embeddings = TopicEmbeddings()
+    store = NumpyVectorStore(tempfile.mkdtemp())
+    texts = [
+        "invoice numbers are printed top right", "warranty lasts two years",
+        "shipping takes three days", "invoice copies are emailed"
+    ]
+    sources = ["billing.pdf", "terms.pdf", "terms.pdf", "archive.pdf"]
+    store.upsert(
+        [f"doc-{i}" for i in range(4)], embeddings.embed_documents(texts), texts,
+        [{"source": source} for source in sources]
+    )
+    
+    retriever = Retriever.__new__(Retriever)
+    retriever.vectorstore = LocalIndex(store, embeddings)
+    retriever.top_k = 2
+    retriever.score_threshold = 0.5
+    retriever.mode = "dense"
+    retriever.adaptive = adaptive
+    retriever.max_k = 8
+    retriever.growth_factor = 2
+    retriever.reranker = None
+    retriever.context_packer = ContextPacker.from_config()
+    return retriever
+
+def test_batch_query():
+    """Test that batch retrieval and answering return one result per question, in order"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING BATCH QUERIES")
+    print("="*60 + "\n")
+    
+    questions = ["shipping time?", "invoice layout?", "warranty length?", "invoice copies?"]
+    
+    # One model call, one vector per question in input order
+    embeddings = TopicEmbeddings()
+    vectors = embed_queries(embeddings, questions)
+    assert embeddings.calls == 1
+    assert vectors == [embeddings.embed_query(question) for question in questions]
+    
+    for adaptive in (False, True):
+        retriever = make_retriever(adaptive)
+        batch = retriever.retrieve_batch(questions, top_k=2)
+        assert len(batch) == len(questions)
+        # Same results as retrieving one question at a time
+        for question, results in zip(questions, batch):
+            assert results == retriever.retrieve(question, top_k=2)
+        assert [results[0][0].page_content.split()[0] for results in batch] == [
+            "shipping", "invoice", "warranty", "invoice"
+        ]
+        
+        # The filter applies to every question
+        source_filter = {"source": "terms.pdf"}
+        filtered = retriever.retrieve_batch(questions, top_k=2, filter=source_filter)
+        assert all(doc.metadata["source"] == "terms.pdf" for results in filtered for doc, _ in results)
+        assert [len(results) for results in filtered] == [1, 0, 1, 0]
+        assert filtered == [
+            retriever.retrieve(question, top_k=2, filter=source_filter) for question in questions
+        ]
+    assert retriever.vectorstore.batch_searches == 0  # Adaptive searches per question
+    
+    # Answers line up with their questions, whatever order generation finishes in
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.llm = EchoChatModel()
+    pipeline.retriever = make_retriever(adaptive=False)
+    pipeline.answer_cache = None
+    pipeline._setup_prompt()
+    batch = pipeline.query_batch(questions, top_k=2, max_concurrency=4, filter={"source": "terms.pdf"})
+    assert [result["question"] for result in batch["results"]] == questions
+    assert [result["answer"] for result in batch["results"]] == [
+        "shipping time?", pipeline._empty_result()["answer"],
+        "warranty length?", pipeline._empty_result()["answer"]
+    ]
+    assert pipeline.retriever.vectorstore.batch_searches == 1
+    assert set(batch["timings"]) == {"embedding", "retrieval", "generation", "total"}
+    
+    print("\n" + "="*60)
+    print("✅ ALL BATCH QUERY TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_batch_query()
@@ -0,0 +1,72 @@
+# tests/test_benchmark.py
+
+import copy
+import os
+from app.embeddings.embedding_factory import EmbeddingFactory
+from app.summarizer.llm_factory import LLMFactory
+from utils.config_loader import config
+
+def test_fake_providers():
+    """Test the offline embedding and LLM stand-ins used by the benchmark"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING FAKE PROVIDERS")
+    print("="*60 + "\n")
+    
+    original = copy.deepcopy(config.config)
+    try:
+        config.config['embeddings'] = {"provider": "fake", "fake": {"size": 16}, "cache": {"enabled": False}}
+        config.config['llm'] = {"provider": "fake", "fake": {"response": "fixed answer"}}
+        
+        embeddings = EmbeddingFactory.create_embeddings()
+        vector = embeddings.embed_query("same text")
+        assert len(vector) == 16
+        assert vector == embeddings.embed_query("same text")  # Deterministic
+        
+        llm = LLMFactory.create_llm()
+        assert llm.invoke("any prompt").content == "fixed answer"
+    finally:
+        config.config = original
+        
+    print("\n" + "="*60)
+    print("✅ ALL FAKE PROVIDER TESTS PASSED!")
+    print("="*60 + "\n")
+
+def test_baseline_comparison():
+    """Test regression detection against a stored baseline"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING BASELINE COMPARISON")
+    print("="*60 + "\n")
+    
+    preset = "RAG_CONFIG" in os.environ
+    from scripts.benchmark import compare
+    if not preset:
+        os.environ.pop("RAG_CONFIG", None)
+        
+    baseline = {
+        "query": {"p50_ms": 10.0, "p95_ms": 20.0},
+        "api": {"requests_per_second": 100.0}
+    }
+    results = {
+        "query": {"p50_ms": 11.0, "p95_ms": 30.0},  # +10% within tolerance, +50% regressed
+        "api": {"requests_per_second": 70.0}        # 30% fewer requests/s
+    }
+    
+    rows = {row["metric"]: row for row in compare(results, baseline, tolerance=0.2)}
+    assert set(rows) == {"query.p50_ms", "query.p95_ms", "api.requests_per_second"}
+    assert not rows["query.p50_ms"]["regression"]
+    assert rows["query.p95_ms"]["regression"]
+    assert rows["api.requests_per_second"]["regression"]
+    
+    # Improvements never count as regressions
+    rows = compare(baseline, results, tolerance=0.2)
+    assert not any(row["regression"] for row in rows)
+    
+    print("\n" + "="*60)
+    print("✅ ALL BASELINE COMPARISON TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_fake_providers()
+    test_baseline_comparison()
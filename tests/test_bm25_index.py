@@ -0,0 +1,50 @@
+# tests/test_bm25_index.py
+
+import os
+import tempfile
+from langchain_core.documents import Document
+from app.retriever.bm25_index import BM25Index, tokenize
+
+def test_bm25_index():
+    """Test keyword ranking, upserts, deletes and persistence"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING BM25 INDEX")
+    print("="*60 + "\n")
+    
+    assert tokenize("Teil XJ-4411, Seite 3") == ["teil", "xj", "4411", "seite", "3"]
+    
+    path = os.path.join(tempfile.mkdtemp(), "bm25", "index.json")
+    index = BM25Index(path)
+    index.add(
+        ["a", "b", "c"],
+        [
+            Document(page_content="Die DSGVO regelt den Datenschutz.", metadata={"page": 1}),
+            Document(page_content="Autoren: Max Mustermann, Erika Musterfrau", metadata={"page": 2}),
+            Document(page_content="Datenschutz und Datenschutz im Unternehmen", metadata={"page": 3}),
+        ]
+    )
+    
+    # Exact names rank first; repeated terms outrank single mentions
+    results = index.search("Mustermann", k=2)
+    assert [doc.id for doc, _ in results] == ["b"]
+    assert [doc.id for doc, _ in index.search("datenschutz", k=3)] == ["c", "a"]
+    
+    # Upserting replaces the old postings, deleting removes them
+    index.add(["b"], [Document(page_content="Vorwort", metadata={"page": 2})])
+    assert index.search("Mustermann", k=2) == []
+    index.delete(["c"])
+    assert [doc.id for doc, _ in index.search("datenschutz", k=3)] == ["a"]
+    
+    # Persisted index is loaded lazily with the same content
+    index.flush()
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 2
+    assert reloaded.search("vorwort", k=1)[0][0].metadata == {"page": 2}
+    
+    print("\n" + "="*60)
+    print("✅ ALL BM25 INDEX TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_bm25_index()
@@ -0,0 +1,71 @@
+# tests/test_chunker.py
+
+from app.ingestion.chunker import TokenChunker, estimate_tokens
+
+def test_token_chunker():
+    """Test token budgets, overlap, page ranges and coverage of the token chunker"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING TOKEN CHUNKER")
+    print("="*60 + "\n")
+    
+    chunker = TokenChunker(chunk_tokens=60, overlap_tokens=15, min_chunk_length=0)
+    chunker.count_tokens = estimate_tokens  # Independent of tiktoken
+    
+    pages = [
+        {
+            "page_content": "\n".join(f"Page {page} sentence {i} has a few words." for i in range(12)),
+            "page_number": page
+        }
+        for page in range(1, 4)
+    ]
+    chunks = list(chunker.iter_chunks(pages, "doc.pdf"))
+    
+    assert len(chunks) > 1
+    for i, chunk in enumerate(chunks):
+        metadata = chunk.metadata
+        assert metadata["token_count"] <= 60
+        assert metadata["chunk_index"] == i
+        assert metadata["page"] == metadata["page_start"] <= metadata["page_end"]
+        
+    # Chunks span page boundaries
+    assert any(c.metadata["page_start"] != c.metadata["page_end"] for c in chunks)
+    
+    # Consecutive chunks overlap by at least one sentence
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.page_content.split(". ")[-1]
+        assert last_sentence in current.page_content
+        
+    # Every sentence is covered
+    text = " ".join(c.page_content for c in chunks)
+    for page in range(1, 4):
+        for i in range(12):
+            assert f"Page {page} sentence {i} has" in text
+            
+    # Sentences over budget are split on words
+    long_page = [{"page_content": "word " * 400, "page_number": 7}]
+    pieces = list(chunker.iter_chunks(long_page, "doc.pdf"))
+    assert len(pieces) > 1
+    assert all(p.metadata["token_count"] <= 60 for p in pieces)
+    
+    # Fragments under min_chunk_length are merged forward, never dropped
+    chunker = TokenChunker(chunk_tokens=18, overlap_tokens=0, min_chunk_length=40)
+    chunker.count_tokens = estimate_tokens
+    sentences = [
+        "Short intro.",
+        "This sentence is long enough to overflow the budget with the intro.",
+        "Another fairly long sentence fills the following chunk on its own.",
+        "The end."
+    ]
+    chunks = list(chunker.iter_chunks([{"page_content": " ".join(sentences), "page_number": 1}], "doc.pdf"))
+    for sentence in sentences:
+        assert any(sentence in c.page_content for c in chunks), sentence
+    assert chunks[0].page_content.startswith("Short intro. This sentence")
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    
+    print("\n" + "="*60)
+    print("✅ ALL TOKEN CHUNKER TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_token_chunker()
@@ -0,0 +1,53 @@
+# tests/test_client_registry.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.clients import ClientRegistry
+
+def test_client_registry():
+    """Test that shared clients are created once, reused, and closed on shutdown"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING CLIENT REGISTRY")
+    print("="*60 + "\n")
+    
+    registry = ClientRegistry()
+    created = []
+    lock = threading.Lock()
+    
+    def factory():
+        time.sleep(0.01)  # Widen the window for racing callers
+        with lock:
+            created.append(object())
+            return created[-1]
+            
+    # Concurrent first use builds a single instance
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _: registry.get("pipeline", factory), range(16)))
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
+    assert registry.get("other", object) is not created[0]
+    
+    # One pooled HTTP client per kind, shared by every caller
+    http_client = registry.http_client()
+    async_http_client = registry.async_http_client()
+    assert registry.http_client() is http_client
+    assert registry.async_http_client() is async_http_client
+    assert set(registry.ollama_client_kwargs()) == {"limits", "timeout"}
+    
+    # Shutdown closes connections; later use starts fresh
+    asyncio.run(registry.aclose())
+    assert http_client.is_closed and async_http_client.is_closed
+    assert registry.get("pipeline", factory) is not created[0]
+    assert len(created) == 2
+    assert registry.http_client() is not http_client
+    asyncio.run(registry.aclose())
+    
+    print("\n" + "="*60)
+    print("✅ ALL CLIENT REGISTRY TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_client_registry()
@@ -0,0 +1,72 @@
+# tests/test_context_packer.py
+
+from langchain_core.documents import Document
+from app.ingestion.chunker import estimate_tokens
+from app.retriever.context_packer import ContextPacker
+
+def test_context_packer():
+    """Test score ordering, near-duplicate removal and the token budget"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING CONTEXT PACKER")
+    print("="*60 + "\n")
+    
+    intro = (
+        "Environment scaffolding wraps the model in a structured workspace with "
+        "tests, linters and a fixed project layout so each generation step is validated. "
+        "Instead of asking one prompt to produce a whole application, the task is split "
+        "into small stages whose outputs are checked by deterministic tools before the "
+        "next stage starts, and failures are fed back to the model for repair."
+    )
+    results = [
+        (Document(page_content="The evaluation covers thirty applications built end to end. " * 6, metadata={"source": "paper.pdf", "page": 4}), 0.4),
+        (Document(page_content=intro, metadata={"source": "paper.pdf", "page": 1}), 0.1),
+        (Document(page_content=intro + " It differs.", metadata={"source": "paper.pdf", "page": 2}), 0.2),
+        (Document(page_content="Authors are affiliated with several research labs. " * 6, metadata={"source": "paper.pdf", "page": 5}), 0.3),
+    ]
+    
+    # Unlimited budget: best score first, the near-duplicate of page 1 dropped
+    packer = ContextPacker(max_tokens=None, dedup_threshold=0.85)
+    packer.count_tokens = estimate_tokens  # Independent of tiktoken
+    packed = packer.pack(results)
+    
+    pages = [doc.metadata["page"] for doc, _ in packed["documents"]]
+    assert pages == [1, 5, 4]
+    assert packed["duplicates"] == 1
+    assert not packed["truncated"]
+    assert packed["context"].startswith("[Dokument 1 - Quelle: paper.pdf, Seite: 1 (Relevanz: 0.90)]")
+    
+    # Tight budget: stays within it and cuts the last chunk that fits
+    packer.max_tokens = 160
+    packer.min_chunk_tokens = 10
+    packed = packer.pack(results)
+    assert packed["tokens"] <= 160
+    assert packed["truncated"]
+    assert estimate_tokens(packed["context"]) <= 160
+    assert [doc.metadata["page"] for doc, _ in packed["documents"]] == [1, 5]
+    
+    # Too little room left for a useful partial chunk: it is skipped entirely
+    packer.max_tokens = 80
+    packer.min_chunk_tokens = 60
+    packed = packer.pack(results)
+    assert [doc.metadata["page"] for doc, _ in packed["documents"]] == [1]
+    
+    # A chunk that doesn't fit doesn't end packing: smaller lower-ranked ones still can
+    note = (Document(page_content="Code is open source.", metadata={"source": "paper.pdf", "page": 9}), 0.5)
+    packer.max_tokens = None
+    packer.max_tokens = packer.pack(results[1:2])["tokens"] + 25
+    packer.min_chunk_tokens = 40
+    packed = packer.pack(results + [note])
+    assert [doc.metadata["page"] for doc, _ in packed["documents"]] == [1, 9]
+    assert packed["tokens"] <= packer.max_tokens and not packed["truncated"]
+    
+    # Plain documents (no scores) are accepted as well
+    packed = packer.pack([doc for doc, _ in results[:1]])
+    assert "(Relevanz" not in packed["context"]
+    
+    print("\n" + "="*60)
+    print("✅ ALL CONTEXT PACKER TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_context_packer()
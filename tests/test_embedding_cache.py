@@ -0,0 +1,112 @@
+# tests/test_embedding_cache.py
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import List
+from langchain_core.embeddings import Embeddings
+from app.embeddings.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic local embeddings that count model calls"""
+    
+    def __init__(self):
+        self.embedded_texts = 0
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded_texts += len(texts)
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class TracingCache(EmbeddingCache):
+    """Records the thread each lookup runs on"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+    
+    def get_many(self, keys):
+        self.threads.append(threading.get_ident())
+        return super().get_many(keys)
+
+def test_embedding_cache():
+    """Test cache hits, persistence, LRU eviction and read-only lookups"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING EMBEDDING CACHE")
+    print("="*60 + "\n")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        model = CountingEmbeddings()
+        cached = CachedEmbeddings(model, EmbeddingCache(path, max_entries=3), "test", "m1")
+        
+        texts = ["alpha text", "beta text", "alpha   text"]
+        first = cached.embed_documents(texts)
+        assert model.embedded_texts == 1 + 1  # normalized duplicates embedded once
+        assert first[0] == first[2]
+        
+        second = cached.embed_documents(texts[:2])
+        assert model.embedded_texts == 2
+        assert second == first[:2]
+        print(f"✅ Cache stats: {cached.cache.get_stats()}")
+        
+        # Query embeddings are keyed separately from document embeddings
+        cached.embed_query("alpha text")
+        assert model.embedded_texts == 3
+        
+        # Persistence: a new cache on the same file still hits
+        cached.cache.close()
+        reopened = CachedEmbeddings(model, EmbeddingCache(path, max_entries=3), "test", "m1")
+        reopened.embed_documents(["beta text"])
+        assert model.embedded_texts == 3
+        
+        # A different model must not reuse vectors
+        other = CachedEmbeddings(model, reopened.cache, "test", "m2")
+        other.embed_documents(["beta text"])
+        assert model.embedded_texts == 4
+        
+        stats = reopened.cache.get_stats()
+        assert stats["entries"] <= 3
+        assert stats["evictions"] >= 1
+        reopened.cache.close()
+        
+        # Hits write nothing; their access times still decide what is evicted
+        path = os.path.join(tmp, "lru.sqlite")
+        cache = EmbeddingCache(path, max_entries=2, touch_interval=3600)
+        cache.put_many({"old": [1.0]})
+        cache.put_many({"new": [2.0]})
+        
+        def last_access(key):
+            with sqlite3.connect(path) as conn:
+                return conn.execute(
+                    "SELECT last_access FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()[0]
+        
+        before = last_access("old")
+        assert cache.get_many(["old"]) == {"old": [1.0]}
+        assert last_access("old") == before
+        
+        cache.put_many({"newest": [3.0]})  # Evicts "new", the least recently used
+        assert set(cache.get_many(["old", "new", "newest"])) == {"old", "newest"}
+        cache.close()
+        
+        # Async embedding keeps SQLite off the event loop thread
+        tracing = TracingCache(os.path.join(tmp, "async.sqlite"))
+        cached = CachedEmbeddings(CountingEmbeddings(), tracing, "test", "m1")
+        vector = asyncio.run(cached.aembed_query("gamma text"))
+        assert asyncio.run(cached.aembed_documents(["gamma text"])) == [vector]
+        assert asyncio.run(cached.aembed_query("gamma text")) == vector
+        assert tracing.threads and threading.get_ident() not in tracing.threads
+        tracing.close()
+        
+    print("\n" + "="*60)
+    print("✅ ALL EMBEDDING CACHE TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_embedding_cache()
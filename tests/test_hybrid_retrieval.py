@@ -0,0 +1,67 @@
+# tests/test_hybrid_retrieval.py
+
+import os
+import tempfile
+from langchain_core.documents import Document
+from app.embeddings.numpy_store import NumpyVectorStore
+from app.retriever.bm25_index import BM25Index
+from app.retriever.query import Retriever
+
+class LocalIndex:
+    """NumPy store and BM25 index behind the VectorStoreManager interface"""
+    
+    def __init__(self, store, bm25):
+        self.store = store
+        self.bm25 = bm25
+    
+    def similarity_search_by_vector_with_score(self, embedding, k, filter=None):
+        return self.store.search(embedding, k, filter=filter)
+    
+    def keyword_search(self, query, k, filter=None):
+        return self.bm25.search(query, k)
+    
+    def distances(self, embedding, ids):
+        return self.store.distances(embedding, ids)
+
+def test_hybrid_retrieval():
+    """Test that keyword-only matches are held to the dense score threshold"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING HYBRID RETRIEVAL")
+    print("="*60 + "\n")
+    
+    directory = tempfile.mkdtemp()
+    ids = ["a", "b", "d", "c"]
+    texts = ["alpha report", "beta report", "gamma widget-42 manual", "widget-42 recipe"]
+    vectors = [[1.0, 0.0, 0.0], [0.95, 0.3, 0.0], [0.9, 0.43, 0.0], [-1.0, 0.0, 0.0]]
+    
+    store = NumpyVectorStore(os.path.join(directory, "vectors"))
+    store.upsert(ids, vectors, texts, [None] * 4)
+    bm25 = BM25Index(os.path.join(directory, "bm25.json"))
+    bm25.add(ids, [Document(page_content=text, id=doc_id) for doc_id, text in zip(ids, texts)])
+    
+    distances = store.distances([1.0, 0.0, 0.0], ["c", "d", "missing"])
+    assert set(distances) == {"c", "d"}
+    assert distances["d"] < 0.7 < distances["c"]
+    
+    retriever = Retriever.__new__(Retriever)
+    retriever.vectorstore = LocalIndex(store, bm25)
+    retriever.score_threshold = 0.7
+    retriever.candidate_k = 2
+    retriever.rrf_k = 60
+    retriever.adaptive = False
+    
+    # "d" is beyond the dense candidates but close enough; "c" only shares a word
+    results = retriever._hybrid_search("widget-42", 3, query_embedding=[1.0, 0.0, 0.0])
+    assert {doc.id for doc, _ in results} == {"a", "b", "d"}
+    assert all(0.0 <= score <= 1.0 for _, score in results)
+    
+    # Off-topic query: keyword overlap alone returns no context
+    assert retriever._hybrid_search("widget-42", 3, query_embedding=[0.0, 0.0, 1.0]) == []
+    
+    print("\n" + "="*60)
+    print("✅ ALL HYBRID RETRIEVAL TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_hybrid_retrieval()
@@ -0,0 +1,93 @@
+# tests/test_job_service.py
+
+import asyncio
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import UploadFile
+from api.services.document_service import DocumentService
+from api.services.job_service import JobService
+from api.services.job_store import JobStore
+
+def make_service(directory: str) -> JobService:
+    """Job service with one worker and a temporary job store"""
+    service = JobService.__new__(JobService)
+    service.max_workers = 1
+    service.max_tracked_jobs = 100
+    service.progress_interval = 0.0
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    service._jobs = {}
+    service._futures = {}
+    service._saved_at = {}
+    service._lock = threading.Lock()
+    service._store = JobStore(os.path.join(directory, "jobs.sqlite"))
+    return service
+
+def test_job_service():
+    """Test that shutdown records unfinished jobs instead of leaving them queued"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING INGESTION JOB SERVICE")
+    print("="*60 + "\n")
+    
+    directory = tempfile.mkdtemp()
+    service = make_service(directory)
+    
+    started = threading.Event()
+    release = threading.Event()
+    
+    def blocking_task(progress):
+        started.set()
+        release.wait(timeout=10)
+        return {"chunks_created": 3}
+        
+    service.submit("done", "done.pdf", lambda progress: {"chunks_created": 1})
+    service.submit("running", "running.pdf", blocking_task)
+    service.submit("queued", "queued.pdf", lambda progress: {"chunks_created": 2})
+    assert started.wait(timeout=10)
+    assert service.get_job("done")["status"] == "completed"
+    
+    service.shutdown()
+    
+    # Another worker reading the shared store sees an outcome for every job
+    store = JobStore(os.path.join(directory, "jobs.sqlite"))
+    queued = store.get("queued")
+    assert queued["status"] == "failed"
+    assert queued["error"].startswith("Cancelled")
+    assert queued["finished_at"]
+    running = store.get("running")
+    assert running["status"] == "failed"
+    assert running["error"].startswith("Interrupted")
+    assert store.get("done")["status"] == "completed"
+    assert store.get("done")["error"] is None
+    
+    # A running job that still finishes records its real outcome
+    release.set()
+    service._executor.shutdown(wait=True)
+    running = store.get("running")
+    assert running["status"] == "completed"
+    assert running["error"] is None
+    assert running["chunks_created"] == 3
+    assert service._futures == {}
+    
+    # An upload that can't be queued leaves no file behind
+    documents = DocumentService.__new__(DocumentService)
+    documents.job_service = service
+    documents.upload_dir = os.path.join(directory, "uploads")
+    os.makedirs(documents.upload_dir)
+    upload = UploadFile(io.BytesIO(b"%PDF-1.4"), filename="late.pdf")
+    try:
+        asyncio.run(documents.upload_and_process(upload))
+        raise AssertionError("submit after shutdown should fail")
+    except RuntimeError:
+        pass
+    assert os.listdir(documents.upload_dir) == []
+    
+    print("\n" + "="*60)
+    print("✅ ALL JOB SERVICE TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_job_service()
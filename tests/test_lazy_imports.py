@@ -0,0 +1,56 @@
+# tests/test_lazy_imports.py
+
+import json
+import os
+import subprocess
+import sys
+from scripts.profile_imports import parse_importtime
+
+# Only needed once the corresponding provider, backend or parser is used
+HEAVY_MODULES = [
+    "langchain_openai", "langchain_ollama", "chromadb", "langchain_chroma",
+    "psycopg", "fitz", "unstructured", "sentence_transformers", "uvicorn"
+]
+
+def test_lazy_imports():
+    """Test that importing the API loads no provider, backend, parser or config file"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING LAZY IMPORTS")
+    print("="*60 + "\n")
+    
+    script = (
+        "import json, sys\n"
+        "import api.main\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+        "from utils.config_loader import config\n"
+        "print(json.dumps(config._config is None))\n"
+        "from app.embeddings import EmbeddingCache, get_embeddings\n"
+        "print(json.dumps('langchain_openai' in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "RAG_CONFIG": "config/benchmark.yaml"}
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    
+    loaded, config_deferred, provider_loaded = [
+        json.loads(line) for line in result.stdout.splitlines()[-3:]
+    ]
+    print(f"   Heavy modules loaded by api.main: {loaded}")
+    assert loaded == []
+    assert config_deferred  # The YAML file is read on the first lookup
+    assert not provider_loaded  # Package exports resolve without loading providers
+    
+    imports = parse_importtime(result.stderr)
+    assert any(name == "api.main" for name, _, _ in imports)
+    assert all(cumulative >= self_us for _, self_us, cumulative in imports)
+    
+    print("\n" + "="*60)
+    print("✅ ALL LAZY IMPORT TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_lazy_imports()
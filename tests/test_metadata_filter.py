@@ -0,0 +1,79 @@
+# tests/test_metadata_filter.py
+
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from app.embeddings.metadata_filter import build_filter, matches, to_chroma_where
+from app.embeddings.numpy_store import NumpyVectorStore
+
+def test_metadata_filter():
+    """Test filter building, evaluation, Chroma translation and NumPy pushdown"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING METADATA FILTERS")
+    print("="*60 + "\n")
+    
+    # Page ranges select overlapping chunks; dates become epoch seconds
+    filter = build_filter(
+        source=["a.pdf", "b.pdf"],
+        page_from=3,
+        page_to=5,
+        category="Title",
+        uploaded_after=datetime(2026, 1, 1)
+    )
+    assert filter == {
+        "source": {"$in": ["a.pdf", "b.pdf"]},
+        "category": "Title",
+        "page_end": {"$gte": 3},
+        "page_start": {"$lte": 5},
+        "uploaded_at": {"$gte": int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())}
+    }
+    assert build_filter() is None
+    
+    chunk = {"source": "a.pdf", "category": "Title", "page_start": 5, "page_end": 6,
+             "uploaded_at": 1800000000}
+    assert matches(chunk, filter)
+    assert not matches({**chunk, "page_start": 6}, filter)
+    assert not matches({**chunk, "source": "c.pdf"}, filter)
+    assert not matches({"source": "a.pdf"}, filter)  # Missing keys never match ranges
+    
+    # Chroma takes one clause as is and several under $and
+    assert to_chroma_where({"source": "a.pdf"}) == {"source": {"$eq": "a.pdf"}}
+    assert to_chroma_where(build_filter(page_from=2, page_to=4)) == {
+        "$and": [{"page_end": {"$gte": 2}}, {"page_start": {"$lte": 4}}]
+    }
+    with pytest.raises(ValueError):
+        matches(chunk, {"page": {"$regex": "1"}})
+        
+    # NumPy store restricts the scan to matching rows before ranking
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 8)).astype(np.float32)
+    ids = [f"doc-{i}" for i in range(300)]
+    metadatas = [
+        {"source": f"doc{i % 3}.pdf", "page_start": i, "page_end": i + 1}
+        for i in range(300)
+    ]
+    metadatas[10]["category"] = "Title"
+    store = NumpyVectorStore(tempfile.mkdtemp(), block_size=64)
+    store.upsert(ids, vectors.tolist(), ids, metadatas)
+    
+    query = rng.normal(size=8).tolist()
+    filter = build_filter(source=["doc0.pdf", "doc1.pdf"], page_from=50, page_to=120)
+    results = store.search(query, k=300, filter=filter)
+    expected = {ids[i] for i, m in enumerate(metadatas) if matches(m, filter)}
+    assert {doc.id for doc, _ in results} == expected
+    assert [doc.id for doc, _ in store.search(query, k=5, filter=filter)] == \
+        [doc.id for doc, _ in results[:5]]
+    assert [doc.id for doc, _ in store.search(query, k=5, filter={"category": "Title"})] == ["doc-10"]
+    
+    # The column index is rebuilt after writes
+    store.upsert(["doc-10"], [vectors[10].tolist()], ["moved"], [{"category": "Other"}])
+    assert store.search(query, k=5, filter={"category": "Title"}) == []
+    
+    print("\n" + "="*60)
+    print("✅ ALL METADATA FILTER TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_metadata_filter()
@@ -0,0 +1,44 @@
+# tests/test_metrics.py
+
+from utils.metrics import Histogram, collect_breakdown, record_retrieval, record_tokens, stage
+
+def test_metrics():
+    """Test histogram exposition and per-request stage breakdowns"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING METRICS")
+    print("="*60 + "\n")
+    
+    histogram = Histogram("test_seconds", "Test histogram", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, stage="search")
+    text = "\n".join(histogram.render())
+    
+    # Buckets are cumulative and upper bounds are inclusive
+    assert 'test_seconds_bucket{stage="search",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{stage="search",le="1"} 3' in text
+    assert 'test_seconds_bucket{stage="search",le="+Inf"} 4' in text
+    assert 'test_seconds_count{stage="search"} 4' in text
+    
+    # Stages and tokens are collected only inside collect_breakdown
+    with collect_breakdown() as breakdown:
+        with stage("vector_search"):
+            pass
+        with stage("vector_search"):
+            pass
+        record_tokens({"input_tokens": 120, "output_tokens": 30})
+        record_retrieval(fetched=20, used=4)
+        record_retrieval(fetched=12, used=5, rounds=2)
+    with stage("vector_search"):
+        pass
+        
+    assert list(breakdown["timings"]) == ["vector_search"]
+    assert breakdown["tokens"] == {"prompt": 120, "completion": 30}
+    assert breakdown["retrieval"] == {"fetched": 32, "used": 9, "rounds": 3}
+    
+    print("\n" + "="*60)
+    print("✅ ALL METRICS TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_metrics()
@@ -0,0 +1,72 @@
+# tests/test_pgvector_store.py
+
+import os
+import uuid
+import pytest
+from app.embeddings.pgvector_store import PgVectorStore
+
+CONNECTION_STRING = os.getenv("POSTGRES_CONNECTION_STRING")
+
+@pytest.mark.skipif(not CONNECTION_STRING, reason="POSTGRES_CONNECTION_STRING not set")
+def test_pgvector_store():
+    """Test COPY upserts, filtered search, deletes, index creation and a second worker"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING PGVECTOR STORE")
+    print("="*60 + "\n")
+    
+    collection_name = f"test_collection_{uuid.uuid4().hex[:8]}"
+    # Stands in for a worker that started before the first ingest
+    reader = PgVectorStore(CONNECTION_STRING, collection_name, index_type="hnsw")
+    store = PgVectorStore(CONNECTION_STRING, collection_name, index_type="hnsw")
+    
+    try:
+        assert reader.count() == 0
+        store.upsert(
+            ["a", "b", "c"],
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.8, 0.6, 0.0]],
+            ["erstes", "zweites", "drittes"],
+            [{"source": "x.pdf", "page": 1}, {"source": "y.pdf", "page": 1}, None]
+        )
+        assert store.count() == 3
+        
+        # Squared L2 distances, closest first
+        results = store.search([1.0, 0.0, 0.0], k=2)
+        assert [doc.id for doc, _ in results] == ["a", "c"]
+        assert abs(results[1][1] - 0.4) < 1e-5
+        
+        # Distances to specific rows use the same squared L2 scale
+        distances = store.distances([1.0, 0.0, 0.0], ["a", "c", "missing"])
+        assert set(distances) == {"a", "c"} and abs(distances["c"] - 0.4) < 1e-5
+        
+        # The other instance finds the table created by this one
+        assert reader.count() == 3
+        assert [doc.id for doc, _ in reader.search([1.0, 0.0, 0.0], k=2)] == ["a", "c"]
+        assert sorted(reader.get_ids(["a", "b", "z"])) == ["a", "b"]
+        
+        # Metadata filters are evaluated in SQL
+        results = store.search([1.0, 0.0, 0.0], k=3, filter={"source": "y.pdf"})
+        assert [doc.id for doc, _ in results] == ["b"]
+        results = store.search(
+            [1.0, 0.0, 0.0], k=3,
+            filter={"source": {"$in": ["x.pdf", "y.pdf"]}, "page": {"$gte": 1}}
+        )
+        assert [doc.id for doc, _ in results] == ["a", "b"]
+        
+        # Upsert replaces, delete removes
+        store.upsert(["a"], [[0.0, 0.0, 1.0]], ["ersetzt"], [{"source": "x.pdf"}])
+        store.delete(["b"])
+        assert sorted(store.get_ids(["a", "b", "c"])) == ["a", "c"]
+        assert store.search([0.0, 0.0, 1.0], k=1)[0][0].page_content == "ersetzt"
+    finally:
+        with store.pool.connection() as conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{collection_name}"')
+        store.close()
+        reader.close()
+        
+    print("\n" + "="*60)
+    print("✅ ALL PGVECTOR STORE TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_pgvector_store()
@@ -0,0 +1,86 @@
+# tests/test_reranker.py
+
+import math
+import time
+from langchain_core.documents import Document
+from app.retriever.reranker import CrossEncoderReranker
+
+class KeywordModel:
+    """Stand-in cross-encoder: logit from the share of question words in the chunk"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pairs = []
+    
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.pairs.extend(pairs)
+        time.sleep(self.delay * len(pairs))
+        # Unbounded like the ms-marco logits: -5 (no overlap) to 5 (all words)
+        return [
+            10 * len(set(question.split()) & set(text.split())) / len(question.split()) - 5
+            for question, text in pairs
+        ]
+
+class LocalReranker(CrossEncoderReranker):
+    def __init__(self, model, **kwargs):
+        super().__init__(**kwargs)
+        self._model = model
+    
+    def _load_model(self):
+        return self._model
+
+def test_reranker():
+    """Test cross-encoder ordering, the score cache and the latency budget"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING RERANKER")
+    print("="*60 + "\n")
+    
+    question = "how are generated apps validated"
+    results = [
+        (Document(page_content="the paper lists the authors"), 0.1),
+        (Document(page_content="generated apps are validated by tests"), 0.3),
+        (Document(page_content="apps are deployed to the cloud"), 0.2),
+    ]
+    
+    # Reordered by relevance, cut to top_k, distance-like scores
+    model = KeywordModel()
+    reranker = LocalReranker(model, budget_ms=None, cache_size=4)
+    reranked = reranker.rerank(question, results, top_k=2)
+    assert [doc.page_content for doc, _ in reranked] == [
+        "generated apps are validated by tests",
+        "apps are deployed to the cloud"
+    ]
+    assert abs(reranked[0][1] - (1 - 1 / (1 + math.exp(-3.0)))) < 1e-9
+    
+    # Logits map to distances in [0, 1], most relevant first
+    full = LocalReranker(KeywordModel(), budget_ms=None)
+    reranked = full.rerank(question, results, top_k=3)
+    distances = [score for _, score in reranked]
+    assert all(0.0 <= score <= 1.0 for score in distances)
+    assert distances == sorted(distances)
+    relevance = [CrossEncoderReranker._relevance(logit) for logit in (1000.0, 8.0, 0.0, -5.0, -1000.0)]
+    assert relevance == sorted(relevance, reverse=True)
+    assert relevance[0] == 1.0 and relevance[1] > 0.99 and relevance[3] < 0.01
+    assert relevance[4] == 0.0  # No overflow on extreme logits
+    
+    # Cached pairs are not scored again; the LRU keeps cache_size entries
+    model.pairs.clear()
+    reranker.rerank(question, results, top_k=2)
+    assert model.pairs == []
+    reranker.rerank("another question", results[:2], top_k=2)
+    assert len(model.pairs) == 2 and len(reranker._cache) == 4
+    
+    # Over budget: keep the retrieval order instead of scoring
+    slow = LocalReranker(KeywordModel(delay=0.005), budget_ms=10)
+    slow.warm_up()
+    assert slow._seconds_per_pair >= 0.005
+    assert slow.rerank(question, results, top_k=2) == results[:2]
+    assert len(slow._cache) == 0
+    
+    print("\n" + "="*60)
+    print("✅ ALL RERANKER TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_reranker()
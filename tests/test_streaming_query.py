@@ -0,0 +1,115 @@
+# tests/test_streaming_query.py
+
+import asyncio
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from api.routes import query
+from api.services.rag_service import RAGService
+from app.clients import get_client_registry
+from app.summarizer.ai_summary import RAGPipeline
+
+class StubEmbeddings:
+    async def aembed_query(self, text):
+        return [1.0, 0.0]
+
+class StubVectorStore:
+    embeddings = StubEmbeddings()
+    collection_version = 0
+
+class StubRetriever:
+    """Returns fixed documents and packs them without a token budget"""
+    
+    top_k = 2
+    
+    def __init__(self, documents):
+        self.vectorstore = StubVectorStore()
+        self.documents = documents
+        self.filters = []
+    
+    async def aretrieve(self, question, top_k=None, query_embedding=None, filter=None):
+        self.filters.append(filter)
+        return self.documents
+    
+    def pack_context(self, documents):
+        return {
+            "context": "\n\n".join(doc.page_content for doc, _ in documents),
+            "documents": documents,
+            "tokens": 12
+        }
+
+def make_service(answer: str, documents) -> RAGService:
+    """RAG service around a pipeline with a fake streaming LLM"""
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.llm = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+    pipeline.retriever = StubRetriever(documents)
+    pipeline.answer_cache = None
+    pipeline._setup_prompt()
+    
+    service = RAGService.__new__(RAGService)
+    service.rag_pipeline = pipeline
+    service.max_concurrent_queries = 2
+    service._query_slots = None
+    return service
+
+def parse_sse(body: str):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_streaming_query():
+    """Test that /query/stream sends the sources first, then the answer token by token"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING STREAMING QUERY")
+    print("="*60 + "\n")
+    
+    documents = [
+        (Document(page_content="Generated apps are validated by tests.", metadata={"source": "paper.pdf", "page": 4}), 0.2),
+        (Document(page_content="Apps are deployed to the cloud.", metadata={"source": "paper.pdf", "page": 7}), 0.4),
+    ]
+    answer = "Generated apps are validated by automated tests (paper.pdf, page 4)."
+    service = make_service(answer, documents)
+    
+    app = FastAPI()
+    app.include_router(query.router)
+    registry = get_client_registry()
+    asyncio.run(registry.aclose())
+    assert registry.get("rag_service", lambda: service) is service
+    try:
+        response = TestClient(app).post(
+            "/query/stream",
+            json={"question": "How are generated apps validated?", "top_k": 2}
+        )
+    finally:
+        # Shutdown drops the service along with the clients it holds
+        asyncio.run(registry.aclose())
+    assert "rag_service" not in registry._instances
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    
+    # sources, then several tokens, then done
+    assert names[0] == "sources" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"} and len(names) > 4
+    sources = events[0][1]
+    assert [source["page"] for source in sources["sources"]] == [4, 7]
+    assert sources["retrieved_docs"] == 2 and sources["context_tokens"] == 12
+    assert "".join(data["content"] for name, data in events if name == "token") == answer
+    assert events[-1][1]["cached"] is False and "query_time" in events[-1][1]
+    assert service.rag_pipeline.retriever.filters == [None]
+    
+    print("\n" + "="*60)
+    print("✅ ALL STREAMING QUERY TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_streaming_query()
@@ -0,0 +1,94 @@
+# tests/test_sync_document.py
+
+import os
+import tempfile
+import threading
+from langchain_core.documents import Document
+from app.embeddings.coordinator import WriteCoordinator
+from app.embeddings.manifest import DocumentManifest, chunk_id
+from app.embeddings.numpy_store import NumpyVectorStore
+from app.embeddings.vectorstore import VectorStoreManager
+
+class CountingEmbeddings:
+    """Deterministic stand-in embeddings that record every embedded text"""
+    
+    def __init__(self, coordinator=None):
+        self.texts = []
+        self.coordinator = coordinator
+        self.locked = []
+    
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        if self.coordinator is not None:
+            self.locked.append(self.coordinator._depth > 0)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in texts]
+
+def make_manager(directory: str) -> VectorStoreManager:
+    """NumPy-backed manager on temporary files"""
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.provider = "numpy"
+    manager.vectorstore = NumpyVectorStore(os.path.join(directory, "vectors"))
+    manager.vectorstore.ann = None
+    manager.manifest = DocumentManifest(os.path.join(directory, "manifests"))
+    manager._source_locks = {}
+    manager._locks_guard = threading.Lock()
+    manager.coordinator = WriteCoordinator(os.path.join(directory, "state"))
+    manager.embeddings = CountingEmbeddings(manager.coordinator)
+    manager._version = manager.coordinator.version()
+    manager.bm25_index = None
+    return manager
+
+def chunks(*texts):
+    return [
+        Document(page_content=text, metadata={"source": "manual.pdf", "page": page})
+        for page, text in enumerate(texts, start=1)
+    ]
+
+def test_sync_document():
+    """Test incremental re-ingestion: unchanged chunks skip embedding, removed ones are deleted"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING INCREMENTAL RE-INGESTION")
+    print("="*60 + "\n")
+    
+    manager = make_manager(tempfile.mkdtemp())
+    first = chunks("Intro to the manual.", "Safety rules.", "Old appendix.")
+    first_ids = [chunk_id(doc) for doc in first]
+    
+    stats = manager.sync_document("manual.pdf", first)
+    assert stats == {"chunks_total": 3, "chunks_added": 3, "chunks_unchanged": 0, "chunks_removed": 0}
+    assert manager.vectorstore.count() == 3
+    assert manager.manifest.load("manual.pdf") == first_ids
+    assert manager.embeddings.locked == [False]  # Embedded outside the write lock
+    
+    # Identical re-upload embeds nothing
+    manager.embeddings.texts.clear()
+    stats = manager.sync_document("manual.pdf", chunks("Intro to the manual.", "Safety rules.", "Old appendix."))
+    assert stats["chunks_added"] == 0 and stats["chunks_unchanged"] == 3
+    assert manager.embeddings.texts == []
+    
+    # Changed version: page 2 edited, appendix dropped
+    manager.embeddings.texts.clear()
+    second = chunks("Intro to the manual.", "Revised safety rules.")
+    second_ids = [chunk_id(doc) for doc in second]
+    stats = manager.sync_document("manual.pdf", second)
+    assert stats == {"chunks_total": 2, "chunks_added": 1, "chunks_unchanged": 1, "chunks_removed": 2}
+    assert manager.embeddings.texts == ["Revised safety rules."]
+    
+    assert manager.manifest.load("manual.pdf") == second_ids
+    assert manager.vectorstore.count() == 2
+    assert set(manager.vectorstore.get_ids(first_ids + second_ids)) == set(second_ids)
+    
+    # Manifest entries missing from the collection are embedded again
+    manager.vectorstore.delete([second_ids[0]])
+    manager.embeddings.texts.clear()
+    stats = manager.sync_document("manual.pdf", chunks("Intro to the manual.", "Revised safety rules."))
+    assert stats["chunks_added"] == 1 and manager.embeddings.texts == ["Intro to the manual."]
+    assert manager.vectorstore.count() == 2
+    
+    print("\n" + "="*60)
+    print("✅ ALL INCREMENTAL RE-INGESTION TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_sync_document()
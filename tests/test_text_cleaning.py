@@ -0,0 +1,44 @@
+# tests/test_text_cleaning.py
+
+import random
+from app.pipeline.text_cleaning import clean_ocr_text, clean_pdf_text, clean_texts
+from scripts.benchmark_text_cleaning import add_ocr_noise, legacy_clean_ocr_text, legacy_clean_pdf_text
+
+def test_text_cleaning():
+    """Test that the precompiled cleaners match the original implementations"""
+    
+    print("\n" + "="*60)
+    print("🧪 TESTING TEXT CLEANING")
+    print("="*60 + "\n")
+    
+    samples = [
+        "",
+        " ",
+        "\n\n\t",
+        " a b",            # Leading single letter is removed only with the edge space
+        "a b c d ",        # Non-overlapping single-letter matches
+        "x @b c",          # Removed symbols can expose single letters
+        "Intro ........ 3\n4\nMethods",
+        " ... a .... ",
+        "café — naïve “quotes” 50% €5 $3 (ok); fine!",
+        "line\x0cbreak\r\nnext word end",
+        "snake_case and CamelCase 1.5 ... 2,000",
+    ]
+    rng = random.Random(42)
+    text = "The quick brown fox. Jumps over a lazy dog; 3 times... Results (p < 0.05) in 2024!\n"
+    samples += [add_ocr_noise(text * 5, 0.1, rng) for _ in range(200)]
+    
+    for sample in samples:
+        assert clean_pdf_text(sample) == legacy_clean_pdf_text(sample), repr(sample)
+        assert clean_ocr_text(sample) == legacy_clean_ocr_text(sample), repr(sample)
+        
+    # Batch cleaning keeps order
+    assert clean_texts(samples) == [legacy_clean_pdf_text(sample) for sample in samples]
+    assert clean_texts(samples, ocr=True) == [legacy_clean_ocr_text(sample) for sample in samples]
+    
+    print("\n" + "="*60)
+    print("✅ ALL TEXT CLEANING TESTS PASSED!")
+    print("="*60 + "\n")
+
+if __name__ == "__main__":
+    test_text_cleaning()
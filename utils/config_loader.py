@@ -1,25 +1,50 @@
 # utils/config_loader.py
 
 import os
-import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class ConfigLoader:
-    """Load and manage configuration"""
+    """
+    Load and manage configuration
+    
+    The file is read on first access rather than at import, so importing
+    modules that use `config` costs nothing, and RAG_CONFIG only has to be
+    set before the first lookup.
+    """
     
     _instance = None
     
-    def __new__(cls, config_path: str = "config/config.yaml"):
+    def __new__(cls, config_path: str = None):
         """Singleton pattern - only one config instance"""
         if cls._instance is None:
             cls._instance = super(ConfigLoader, cls).__new__(cls)
-            cls._instance.config_path = config_path
-            cls._instance.config = cls._instance._load_config()
+            cls._instance._config_path = config_path
+            cls._instance._config = None
         return cls._instance
     
+    @property
+    def config_path(self) -> str:
+        """Config file in use; RAG_CONFIG selects an alternative (e.g. config/benchmark.yaml)"""
+        if self._config_path is None:
+            self._config_path = os.getenv("RAG_CONFIG", "config/config.yaml")
+        return self._config_path
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Parsed configuration (loaded on first access)"""
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+    
+    @config.setter
+    def config(self, value: Optional[Dict[str, Any]]):
+        self._config = value
+    
     def _load_config(self) -> Dict[str, Any]:
         """Load YAML config and substitute environment variables"""
+        import yaml
+        
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
@@ -2,17 +2,24 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 
-# Create logs directory if not exists
-if not os.path.exists("logs"):
-    os.makedirs("logs")
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that creates its directory on the first record"""
+    
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+    
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
 
 # Logger configuration
 LOG_FILE = "logs/app.log"
 logger = logging.getLogger("rag_pipeline")
 logger.setLevel(logging.DEBUG)  # Capture all levels
 
-# Rotating file handler (5 MB per file, keep 3 backups)
-file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=3)
+# Rotating file handler (5 MB per file, keep 3 backups); the logs directory
+# and file are only created once something is logged
+file_handler = LazyRotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=3)
 file_handler.setLevel(logging.DEBUG)
 
 # Console handler
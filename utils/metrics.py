@@ -0,0 +1,181 @@
+# utils/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds (sub-millisecond search up to slow LLM answers)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+DOCUMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Histogram:
+    """Prometheus-style cumulative histogram with optional labels"""
+    
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._series[key] = series
+            series["counts"][bisect_left(self.buckets, value)] += 1
+            series["sum"] += value
+            series["count"] += 1
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class Counter:
+    """Prometheus-style monotonically increasing counter with optional labels"""
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds",
+    "Time spent per query pipeline stage"
+)
+LLM_TOKENS = Histogram(
+    "rag_llm_tokens",
+    "Tokens per LLM call",
+    buckets=TOKEN_BUCKETS
+)
+QUERIES = Counter(
+    "rag_queries_total",
+    "Answered queries"
+)
+RETRIEVED_DOCUMENTS = Histogram(
+    "rag_retrieval_documents",
+    "Vector search candidates fetched vs. used (within the score threshold)",
+    buckets=DOCUMENT_BUCKETS
+)
+RETRIEVAL_EXPANSIONS = Counter(
+    "rag_retrieval_expansions_total",
+    "Extra vector searches run by adaptive top-k"
+)
+RERANKS = Counter(
+    "rag_reranks_total",
+    "Cross-encoder rerank calls by outcome (reranked, cached, skipped over budget)"
+)
+
+_METRICS = (STAGE_SECONDS, LLM_TOKENS, QUERIES, RETRIEVED_DOCUMENTS, RETRIEVAL_EXPANSIONS, RERANKS)
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Per-request breakdown (set by collect_breakdown; shared with worker
+# threads because asyncio.to_thread copies the context)
+_breakdown: ContextVar[Optional[Dict[str, Dict]]] = ContextVar("rag_breakdown", default=None)
+
+@contextmanager
+def collect_breakdown() -> Iterator[Dict[str, Dict]]:
+    """Collect stages (seconds), token and retrieval counts recorded inside the block"""
+    breakdown = {"timings": {}, "tokens": {}, "retrieval": {}}
+    token = _breakdown.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _breakdown.reset(token)
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record an externally measured stage duration"""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        timings = breakdown["timings"]
+        timings[name] = timings.get(name, 0.0) + seconds
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage into the histogram and the current breakdown"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+def record_context_tokens(count: int) -> None:
+    """Record the size of the packed LLM context"""
+    LLM_TOKENS.observe(count, type="context")
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown["tokens"]["context"] = breakdown["tokens"].get("context", 0) + count
+
+def record_retrieval(fetched: int, used: int, rounds: int = 1) -> None:
+    """Record how many search candidates were fetched and how many were kept"""
+    RETRIEVED_DOCUMENTS.observe(fetched, kind="fetched")
+    RETRIEVED_DOCUMENTS.observe(used, kind="used")
+    if rounds > 1:
+        RETRIEVAL_EXPANSIONS.inc(rounds - 1)
+        
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        retrieval = breakdown["retrieval"]
+        for key, value in (("fetched", fetched), ("used", used), ("rounds", rounds)):
+            retrieval[key] = retrieval.get(key, 0) + value
+
+def record_tokens(usage: Optional[Dict]) -> Dict[str, int]:
+    """Record LLM token usage (LangChain usage_metadata) and return the counts"""
+    if not usage:
+        return {}
+        
+    counts = {
+        "prompt": int(usage.get("input_tokens", 0)),
+        "completion": int(usage.get("output_tokens", 0))
+    }
+    for kind, count in counts.items():
+        LLM_TOKENS.observe(count, type=kind)
+        
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        for kind, count in counts.items():
+            breakdown["tokens"][kind] = breakdown["tokens"].get(kind, 0) + count
+    return counts